@@ -1,16 +1,29 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, File, Form, Query, UploadFile, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
 from langchain_google_genai import ChatGoogleGenerativeAI
-import io
 import os
 from datetime import datetime
-import re
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
 import json
+import uuid
+import functools
+import tempfile
+import contextvars
 from dotenv import load_dotenv
+from llm_cache import response_cache, cache_bypass
+from clarification_cache import clarification_cache
+from cache_tiers import TieredCache, build_tiers
+from uploads import spool_upload, extract_upload_text
+from text_normalizer import normalize_document, normalization_stats, NORMALIZER_VERSION
+from resume_facts import resume_fact_sheets
+from skills_taxonomy import skill_taxonomy
+from response_views import CompactJSONResponse, analysis_view, evaluation_view, validate_view
+from planner import plan_execution, plan_run_options, estimate_plan, PLANS
+from stage_timing import timed, stage_stats
+from cascade import build_tier_model
 
 # Load environment variables
 load_dotenv()
@@ -26,7 +39,8 @@ model = ChatGoogleGenerativeAI(
     google_api_key=api_key,
     temperature=0.0,
     max_output_tokens=4000,  # Use max_output_tokens instead of max_tokens
-    top_p=1
+    top_p=1,
+    cache=response_cache
 )
 
 # Import our agents
@@ -36,9 +50,30 @@ from exp_agent import CombinedExperienceAgent
 from skills_agent import CombinedSkillsAgent
 from supervisor_agent import SupervisorAgent
 from mh_agent import CombinedMHAgent
+from prescreen import ResumePrescreener
+from cascade import cascade_stats
+from scoring import ScoringEngine, CATEGORY_SCHEMES, MH_CODES, MH_LABELS, score_candidate
+from pipeline import run_analysis, extract_rating, prepare_requisition, match_job_description, write_summary
+from requisition_store import RequisitionStore, RequisitionConflictError, CandidateConflictError, default_candidate_id
+from incremental import plan_update, reevaluate_analysis
+from job_queue import TaskQueue, DONE
+from reverse_match import match_requisitions
+from reports import report_service, iter_file
+from exports import export_analyses, EXPORT_FORMATS
+from applicant_dedup import (
+    find_batch_duplicates, find_evaluated_duplicate, duplicate_result, RESUME_DEDUP_ENABLED
+)
 
-# Initialize FastAPI app with CORS middleware
+# Initialize FastAPI app with CORS and compression middleware
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+
+requisition_store = RequisitionStore()
+task_queue = TaskQueue()
+
+# Text extracted from uploads, keyed by file content; shared across workers via the cache tiers
+TEXT_CACHE_SIZE = int(os.getenv("TEXT_CACHE_SIZE", "256"))
+text_cache = TieredCache(build_tiers("text", TEXT_CACHE_SIZE))
 
 app = FastAPI(
     title="Resume Analysis API",
@@ -55,8 +90,12 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Gzip responses larger than this many bytes for clients that accept it (e.g. batch results)
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")))
+
 class AspectRequest(BaseModel):
     job_description: str
+    no_cache: bool = False
 
 class AspectResponse(BaseModel):
     section_aspects: Dict
@@ -65,6 +104,12 @@ class EvaluationRequest(BaseModel):
     job_description: str
     resume: str
     section_aspects: Dict
+    no_cache: bool = False
+    view: str = "full"
+    fields: Optional[str] = None
+    deadline_seconds: Optional[float] = None
+    max_cost_usd: Optional[float] = None
+    include_summary: bool = True
 
 class RatingAndEvidence(BaseModel):
     evidence: List[str]
@@ -83,6 +128,25 @@ class EvaluationResponse(BaseModel):
     overall_category: str
     section_weights: Dict[str, float]
     overall_summary: str
+    execution: Optional[Dict] = None
+
+class RatingView(RatingAndEvidence):
+    evidence: Optional[List[str]] = None
+
+class CategoryView(CategoryAndEvidence):
+    evidence: Optional[List[str]] = None
+
+class EvaluationView(BaseModel):
+    """EvaluationResponse in any view: summary and scores drop the evidence, scores the summary; fields keeps a subset."""
+    experience: Optional[RatingView] = None
+    skills: Optional[RatingView] = None
+    education_and_certification: Optional[RatingView] = None
+    must_haves: Optional[CategoryView] = None
+    overall_rating: Optional[int] = None
+    overall_category: Optional[str] = None
+    section_weights: Optional[Dict[str, float]] = None
+    overall_summary: Optional[str] = None
+    execution: Optional[Dict] = None
 
 class AnalysisResponse(BaseModel):
     overall_rating: int
@@ -93,109 +157,328 @@ class AnalysisResponse(BaseModel):
     experience_analysis: Optional[Dict]
     skills_analysis: Optional[Dict]
     must_have_analysis: Optional[Dict]
+    execution: Optional[Dict] = None
 
-async def extract_text_from_pdf(file: bytes) -> str:
-    try:
-        import PyPDF2
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error reading PDF: {str(e)}")
+class AnalysisView(BaseModel):
+    """
+    AnalysisResponse in any view: full has the AnalysisResponse fields; summary and scores have
+    the ratings, categories and weights with section_ratings and mh_category instead of the
+    section analyses (scores without the summary); fields keeps a subset. candidate_id is
+    the id the analysis was stored under, when it was stored with a requisition.
+    """
+    candidate_id: Optional[str] = None
+    overall_rating: Optional[int] = None
+    overall_category: Optional[str] = None
+    section_weights: Optional[Dict[str, int]] = None
+    section_ratings: Optional[Dict[str, int]] = None
+    mh_category: Optional[str] = None
+    overall_summary: Optional[str] = None
+    education_analysis: Optional[Dict] = None
+    experience_analysis: Optional[Dict] = None
+    skills_analysis: Optional[Dict] = None
+    must_have_analysis: Optional[Dict] = None
+    execution: Optional[Dict] = None
 
-async def extract_text_from_docx(file: bytes) -> str:
-    try:
-        from docx import Document
-        doc = Document(io.BytesIO(file))
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error reading DOCX: {str(e)}")
+class PrescreenResult(BaseModel):
+    filename: str
+    index: int
+    rank: int
+    score: float
+    shortlisted: bool
+
+class PrescreenResponse(BaseModel):
+    section_aspects: Dict
+    candidates: List[PrescreenResult]
+
+class BatchCandidateResult(PrescreenResult):
+    candidate_id: Optional[str] = None
+    analysis: Optional[AnalysisView] = None
+    duplicate_of: Optional[Dict] = None
+
+class BatchAnalysisResponse(BaseModel):
+    section_aspects: Dict
+    candidates: List[BatchCandidateResult]
+    jd_match: Optional[Dict] = None
+
+class CandidateScores(BaseModel):
+    candidate_id: str
+    experience: int = 0
+    skills: int = 0
+    education_and_certification: int = 0
+    mh_category: Optional[str] = None
+
+class RerankRequest(BaseModel):
+    candidates: List[CandidateScores]
+    weights: Dict[str, float]
+    mh_penalty: float = 20
+    penalized_categories: List[str] = ["III"]
+    category_scheme: str = "supervisor"
+
+class RankedCandidate(BaseModel):
+    candidate_id: str
+    rank: int
+    overall_rating: Optional[int]
+    overall_category: str
+    mh_category: Optional[str]
+
+class RerankResponse(BaseModel):
+    candidates: List[RankedCandidate]
+
+class JobDescriptionUpdate(BaseModel):
+    job_description: str
+    no_cache: bool = False
+    short_circuit: Optional[bool] = None
+
+class ReevaluatedCandidate(BaseModel):
+    candidate_id: str
+    overall_rating: int
+    overall_category: str
+    reevaluated_sections: List[str]
+
+class EnqueuedTask(BaseModel):
+    task_id: str
+    candidate_id: str
+
+class EnqueueResponse(BaseModel):
+    tasks: List[EnqueuedTask]
+
+class TaskStatus(BaseModel):
+    id: str
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    error: Optional[str]
+    created_at: str
+    updated_at: str
+
+class JDMatch(BaseModel):
+    id: str
+    requisition_id: Optional[str]
+    matched_requisition_id: str
+    similarity: float
+    method: str
+    reused: bool
+    created_at: str
+
+class JobResponse(BaseModel):
+    job_id: str
+    section_aspects: Dict
+    section_weights: Dict[str, int]
+    weight_reasoning: Optional[Dict] = None
+    jd_match: Optional[Dict] = None
+    created_at: str
+    updated_at: str
+
+class JobCandidateScores(CandidateScores):
+    overall_rating: int
+    overall_category: str
+
+class JobMatch(BaseModel):
+    job_id: str
+    rank: int
+    overall_rating: Optional[int]
+    overall_category: Optional[str]
+    section_ratings: Dict[str, int]
+    mh_category: Optional[str]
+    overall_summary: Optional[str] = None
+    error: Optional[str] = None
 
-async def read_file_content(file: UploadFile) -> str:
-    content = await file.read()
-    file_extension = file.filename.split('.')[-1].lower()
+class JobMatchResponse(BaseModel):
+    candidate_id: Optional[str]
+    jobs: List[JobMatch]
 
+class CandidateSummary(BaseModel):
+    job_id: str
+    candidate_id: str
+    overall_summary: str
+
+class SkillCoverageResult(BaseModel):
+    filename: str
+    status: str
+    coverage: Optional[float]
+    checkpoints: List[Dict]
+    resume_skills: List[str]
+
+class RequisitionUpdateResponse(BaseModel):
+    requisition_id: str
+    changed_sections: List[str]
+    weights_recomputed: bool
+    section_weights: Dict[str, int]
+    candidates: List[ReevaluatedCandidate]
+
+async def read_file_content(file: UploadFile, document: str = "resume") -> str:
+    """
+    Extract the text of an uploaded PDF, DOCX or TXT file.
+
+    The upload is streamed into a size-limited temporary file and its type is sniffed
+    from its content; parsers read the file through a memory map. The text is normalized
+    for a "resume" or a "jd" (repeated headers and footers, whitespace, hyphenation and,
+    for JDs, EEO boilerplate are removed).
+    """
+    upload = await spool_upload(file)
     try:
-        if file_extension == 'pdf':
-            return await extract_text_from_pdf(content)
-        elif file_extension == 'docx':
-            return await extract_text_from_docx(content)
-        elif file_extension == 'txt':
-            return content.decode('utf-8').strip()
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported file type: {file_extension}")
+        cache_key = f"{upload.kind}:{document}:{NORMALIZER_VERSION}:{upload.sha256}"
+        cached = text_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        text = await extract_upload_text(upload, document)
+        text_cache.set(cache_key, text)
+        return text
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error reading file {file.filename}: {str(e)}")
-
-def extract_rating(evaluation_str: str) -> int:
-    """Extract numeric rating from evaluation string."""
-    if not evaluation_str or not isinstance(evaluation_str, str):
-        return 0
-    
-    evaluation_str = evaluation_str.strip()
-    if 'Rating:' in evaluation_str:
-        try:
-            rating_part = evaluation_str.split('Rating:')[-1].strip()
-            numbers = re.findall(r'\d+', rating_part)
-            if numbers:
-                return int(numbers[0])
-        except Exception:
-            pass
-    return 0
+    finally:
+        upload.close()
 
 def calculate_overall_rating(experience_rating: int, skills_rating: int, education_rating: int, 
                            weights: Dict[str, float], mh_category: Optional[int] = None) -> tuple:
-    """Calculate overall rating and category."""
+    """Calculate overall rating and category (the "evaluate" scheme of scoring.ScoringEngine)."""
     try:
-        # Normalize weights to sum to 100
-        total_weight = sum(weights.values())
-        if total_weight > 0:
-            normalized_weights = {k: (v/total_weight) * 100 for k, v in weights.items()}
-        else:
-            normalized_weights = {
+        if sum(weights.values()) <= 0:
+            weights = {
                 'experience': 40,
                 'skills': 35,
                 'education_and_certification': 25
             }
 
-        # Calculate weighted score
-        weighted_score = (
-            normalized_weights['experience'] * experience_rating / 100 +
-            normalized_weights['skills'] * skills_rating / 100 +
-            normalized_weights['education_and_certification'] * education_rating / 100
+        # The must-have penalty applies to category 3 (III)
+        return score_candidate(
+            {'experience': experience_rating, 'skills': skills_rating, 'education_and_certification': education_rating},
+            weights, MH_LABELS.get(mh_category), scheme="evaluate"
         )
 
-        # Apply must-have penalty if category is 3
-        if mh_category == 3:
-            weighted_score = max(0, weighted_score - 20)
-
-        # Round the final rating
-        overall_rating = round(weighted_score)
-
-        # Determine category
-        if overall_rating < 41:
-            category = "Not Suitable"
-        elif overall_rating < 61:
-            category = "Moderate Match"
-        elif overall_rating < 81:
-            category = "Good Match"
-        else:
-            category = "Excellent Match"
-
-        return overall_rating, category
-
     except Exception as e:
         return 0, "Error"
 
+def analysis_response(result: Dict, view: str, fields: Optional[str]) -> Dict:
+    """Validate a full analysis against AnalysisResponse; lean views are built from the result directly."""
+    if view == "full":
+        result = AnalysisResponse(**result).dict()
+    return analysis_view(result, view, fields)
+
+def run_timed(stage: str, timings: Dict[str, float], func, *args):
+    """Call func(*args), adding its duration to timings[stage] and the planner's stage stats."""
+    with timed(stage, timings):
+        return func(*args)
+
 async def run_in_threadpool(executor: ThreadPoolExecutor, func, *args):
     """Run a synchronous function in a thread pool."""
     loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(executor, func, *args)
+    # Carry context variables (e.g. the cache bypass flag) into the worker thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, context.run, func, *args)
+
+def analysis_options(short_circuit: Optional[bool], tiered: Optional[bool], deadline_seconds: Optional[float],
+                     max_cost_usd: Optional[float], aspects_ready: bool, include_summary: bool = True) -> tuple:
+    """run_analysis options, and the planner's plan when there is a deadline or cost budget."""
+    if deadline_seconds is None and max_cost_usd is None:
+        return {'short_circuit': short_circuit, 'tiered': tiered, 'include_summary': include_summary}, None
+    plan = plan_execution(deadline_seconds, max_cost_usd, aspects_ready=aspects_ready)
+    options = plan_run_options(plan)
+    options['include_summary'] = options['include_summary'] and include_summary
+    if short_circuit is not None:
+        options['short_circuit'] = short_circuit
+    return options, plan
+
+def job_response(requisition: Dict) -> JobResponse:
+    # The match made when the job was created, if its JD was a repost
+    jd_match = next((match for match in requisition_store.list_jd_matches(requisition['id'])
+                     if match['requisition_id'] == requisition['id']), None)
+    return JobResponse(
+        job_id=requisition['id'],
+        section_aspects=requisition['aspects'],
+        section_weights=requisition['weights'],
+        weight_reasoning=requisition['weight_reasoning'],
+        jd_match=jd_match,
+        created_at=requisition['created_at'],
+        updated_at=requisition['updated_at']
+    )
+
+def get_job(job_id: str) -> Dict:
+    requisition = requisition_store.get_requisition(job_id)
+    if not requisition:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return requisition
+
+async def load_requisition(executor: ThreadPoolExecutor, requisition_id: str, jd_text: str) -> tuple:
+    """Return (aspects, weights) for a requisition; a JD that differs from the stored one is a 409."""
+    try:
+        return await run_in_threadpool(executor, prepare_requisition, requisition_store, requisition_id, jd_text)
+    except RequisitionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/cache/stats")
+async def get_cache_stats() -> Dict:
+    """Return hit/miss counters for the shared LLM response cache."""
+    return response_cache.get_stats()
+
+@app.get("/cache/clarifications/stats")
+async def get_clarification_cache_stats() -> Dict:
+    """Return per-checkpoint hit/miss counters for the clarification cache."""
+    return clarification_cache.get_stats()
+
+@app.get("/cache/text/stats")
+async def get_text_cache_stats() -> Dict:
+    """Return per-tier counters for the extracted-text cache."""
+    return text_cache.summary()
+
+
+@app.get("/resume_facts/stats")
+async def get_resume_facts_stats() -> Dict:
+    """Return the fact sheet mode and per-tier counters for the fact sheet cache."""
+    return resume_fact_sheets.get_stats()
+
+
+@app.get("/skills/stats")
+async def get_skills_stats() -> Dict:
+    """Return the skill coverage mode, taxonomy size and coverage counters."""
+    return skill_taxonomy.get_stats()
+
+@app.get("/normalization/stats")
+async def get_normalization_stats() -> Dict:
+    """Return what text normalization removed per document kind, with the characters and estimated tokens saved."""
+    return normalization_stats.report()
+
+@app.get("/planner/stats")
+async def get_planner_stats(aspects_ready: bool = False, parallel: bool = True) -> Dict:
+    """Return measured per-stage latencies and the current estimate for every execution plan."""
+    return {
+        'stages': stage_stats.report(),
+        'plans': [{**plan, **estimate_plan(plan, aspects_ready, parallel)} for plan in PLANS]
+    }
+
+@app.get("/reports/stats")
+async def get_report_stats() -> Dict:
+    """Return per-tier counters for the rendered-report cache and the number of render workers."""
+    return report_service.get_stats()
+
+@app.get("/cascade/stats")
+async def get_cascade_stats() -> Dict:
+    """Return escalation rates and per-tier latency, token usage and estimated cost."""
+    return cascade_stats.report()
+
+@app.post("/rerank", response_model=RerankResponse)
+async def rerank_candidates(request: RerankRequest) -> RerankResponse:
+    """
+    Re-score and re-rank already analyzed candidates under new section weights or
+    must-have penalty rules, without running any agent.
+    """
+    if request.category_scheme not in CATEGORY_SCHEMES:
+        raise HTTPException(status_code=400, detail=f"Unknown category scheme: {request.category_scheme}")
+    if any(category not in MH_CODES for category in request.penalized_categories):
+        raise HTTPException(status_code=400, detail="penalized_categories must be among I, II and III")
+
+    engine = ScoringEngine.from_records(candidate.dict() for candidate in request.candidates)
+    ranked = engine.score(
+        request.weights,
+        mh_penalty=request.mh_penalty,
+        penalized_categories=request.penalized_categories,
+        scheme=request.category_scheme
+    )
+    return RerankResponse(candidates=[RankedCandidate(**candidate) for candidate in ranked])
 
 @app.post("/aspects", response_model=AspectResponse)
 async def generate_aspects(request: AspectRequest) -> AspectResponse:
@@ -212,7 +495,7 @@ async def generate_aspects(request: AspectRequest) -> AspectResponse:
         all_aspects = {}
 
         # Create thread pool executor
-        with ThreadPoolExecutor(max_workers=4) as executor:
+        with cache_bypass(request.no_cache), ThreadPoolExecutor(max_workers=4) as executor:
             # Create tasks for each section
             tasks = []
             for section_name, agent in agents.items():
@@ -239,14 +522,30 @@ async def generate_aspects(request: AspectRequest) -> AspectResponse:
             detail=f"Aspect generation failed: {str(e)}"
         )
 
-@app.post("/evaluate", response_model=EvaluationResponse)
-async def evaluate_resume(request: EvaluationRequest) -> EvaluationResponse:
-    """Evaluate a resume against a job description using the provided aspects."""
+@app.post("/evaluate", response_model=EvaluationView)
+async def evaluate_resume(request: EvaluationRequest) -> CompactJSONResponse:
+    """
+    Evaluate a resume against a job description using the provided aspects.
+
+    view is "full", "summary" (no evidence lists) or "scores" (no evidence or summary);
+    fields optionally keeps only the given comma-separated top-level fields.
+    With deadline_seconds or max_cost_usd, the planner picks the section agents' model
+    tier and whether to write the summary; execution reports the plan and stage timings.
+    include_summary=false skips the summary model call.
+    """
+    validate_view(request.view)
     try:
+        plan = None
+        if request.deadline_seconds is not None or request.max_cost_usd is not None:
+            plan = plan_execution(request.deadline_seconds, request.max_cost_usd, aspects_ready=True, allow_cascade=False)
+        section_model = build_tier_model("fast") if plan and plan['tier'] == "fast" else None
+        section_stage = f"section:{'fast' if section_model else 'full'}"
+        timings: Dict[str, float] = {}
+
         # Initialize agents
-        edu_agent = CombinedEducationAgent()
-        exp_agent = CombinedExperienceAgent()
-        skills_agent = CombinedSkillsAgent()
+        edu_agent = CombinedEducationAgent(chat_model=section_model)
+        exp_agent = CombinedExperienceAgent(chat_model=section_model)
+        skills_agent = CombinedSkillsAgent(chat_model=section_model)
         mh_agent = CombinedMHAgent()
         supervisor_agent = SupervisorAgent()
 
@@ -254,11 +553,12 @@ async def evaluate_resume(request: EvaluationRequest) -> EvaluationResponse:
         current_date = datetime.now().strftime("%B %d, %Y")
 
         # Create thread pool executor
-        with ThreadPoolExecutor(max_workers=4) as executor:
+        with cache_bypass(request.no_cache), ThreadPoolExecutor(max_workers=4) as executor:
             # Run evaluations in parallel
             tasks = {
                 'education': run_in_threadpool(
                     executor, 
+                    run_timed, section_stage, timings,
                     edu_agent.run, 
                     request.job_description, 
                     request.resume,
@@ -266,6 +566,7 @@ async def evaluate_resume(request: EvaluationRequest) -> EvaluationResponse:
                 ),
                 'experience': run_in_threadpool(
                     executor,
+                    run_timed, section_stage, timings,
                     exp_agent.run,
                     request.job_description,
                     request.resume,
@@ -273,6 +574,7 @@ async def evaluate_resume(request: EvaluationRequest) -> EvaluationResponse:
                 ),
                 'skills': run_in_threadpool(
                     executor,
+                    run_timed, section_stage, timings,
                     skills_agent.run,
                     request.job_description,
                     request.resume,
@@ -280,6 +582,7 @@ async def evaluate_resume(request: EvaluationRequest) -> EvaluationResponse:
                 ),
                 'must_haves': run_in_threadpool(
                     executor,
+                    run_timed, 'must_have', timings,
                     mh_agent.run,
                     request.job_description,
                     request.resume,
@@ -290,6 +593,7 @@ async def evaluate_resume(request: EvaluationRequest) -> EvaluationResponse:
             # Get section weights
             weights, _ = await run_in_threadpool(
                 executor,
+                run_timed, 'weights', timings,
                 supervisor_agent.get_section_weights,
                 request.job_description
             )
@@ -311,14 +615,21 @@ async def evaluate_resume(request: EvaluationRequest) -> EvaluationResponse:
                 exp_rating, skills_rating, edu_rating, weights, mh_category
             )
 
-            # Generate overall summary
-            overall_summary = supervisor_agent.generate_summary(
-                experience_rationale=results['experience'].get('evaluation', ''),
-                skills_rationale=results['skills'].get('evaluation', ''),
-                education_rationale=results['education'].get('evaluation', '')
-            )
+            # Generate overall summary, off the event loop
+            overall_summary = ''
+            if request.include_summary and (not plan or plan['summary']):
+                overall_summary = await run_in_threadpool(
+                    executor,
+                    run_timed, 'summary', timings,
+                    functools.partial(
+                        supervisor_agent.generate_summary,
+                        experience_rationale=results['experience'].get('evaluation', ''),
+                        skills_rationale=results['skills'].get('evaluation', ''),
+                        education_rationale=results['education'].get('evaluation', '')
+                    )
+                )
 
-            return EvaluationResponse(
+            evaluation = EvaluationResponse(
                 experience=RatingAndEvidence(
                     evidence=results['experience'].get('evidence', []),
                     rating=exp_rating
@@ -338,19 +649,34 @@ async def evaluate_resume(request: EvaluationRequest) -> EvaluationResponse:
                 overall_rating=overall_rating,
                 overall_category=overall_category,
                 section_weights=weights,
-                overall_summary=overall_summary
+                overall_summary=overall_summary,
+                execution={'stage_seconds': timings, 'plan': plan}
             )
+            return CompactJSONResponse(evaluation_view(evaluation.dict(), request.view, request.fields))
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Evaluation failed: {str(e)}"
         )
 
-@app.post("/analyze", response_model=AnalysisResponse)
+@app.post("/analyze", response_model=AnalysisView)
 async def analyze_resume(
     jd_file: UploadFile = File(...),
-    resume_file: UploadFile = File(...)
+    resume_file: UploadFile = File(...),
+    no_cache: bool = False,
+    short_circuit: Optional[bool] = None,
+    tiered: Optional[bool] = None,
+    requisition_id: Optional[str] = None,
+    candidate_id: Optional[str] = None,
+    replace: bool = False,
+    view: str = "full",
+    fields: Optional[str] = None,
+    deadline_seconds: Optional[float] = None,
+    max_cost_usd: Optional[float] = None,
+    include_summary: bool = True
 ):
     """
     Analyze a resume against a job description.
@@ -358,85 +684,643 @@ async def analyze_resume(
     Parameters:
     - jd_file: Job description file (PDF, DOCX, or TXT)
     - resume_file: Resume file (PDF, DOCX, or TXT)
+    - no_cache: Skip cached model responses and refresh them
+    - short_circuit: Skip the other agents when must-haves clearly fail (default MH_SHORT_CIRCUIT)
+    - tiered: Score on the fast model tier and escalate borderline candidates (default CASCADE_ENABLED)
+    - requisition_id: Store the JD and this analysis under this requisition
+    - candidate_id: Id to store the analysis under (default: the file name and a hash of the
+      resume); it is returned with the analysis
+    - replace: Replace the stored analysis of a different resume under the same candidate_id
+      (otherwise that is a 409)
+    - view: "full" (default), "summary" (ratings, categories, weights and summary) or "scores" (no text)
+    - fields: Comma-separated top-level fields to keep from the chosen view
+    - deadline_seconds, max_cost_usd: Let the planner pick the most thorough execution plan
+      (model tier, summary, short circuit, parallel sections) expected to fit; this overrides tiered
+    - include_summary: Set to false to skip the summary model call; with a requisition_id it can be
+      written later by GET /jobs/{requisition_id}/candidates/{candidate_id}/summary
+
+    Without a requisition_id, a JD that is a near-duplicate of a stored requisition's reuses its
+    aspects and weights (JD_DEDUP_MODE); execution.jd_match then reports the match.
+    With one, a resume that duplicates one already analyzed for the requisition is served from
+    that analysis (RESUME_DEDUP_ENABLED); execution.duplicate_of names the candidate.
     
     Returns:
     - AnalysisResponse containing the analysis results
     """
+    validate_view(view)
     try:
         # Read file contents
-        jd_text = await read_file_content(jd_file)
+        jd_text = await read_file_content(jd_file, document="jd")
         resume_text = await read_file_content(resume_file)
 
-        # Get current date
-        current_date = datetime.now().strftime("%B %d, %Y")
+        aspects_ready = bool(requisition_id) and requisition_store.get_requisition(requisition_id) is not None
+        options, plan = analysis_options(short_circuit, tiered, deadline_seconds, max_cost_usd, aspects_ready,
+                                         include_summary)
 
-        # Generate aspects
-        aspects_agent = AspectsAgent()
-        aspects = aspects_agent.generate_all_aspects(jd_text)
+        with cache_bypass(no_cache):
+            aspects = weights = jd_match = None
+            if requisition_id:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    aspects, weights = await load_requisition(executor, requisition_id, jd_text)
+            else:
+                jd_match, duplicate = match_job_description(requisition_store, jd_text)
+                if duplicate:
+                    aspects, weights = duplicate['aspects'], duplicate['weights']
+            _, result = find_evaluated_duplicate(requisition_store, requisition_id, resume_text)
+            if result is None:
+                result = run_analysis(jd_text, resume_text, aspects, weights, **options)
+            if plan:
+                result['execution']['plan'] = plan
+            if jd_match:
+                result['execution']['jd_match'] = jd_match
+            response = analysis_response(result, view, fields)
+            if requisition_id:
+                candidate_id = candidate_id or default_candidate_id(resume_file.filename, resume_text)
+                requisition_store.save_analysis(requisition_id, candidate_id, resume_text, result, replace=replace)
+                response['candidate_id'] = candidate_id
+            return CompactJSONResponse(response)
 
-        # Initialize agents
-        edu_agent = CombinedEducationAgent()
-        exp_agent = CombinedExperienceAgent()
-        skills_agent = CombinedSkillsAgent()
-        mh_agent = CombinedMHAgent()
-        supervisor_agent = SupervisorAgent()
+    except HTTPException:
+        raise
+    except CandidateConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Run analyses
-        edu_result = edu_agent.run(jd_text, resume_text, aspects)
-        exp_result = exp_agent.run(jd_text, resume_text, aspects)
-        skills_result = skills_agent.run(jd_text, resume_text, aspects)
-        mh_result = mh_agent.run(jd_text, resume_text, aspects)
-
-        # Get section weights
-        weights, weight_reasoning = supervisor_agent.get_section_weights(jd_text)
-
-        # Extract ratings
-        edu_rating = extract_rating(edu_result.get('evaluation', '')) if edu_result else 0
-        exp_rating = extract_rating(exp_result.get('evaluation', '')) if exp_result else 0
-        skills_rating = extract_rating(skills_result.get('evaluation', '')) if skills_result else 0
-
-        # Get MH category
-        mh_category = None
-        if mh_result and "evaluation" in mh_result:
-            evaluation_str = mh_result['evaluation']
-            if isinstance(evaluation_str, str):
-                if "Category III" in evaluation_str:
-                    mh_category = "III"
-                elif "Category II" in evaluation_str:
-                    mh_category = "II"
-                elif "Category I" in evaluation_str:
-                    mh_category = "I"
-
-        # Calculate overall rating
-        overall_rating, overall_category = supervisor_agent.calculate_overall_rating(
-            edu_rating=edu_rating,
-            exp_rating=exp_rating,
-            skills_rating=skills_rating,
-            weights=weights,
-            mh_category=mh_category
+@app.post("/prescreen", response_model=PrescreenResponse)
+async def prescreen_resumes(
+    jd_file: UploadFile = File(...),
+    resume_files: List[UploadFile] = File(...),
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None
+):
+    """
+    Rank resumes locally (BM25 over the skills and experience checkpoints) without any resume-level LLM calls.
+
+    Parameters:
+    - jd_file: Job description file (PDF, DOCX, or TXT)
+    - resume_files: Resume files (PDF, DOCX, or TXT)
+    - top_k: Shortlist at most this many resumes
+    - min_score: Shortlist only resumes scoring at least this (0-1, relative to the best resume)
+    """
+    try:
+        jd_text = await read_file_content(jd_file, document="jd")
+        resume_texts = [await read_file_content(resume_file) for resume_file in resume_files]
+
+        aspects = AspectsAgent().generate_all_aspects(jd_text)
+        ranking = ResumePrescreener(resume_texts).shortlist(aspects, top_k=top_k, min_score=min_score)
+
+        return PrescreenResponse(
+            section_aspects=aspects,
+            candidates=[
+                PrescreenResult(filename=resume_files[entry['index']].filename, **entry)
+                for entry in ranking
+            ]
         )
 
-        # Generate summary
-        overall_summary = supervisor_agent.generate_summary(
-            experience_rationale=exp_result.get('evaluation', '') if exp_result else '',
-            skills_rationale=skills_result.get('evaluation', '') if skills_result else '',
-            education_rationale=edu_result.get('evaluation', '') if edu_result else ''
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prescreen failed: {str(e)}")
+
+@app.post("/batch/analyze", response_model=BatchAnalysisResponse)
+async def batch_analyze_resumes(
+    jd_file: UploadFile = File(...),
+    resume_files: List[UploadFile] = File(...),
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+    no_cache: bool = False,
+    short_circuit: Optional[bool] = None,
+    tiered: Optional[bool] = None,
+    requisition_id: Optional[str] = None,
+    view: str = "full",
+    fields: Optional[str] = None,
+    include_summary: bool = True
+):
+    """
+    Prescreen a pool of resumes and run the full agent pipeline only on the shortlist.
+
+    Parameters are those of /prescreen plus no_cache, short_circuit, tiered, requisition_id,
+    view, fields and include_summary as in /analyze; view and fields apply to each candidate's
+    analysis. Skipping the summaries saves one model call per shortlisted resume.
+    Resumes outside the shortlist are returned with their prescreen score and no analysis.
+    Without a requisition_id, a near-duplicate of a stored requisition's JD reuses its aspects
+    and weights, and jd_match reports the match.
+    Exact and near-duplicate resumes are analyzed once: later copies in the batch, and resumes
+    that duplicate one already analyzed for the requisition, reuse that analysis and name
+    the original candidate in duplicate_of. Each candidate_id is the file name and a hash of the
+    resume, which is also the id its analysis is stored under with a requisition_id.
+    """
+    validate_view(view)
+    try:
+        jd_text = await read_file_content(jd_file, document="jd")
+        resume_texts = [await read_file_content(resume_file) for resume_file in resume_files]
+        candidate_ids = [default_candidate_id(resume_file.filename, resume_text)
+                         for resume_file, resume_text in zip(resume_files, resume_texts)]
+
+        with cache_bypass(no_cache), ThreadPoolExecutor(max_workers=4) as executor:
+            # Aspects and weights are computed once for the whole batch
+            jd_match = duplicate = None
+            if requisition_id:
+                aspects, weights = await load_requisition(executor, requisition_id, jd_text)
+            else:
+                jd_match, duplicate = match_job_description(requisition_store, jd_text)
+            if duplicate:
+                aspects, weights = duplicate['aspects'], duplicate['weights']
+            elif not requisition_id:
+                aspects = await run_in_threadpool(executor, AspectsAgent().generate_all_aspects, jd_text)
+                weights, _ = await run_in_threadpool(executor, SupervisorAgent().get_section_weights, jd_text)
+
+            ranking = ResumePrescreener(resume_texts).shortlist(aspects, top_k=top_k, min_score=min_score)
+            shortlisted = [entry['index'] for entry in ranking if entry['shortlisted']]
+
+            # Matching in rank order makes the first copy of a shortlisted resume shortlisted too
+            order = [entry['index'] for entry in ranking]
+            copies = {}
+            duplicate_of = {}
+            if RESUME_DEDUP_ENABLED and not no_cache:
+                for index, match in zip(order, find_batch_duplicates([resume_texts[i] for i in order])):
+                    if match:
+                        source = order[match['index']]
+                        copies[index] = source
+                        duplicate_of[index] = {
+                            'candidate_id': candidate_ids[source], 'similarity': match['similarity'],
+                            'method': match['method'], 'source': 'batch'
+                        }
+
+            analyses = {}
+            tasks = {}
+            for index in shortlisted:
+                if index in copies:
+                    continue
+                match, result = find_evaluated_duplicate(requisition_store, requisition_id, resume_texts[index])
+                if result is not None:
+                    analyses[index] = result
+                    duplicate_of[index] = match
+                else:
+                    tasks[index] = run_in_threadpool(
+                        executor, functools.partial(run_analysis, include_summary=include_summary),
+                        jd_text, resume_texts[index], aspects, weights, short_circuit, tiered
+                    )
+            analyses.update(zip(tasks.keys(), await asyncio.gather(*tasks.values())))
+            for index in shortlisted:
+                if index in copies:
+                    analyses[index] = duplicate_result(analyses[copies[index]], duplicate_of[index])
+
+        if requisition_id:
+            for index, result in analyses.items():
+                requisition_store.save_analysis(requisition_id, candidate_ids[index], resume_texts[index], result)
+
+        return CompactJSONResponse({
+            'section_aspects': aspects,
+            'candidates': [
+                {
+                    **PrescreenResult(filename=resume_files[entry['index']].filename, **entry).dict(),
+                    'candidate_id': candidate_ids[entry['index']],
+                    'analysis': analysis_response(analyses[entry['index']], view, fields)
+                    if entry['index'] in analyses else None,
+                    'duplicate_of': duplicate_of.get(entry['index'])
+                }
+                for entry in ranking
+            ],
+            'jd_match': jd_match
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
+
+@app.put("/requisitions/{requisition_id}/job_description", response_model=RequisitionUpdateResponse)
+async def update_job_description(requisition_id: str, request: JobDescriptionUpdate) -> RequisitionUpdateResponse:
+    """
+    Replace a requisition's JD and bring its stored analyses up to date.
+
+    Aspects are regenerated and diffed per section against the stored ones. Only sections
+    whose checkpoints changed are re-run for each candidate, and section weights are
+    recomputed only when the education, experience or skills checkpoints changed.
+    """
+    requisition = requisition_store.get_requisition(requisition_id)
+    if not requisition:
+        raise HTTPException(status_code=404, detail=f"Requisition {requisition_id} not found")
+
+    try:
+        with cache_bypass(request.no_cache), ThreadPoolExecutor(max_workers=4) as executor:
+            aspects = await run_in_threadpool(executor, AspectsAgent().generate_all_aspects, request.job_description)
+            changed_sections, weights_recomputed = plan_update(requisition, aspects)
+
+            weights, weight_reasoning = requisition['weights'], requisition['weight_reasoning']
+            if weights_recomputed:
+                weights, weight_reasoning = await run_in_threadpool(
+                    executor, SupervisorAgent().get_section_weights, request.job_description
+                )
+
+            analyses = requisition_store.list_analyses(requisition_id)
+            results = await asyncio.gather(*[
+                run_in_threadpool(
+                    executor, reevaluate_analysis, request.job_description, analysis, aspects, weights,
+                    changed_sections, request.short_circuit
+                )
+                for analysis in analyses
+            ])
+
+        requisition_store.save_requisition(
+            request.job_description, aspects, weights, weight_reasoning, requisition_id=requisition_id
         )
+        candidates = []
+        for analysis, result in zip(analyses, results):
+            requisition_store.save_analysis(requisition_id, analysis['candidate_id'], analysis['resume_text'], result)
+            candidates.append(ReevaluatedCandidate(
+                candidate_id=analysis['candidate_id'],
+                overall_rating=result['overall_rating'],
+                overall_category=result['overall_category'],
+                reevaluated_sections=changed_sections
+            ))
 
-        return AnalysisResponse(
-            overall_rating=overall_rating,
-            overall_category=overall_category,
+        return RequisitionUpdateResponse(
+            requisition_id=requisition_id,
+            changed_sections=changed_sections,
+            weights_recomputed=weights_recomputed,
             section_weights=weights,
-            overall_summary=overall_summary,
-            education_analysis=edu_result,
-            experience_analysis=exp_result,
-            skills_analysis=skills_result,
-            must_have_analysis=mh_result
+            candidates=candidates
         )
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Requisition update failed: {str(e)}")
+
+@app.get("/requisitions/{requisition_id}/jd_matches", response_model=List[JDMatch])
+async def get_jd_matches(requisition_id: str) -> List[JDMatch]:
+    """Audit trail of near-duplicate JD matches made for this requisition or reusing it."""
+    return [JDMatch(**match) for match in requisition_store.list_jd_matches(requisition_id)]
+
+@app.post("/jobs", response_model=JobResponse)
+async def create_job(
+    jd_file: Optional[UploadFile] = File(None),
+    job_description: Optional[str] = Form(None),
+    job_id: Optional[str] = None,
+    no_cache: bool = False
+) -> JobResponse:
+    """
+    Register a job description once: its aspects and section weights are computed (or taken
+    from a stored near-duplicate JD) and persisted as a requisition.
+
+    Send the JD as jd_file (PDF, DOCX or TXT) or as the job_description form field. job_id
+    names the job (a new id is generated by default); registering the same JD under an
+    existing id returns the stored job, a different JD is a 409.
+    Candidates are then evaluated with POST /jobs/{job_id}/candidates.
+    """
+    if (jd_file is None) == (job_description is None):
+        raise HTTPException(status_code=400, detail="Send either jd_file or job_description")
+    try:
+        jd_text = (await read_file_content(jd_file, document="jd") if jd_file is not None
+                   else normalize_document([job_description], document="jd")[0])
+        if not jd_text:
+            raise HTTPException(status_code=400, detail="The job description is empty")
+        job_id = job_id or uuid.uuid4().hex
+        with cache_bypass(no_cache), ThreadPoolExecutor(max_workers=2) as executor:
+            await load_requisition(executor, job_id, jd_text)
+        return job_response(requisition_store.get_requisition(job_id))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job creation failed: {str(e)}")
+
+@app.post("/jobs/match", response_model=JobMatchResponse)
+async def match_jobs(
+    resume_file: UploadFile = File(...),
+    job_ids: Optional[str] = None,
+    top_k: Optional[int] = None,
+    candidate_id: Optional[str] = None,
+    replace: bool = False,
+    no_cache: bool = False,
+    short_circuit: Optional[bool] = None,
+    tiered: Optional[bool] = None,
+    include_summary: bool = False
+) -> JobMatchResponse:
+    """
+    Rank registered jobs by how well one resume fits them (reverse matching).
+
+    Parameters:
+    - resume_file: Resume file (PDF, DOCX, or TXT), extracted once for all jobs
+    - job_ids: Comma-separated jobs to consider (default: every registered job)
+    - top_k: Return only the best k jobs
+    - candidate_id: Also store each new analysis under this candidate id
+    - replace: Replace a stored analysis of a different resume under candidate_id (otherwise
+      that job is ranked last with the conflict as its error)
+    - include_summary: Write a summary for every job (skipped by default)
+    - no_cache, short_circuit, tiered: As in /analyze
+
+    Jobs are evaluated concurrently, at most REVERSE_MATCH_CONCURRENCY at a time.
+    """
+    try:
+        resume_text = await read_file_content(resume_file)
+        ids = [job_id.strip() for job_id in job_ids.split(',') if job_id.strip()] if job_ids else None
+        requisitions = requisition_store.list_requisitions(ids)
+        if ids:
+            missing = set(ids) - {requisition['id'] for requisition in requisitions}
+            if missing:
+                raise HTTPException(status_code=404, detail=f"Jobs not found: {', '.join(sorted(missing))}")
+
+        with cache_bypass(no_cache), ThreadPoolExecutor(max_workers=1) as executor:
+            matches = await run_in_threadpool(
+                executor, functools.partial(match_requisitions, replace=replace), requisition_store, resume_text,
+                requisitions, candidate_id, short_circuit, tiered, include_summary
+            )
+        if top_k is not None:
+            matches = matches[:top_k]
+        return JobMatchResponse(candidate_id=candidate_id, jobs=[JobMatch(**match) for match in matches])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job matching failed: {str(e)}")
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job_details(job_id: str) -> JobResponse:
+    return job_response(get_job(job_id))
+
+@app.post("/jobs/{job_id}/candidates", response_model=AnalysisView)
+async def evaluate_job_candidate(
+    job_id: str,
+    resume_file: UploadFile = File(...),
+    candidate_id: Optional[str] = None,
+    replace: bool = False,
+    no_cache: bool = False,
+    short_circuit: Optional[bool] = None,
+    tiered: Optional[bool] = None,
+    view: str = "full",
+    fields: Optional[str] = None,
+    deadline_seconds: Optional[float] = None,
+    max_cost_usd: Optional[float] = None,
+    include_summary: bool = True
+):
+    """
+    Analyze a resume against a registered job, using its stored JD, aspects and weights,
+    and store the analysis under candidate_id (default: the file name and a hash of the resume),
+    which is returned with the analysis.
+
+    Other parameters are those of /analyze; a candidate_id that holds the analysis of a different
+    resume is a 409 unless replace is set. A resume that duplicates one already analyzed for
+    the job is served from that analysis.
+    """
+    validate_view(view)
+    requisition = get_job(job_id)
+    try:
+        resume_text = await read_file_content(resume_file)
+        candidate_id = candidate_id or default_candidate_id(resume_file.filename, resume_text)
+        options, plan = analysis_options(short_circuit, tiered, deadline_seconds, max_cost_usd, aspects_ready=True,
+                                         include_summary=include_summary)
+
+        with cache_bypass(no_cache):
+            _, result = find_evaluated_duplicate(requisition_store, job_id, resume_text)
+            if result is None:
+                result = run_analysis(
+                    requisition['jd_text'], resume_text, requisition['aspects'], requisition['weights'], **options
+                )
+            if plan:
+                result['execution']['plan'] = plan
+            requisition_store.save_analysis(job_id, candidate_id, resume_text, result, replace=replace)
+            return CompactJSONResponse({**analysis_response(result, view, fields), 'candidate_id': candidate_id})
+
+    except HTTPException:
+        raise
+    except CandidateConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/jobs/{job_id}/candidates/{candidate_id}/summary", response_model=CandidateSummary)
+async def get_candidate_summary(job_id: str, candidate_id: str, no_cache: bool = False) -> CandidateSummary:
+    """
+    Summary of a stored analysis. One run with include_summary=false is written now and
+    stored with the analysis, so later requests return it without a model call.
+    """
+    analysis = requisition_store.get_candidate_analysis(job_id, candidate_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail=f"No analysis of {candidate_id} for job {job_id}")
+    try:
+        result = analysis['result']
+        if not result.get('overall_summary'):
+            with cache_bypass(no_cache), ThreadPoolExecutor(max_workers=1) as executor:
+                result = await run_in_threadpool(executor, write_summary, result)
+            requisition_store.save_analysis(job_id, candidate_id, analysis['resume_text'], result)
+        return CandidateSummary(job_id=job_id, candidate_id=candidate_id, overall_summary=result['overall_summary'])
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Summary failed: {str(e)}")
+
+@app.get("/jobs/{job_id}/candidates/{candidate_id}/report")
+async def get_candidate_report(job_id: str, candidate_id: str, no_cache: bool = False) -> StreamingResponse:
+    """
+    PDF report of a stored analysis. A missing summary is written and stored first;
+    the PDF is rendered once per analysis version and served from the report cache after that.
+    """
+    analysis = requisition_store.get_candidate_analysis(job_id, candidate_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail=f"No analysis of {candidate_id} for job {job_id}")
+    try:
+        if not analysis['result'].get('overall_summary'):
+            with cache_bypass(no_cache), ThreadPoolExecutor(max_workers=1) as executor:
+                result = await run_in_threadpool(executor, write_summary, analysis['result'])
+            requisition_store.save_analysis(job_id, candidate_id, analysis['resume_text'], result)
+            analysis = requisition_store.get_candidate_analysis(job_id, candidate_id)
+        pdf = await report_service.analysis_report(analysis)
+        return StreamingResponse(
+            iter([pdf]), media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{job_id}_{candidate_id}_report.pdf"'}
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Report failed: {str(e)}")
+
+def ranked_job_analyses(job_id: str) -> List[Dict]:
+    """Stored analyses of a job with their scores view, best overall rating first ("NA" last)."""
+    ranked = [{**analysis, 'scores': analysis_view(analysis['result'], "scores")}
+              for analysis in requisition_store.list_analyses(job_id)]
+    ranked.sort(key=lambda analysis: (isinstance(analysis['scores']['overall_rating'], int),
+                                      analysis['scores']['overall_rating']
+                                      if isinstance(analysis['scores']['overall_rating'], int) else 0),
+                reverse=True)
+    return ranked
+
+@app.get("/jobs/{job_id}/candidates", response_model=List[JobCandidateScores])
+async def list_job_candidates(job_id: str) -> List[JobCandidateScores]:
+    """
+    Section ratings and overall rating of every candidate analyzed for a job, best first.
+    The records can be sent as they are to /rerank to try other weights.
+    """
+    get_job(job_id)
+    return [
+        JobCandidateScores(
+            candidate_id=analysis['candidate_id'],
+            mh_category=analysis['scores']['mh_category'],
+            overall_rating=analysis['scores']['overall_rating'],
+            overall_category=analysis['scores']['overall_category'],
+            **analysis['scores']['section_ratings']
+        )
+        for analysis in ranked_job_analyses(job_id)
+    ]
+
+@app.post("/jobs/{job_id}/skills/coverage", response_model=List[SkillCoverageResult])
+async def get_skill_coverage(job_id: str, resume_files: List[UploadFile] = File(...)) -> List[SkillCoverageResult]:
+    """
+    Coverage of a job's skills checkpoints by each resume, matched against the skills taxonomy
+    without any LLM calls: per checkpoint, the skills it names, which of them the resume shows
+    (directly, by an alias or by a narrower skill) and which are missing.
+    """
+    requisition = get_job(job_id)
+    aspects_text = requisition['aspects'].get('skills', '')
+    if not aspects_text:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} has no skills checkpoints")
+    results = []
+    for resume_file in resume_files:
+        resume_text = await read_file_content(resume_file)
+        results.append(SkillCoverageResult(filename=resume_file.filename,
+                                           **skill_taxonomy.coverage(aspects_text, resume_text)))
+    return results
+
+@app.get("/jobs/{job_id}/report")
+async def get_shortlist_report(job_id: str, top_k: Optional[int] = None,
+                               min_rating: Optional[int] = None) -> StreamingResponse:
+    """
+    Shortlist PDF of a job: a ranking table of its candidates followed by each one's report,
+    best first. top_k and min_rating narrow the shortlist. Candidate reports are rendered in
+    batches in the report workers and the merged document is streamed from a temporary file.
+    """
+    get_job(job_id)
+    analyses = ranked_job_analyses(job_id)
+    if min_rating is not None:
+        analyses = [analysis for analysis in analyses if isinstance(analysis['scores']['overall_rating'], int)
+                    and analysis['scores']['overall_rating'] >= min_rating]
+    if top_k is not None:
+        analyses = analyses[:top_k]
+    if not analyses:
+        raise HTTPException(status_code=404, detail=f"No analyzed candidates for job {job_id} match the filter")
+
+    header = ["Rank", "Candidate", "Overall", "Category", "Experience", "Skills", "Education", "Must-have"]
+    rows = [
+        [rank, analysis['candidate_id'], analysis['scores']['overall_rating'], analysis['scores']['overall_category'],
+         analysis['scores']['section_ratings'].get('experience'), analysis['scores']['section_ratings'].get('skills'),
+         analysis['scores']['section_ratings'].get('education_and_certification'), analysis['scores']['mh_category']]
+        for rank, analysis in enumerate(analyses, start=1)
+    ]
+    try:
+        file = await report_service.shortlist_report(f"Shortlist Report: {job_id}", header, rows, analyses)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Report failed: {str(e)}")
+    return StreamingResponse(
+        iter_file(file), media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}_shortlist.pdf"'}
+    )
+
+@app.get("/exports/analyses")
+async def export_stored_analyses(
+    format: str = "parquet",
+    requisition_id: Optional[List[str]] = Query(None),
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None
+) -> StreamingResponse:
+    """
+    Stored analyses as a Parquet (default) or Arrow IPC file with one flat row per analysis:
+    ratings, categories, weights, per-stage seconds and token counts (see exports.EXPORT_SCHEMA).
+
+    requisition_id (repeatable) limits the export to those requisitions, since and until to
+    analyses updated in that range (ISO dates, until exclusive), min_rating and max_rating
+    to overall ratings in that range.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    for bound in (since, until):
+        if bound is not None:
+            try:
+                datetime.fromisoformat(bound)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"{bound} is not an ISO date")
+
+    file = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            await run_in_threadpool(executor, functools.partial(
+                export_analyses, requisition_store, file, format, requisition_id, since, until, min_rating, max_rating
+            ))
+    except Exception as e:
+        file.close()
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+    file.seek(0)
+    return StreamingResponse(
+        iter_file(file), media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="analyses.{format}"'}
+    )
+
+@app.post("/tasks/analyze", response_model=EnqueueResponse)
+async def enqueue_analyses(
+    jd_file: UploadFile = File(...),
+    resume_files: List[UploadFile] = File(...),
+    no_cache: bool = False,
+    short_circuit: Optional[bool] = None,
+    tiered: Optional[bool] = None,
+    requisition_id: Optional[str] = None,
+    include_summary: bool = True
+):
+    """
+    Queue one analysis task per resume for the worker processes (see worker.py) and return at once.
+
+    Parameters are those of /analyze. Poll GET /tasks/{task_id} and fetch the analysis
+    from GET /tasks/{task_id}/result.
+    """
+    try:
+        jd_text = await read_file_content(jd_file, document="jd")
+        tasks = []
+        for resume_file in resume_files:
+            resume_text = await read_file_content(resume_file)
+            candidate_id = default_candidate_id(resume_file.filename, resume_text)
+            task_id = task_queue.enqueue('analyze', {
+                'jd_text': jd_text,
+                'resume_text': resume_text,
+                'candidate_id': candidate_id,
+                'requisition_id': requisition_id,
+                'no_cache': no_cache,
+                'short_circuit': short_circuit,
+                'tiered': tiered,
+                'include_summary': include_summary
+            })
+            tasks.append(EnqueuedTask(task_id=task_id, candidate_id=candidate_id))
+        return EnqueueResponse(tasks=tasks)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Enqueue failed: {str(e)}")
+
+@app.get("/tasks/stats")
+async def get_task_stats() -> Dict:
+    """Return the number of queued, running, done and failed tasks."""
+    return task_queue.counts()
+
+@app.get("/tasks/{task_id}", response_model=TaskStatus)
+async def get_task_status(task_id: str) -> TaskStatus:
+    task = task_queue.get(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return TaskStatus(**task)
+
+@app.get("/tasks/{task_id}/result", response_model=AnalysisResponse)
+async def get_task_result(task_id: str) -> AnalysisResponse:
+    task = task_queue.get(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    if task['status'] != DONE:
+        detail = f"Task {task_id} is {task['status']}"
+        if task['error']:
+            detail += f": {task['error']}"
+        raise HTTPException(status_code=409, detail=detail)
+    return AnalysisResponse(**task['result'])
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -6,16 +6,18 @@ from exp_agent import CombinedExperienceAgent
 from skills_agent import CombinedSkillsAgent
 from supervisor_agent import SupervisorAgent # Import the SupervisorAgent
 from mh_agent import CombinedMHAgent  # Add import for MH agent
+from mh_rules import MH_SHORT_CIRCUIT
+from skills_taxonomy import skill_taxonomy
+from scoring import ScoringEngine, SECTIONS
 # from mh_agent import CombinedMHAgent # Removed import
 import io
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+from reports import render_report, report_service
+from text_normalizer import normalize_document
 import datetime
 import os
+import re
 from dotenv import load_dotenv
+from llm_cache import response_cache, cache_bypass
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 import io
@@ -34,18 +36,18 @@ model = ChatGoogleGenerativeAI(
     google_api_key=api_key,
     temperature=0.0,
     max_output_tokens=4000,  # Use max_output_tokens instead of max_tokens
-    top_p=1
+    top_p=1,
+    cache=response_cache
 )
 
 # Helper function to extract text from a PDF file
-def extract_text_from_pdf(file):
+def extract_text_from_pdf(file, document="resume"):
     try:
         import PyPDF2
         pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        # Pages are normalized together so repeated headers and footers are recognized
+        text, _ = normalize_document([page.extract_text() for page in pdf_reader.pages], document)
+        return text
     except Exception as e:
         st.error(f"Error reading PDF: {str(e)}")
         return None
@@ -64,7 +66,7 @@ def extract_text_from_docx(file):
         return None
 
 # Function to read content from uploaded files
-def read_file_content(file):
+def read_file_content(file, document="resume"):
     if file is None:
         return None
 
@@ -72,122 +74,32 @@ def read_file_content(file):
 
     try:
         if file_extension == 'pdf':
-            return extract_text_from_pdf(file)
+            return extract_text_from_pdf(file, document)
         elif file_extension == 'docx':
-            return extract_text_from_docx(file)
+            text = extract_text_from_docx(file)
+            return normalize_document([text], document)[0] if text is not None else None
         elif file_extension == 'txt':
-            return file.read().decode('utf-8').strip()
+            return normalize_document([file.read().decode('utf-8')], document)[0]
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
     except Exception as e:
         st.error(f"Error reading file {file.name}: {str(e)}")
         return None
 
-def generate_pdf_report(jd_text, resume_text, edu_result, exp_result, skills_result, mh_result, 
-                       overall_rating, overall_category, weights, overall_summary):
-    """Generate a PDF report of the analysis results."""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    elements = []
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30
-    )
-    elements.append(Paragraph("JD & Resume Analysis Report", title_style))
-    
-    # Date
-    date_style = ParagraphStyle(
-        'DateStyle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.gray
-    )
-    elements.append(Paragraph(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", date_style))
-    elements.append(Spacer(1, 20))
-    
-    # Overall Analysis
-    elements.append(Paragraph("Overall Candidate Analysis", styles['Heading2']))
-    elements.append(Paragraph(f"Overall Rating: {overall_rating}", styles['Normal']))
-    elements.append(Paragraph(f"Category: {overall_category}", styles['Normal']))
-    
-    # Section Weights
-    elements.append(Paragraph("Section Weights:", styles['Heading3']))
-    weight_data = [[section.replace('_', ' ').title(), f"{weight}%"] 
-                   for section, weight in weights.items()]
-    weight_table = Table(weight_data, colWidths=[2*inch, 1*inch])
-    weight_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 12),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    elements.append(weight_table)
-    
-    # Summary
-    elements.append(Paragraph("Summary:", styles['Heading3']))
-    elements.append(Paragraph(overall_summary, styles['Normal']))
-    elements.append(Spacer(1, 20))
-    
-    # Must-Have Analysis
-    if mh_result and "error" not in mh_result:
-        elements.append(Paragraph("Must-Have Requirements Analysis", styles['Heading2']))
-        elements.append(Paragraph("Must-Have Criteria:", styles['Heading3']))
-        elements.append(Paragraph(mh_result['aspects'], styles['Normal']))
-        elements.append(Paragraph("Resume Evidence:", styles['Heading3']))
-        elements.append(Paragraph(mh_result['clarifications'], styles['Normal']))
-        elements.append(Paragraph("Evaluation:", styles['Heading3']))
-        elements.append(Paragraph(mh_result['evaluation'], styles['Normal']))
-        elements.append(Spacer(1, 20))
-    
-    # Education Analysis
-    if edu_result and "error" not in edu_result:
-        elements.append(Paragraph("Education Analysis", styles['Heading2']))
-        elements.append(Paragraph("Education Criteria:", styles['Heading3']))
-        elements.append(Paragraph(edu_result['aspects'], styles['Normal']))
-        elements.append(Paragraph("Resume Education Details:", styles['Heading3']))
-        elements.append(Paragraph(edu_result['clarifications'], styles['Normal']))
-        elements.append(Paragraph("Education Match Score:", styles['Heading3']))
-        elements.append(Paragraph(edu_result['evaluation'], styles['Normal']))
-        elements.append(Spacer(1, 20))
-    
-    # Experience Analysis
-    if exp_result and "error" not in exp_result:
-        elements.append(Paragraph("Experience Analysis", styles['Heading2']))
-        elements.append(Paragraph("Experience Criteria:", styles['Heading3']))
-        elements.append(Paragraph(exp_result['aspects'], styles['Normal']))
-        elements.append(Paragraph("Resume Experience Details:", styles['Heading3']))
-        elements.append(Paragraph(exp_result['clarifications'], styles['Normal']))
-        elements.append(Paragraph("Experience Match Score:", styles['Heading3']))
-        elements.append(Paragraph(exp_result['evaluation'], styles['Normal']))
-        elements.append(Spacer(1, 20))
-    
-    # Skills Analysis
-    if skills_result and "error" not in skills_result:
-        elements.append(Paragraph("Skills Analysis", styles['Heading2']))
-        elements.append(Paragraph("Skills Criteria:", styles['Heading3']))
-        elements.append(Paragraph(skills_result['aspects'], styles['Normal']))
-        elements.append(Paragraph("Resume Skills Details:", styles['Heading3']))
-        elements.append(Paragraph(skills_result['clarifications'], styles['Normal']))
-        elements.append(Paragraph("Skills Match Score:", styles['Heading3']))
-        elements.append(Paragraph(skills_result['evaluation'], styles['Normal']))
-    
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
+def extract_section_rating(evaluation_str, section_name):
+    """Read the rating from an agent evaluation ("... Rating: 85 ..."); 0 if there is none."""
+    # Remove any leading dashes or spaces
+    evaluation_str = evaluation_str.lstrip('-').strip()
+    if 'Rating:' in evaluation_str:
+        try:
+            rating_part = evaluation_str.split('Rating:')[-1].strip()
+            # Extract first number found
+            numbers = re.findall(r'\d+', rating_part)
+            if numbers:
+                return int(numbers[0])
+        except Exception as e:
+            st.error(f"Error extracting {section_name} rating: {str(e)}")
+    return 0
 
 # Streamlit application
 def main():
@@ -199,7 +111,7 @@ def main():
     with col1:
         jd_file = st.file_uploader("Upload Job Description (PDF, DOCX, or TXT)", type=['pdf', 'docx', 'txt'])
         if jd_file:
-            st.session_state['jd_text'] = read_file_content(jd_file)
+            st.session_state['jd_text'] = read_file_content(jd_file, document="jd")
             st.text_area("Job Description Content", st.session_state.get('jd_text', ''), height=300)
 
     with col2:
@@ -208,39 +120,68 @@ def main():
             st.session_state['resume_text'] = read_file_content(resume_file)
             st.text_area("Resume Content", st.session_state.get('resume_text', ''), height=300)
 
+    with st.sidebar:
+        bypass_cache = st.checkbox("Bypass response cache", value=False,
+                                   help="Re-run every model call instead of reusing cached responses.")
+        short_circuit = st.checkbox("Stop early on failed must-haves", value=MH_SHORT_CIRCUIT,
+                                    help="Skip the education, experience and skills agents when a must-have clearly fails.")
+        write_summary = st.checkbox("Write summary", value=True,
+                                    help="Skip the summary model call; it is written if a PDF report is prepared.")
+        cache_stats = response_cache.get_stats()
+        st.caption(f"Response cache: {cache_stats['hits'] + cache_stats['disk_hits']} hits, "
+                   f"{cache_stats['misses']} misses ({cache_stats['entries']} entries)")
+
     if st.button("Analyze"):
         if jd_file and resume_file:
-            with st.spinner("Analyzing documents..."):
+            with st.spinner("Analyzing documents..."), cache_bypass(bypass_cache):
                 # First, generate aspects for all sections
                 aspects_agent = AspectsAgent()
                 aspects = aspects_agent.generate_all_aspects(st.session_state['jd_text'])
-                
-                # Now use these aspects in each agent
-                edu_agent = CombinedEducationAgent()
-                edu_result = edu_agent.run(st.session_state['jd_text'], st.session_state['resume_text'], aspects)
-
-                exp_result = None
-                if CombinedExperienceAgent:
-                    exp_agent = CombinedExperienceAgent()
-                    exp_result = exp_agent.run(st.session_state['jd_text'], st.session_state['resume_text'], aspects)
-                else:
-                    st.warning("Experience analysis will be skipped as exp_agent.py was not found.")
-
-                skills_result = None
-                if CombinedSkillsAgent:
-                    skills_agent = CombinedSkillsAgent()
-                    skills_result = skills_agent.run(st.session_state['jd_text'], st.session_state['resume_text'], aspects)
-                else:
-                    st.warning("Skills analysis will be skipped as skills_agent.py was not found.")
 
-                # Add MH agent analysis
+                # Taxonomy skill coverage needs no model call, so it is shown before the agents run
+                coverage = skill_taxonomy.coverage(aspects.get('skills', ''), st.session_state['resume_text'])
+                if coverage['coverage'] is not None:
+                    st.subheader("🔎 Skill Coverage")
+                    st.caption(f"{coverage['coverage']:.0%} of the skills named in the checkpoints were found in the resume.")
+                    st.table({
+                        'Checkpoint': [entry['checkpoint'] for entry in coverage['checkpoints']],
+                        'Found': [", ".join(entry['found']) for entry in coverage['checkpoints']],
+                        'Missing': [", ".join(entry['missing']) for entry in coverage['checkpoints']],
+                    })
+
+                # Must-haves first: clear rule-based failures can skip the other agents
                 mh_result = None
                 if CombinedMHAgent:
                     mh_agent = CombinedMHAgent()
-                    mh_result = mh_agent.run(st.session_state['jd_text'], st.session_state['resume_text'], aspects)
+                    mh_result = mh_agent.run(st.session_state['jd_text'], st.session_state['resume_text'], aspects,
+                                             use_rules=short_circuit)
                 else:
                     st.warning("Must-Have analysis will be skipped as mh_agent.py was not found.")
 
+                if (short_circuit and mh_result and mh_result.get('source') == 'rules'
+                        and "Category III" in mh_result.get('evaluation', '')):
+                    st.info("Candidate clearly misses a must-have requirement; education, experience and skills analysis skipped.")
+                    skipped = {"error": "Skipped because the candidate does not meet the must-have requirements."}
+                    edu_result, exp_result, skills_result = dict(skipped), dict(skipped), dict(skipped)
+                else:
+                    # Now use these aspects in each agent
+                    edu_agent = CombinedEducationAgent()
+                    edu_result = edu_agent.run(st.session_state['jd_text'], st.session_state['resume_text'], aspects)
+
+                    exp_result = None
+                    if CombinedExperienceAgent:
+                        exp_agent = CombinedExperienceAgent()
+                        exp_result = exp_agent.run(st.session_state['jd_text'], st.session_state['resume_text'], aspects)
+                    else:
+                        st.warning("Experience analysis will be skipped as exp_agent.py was not found.")
+
+                    skills_result = None
+                    if CombinedSkillsAgent:
+                        skills_agent = CombinedSkillsAgent()
+                        skills_result = skills_agent.run(st.session_state['jd_text'], st.session_state['resume_text'], aspects)
+                    else:
+                        st.warning("Skills analysis will be skipped as skills_agent.py was not found.")
+
                 supervisor_agent = SupervisorAgent()
                 weights, weight_reasoning = supervisor_agent.get_section_weights(st.session_state['jd_text'])
 
@@ -248,59 +189,23 @@ def main():
                 if edu_result and "evaluation" in edu_result:
                     evaluation_str = edu_result['evaluation']
                     if isinstance(evaluation_str, str):
-                        # Remove any leading dashes or spaces
-                        evaluation_str = evaluation_str.lstrip('-').strip()
-                        # Try to find rating in different formats
-                        if 'Rating:' in evaluation_str:
-                            try:
-                                rating_part = evaluation_str.split('Rating:')[-1].strip()
-                                # Extract first number found
-                                import re
-                                numbers = re.findall(r'\d+', rating_part)
-                                if numbers:
-                                    edu_rating = int(numbers[0])
-                            except Exception as e:
-                                st.error(f"Error extracting education rating: {str(e)}")
+                        edu_rating = extract_section_rating(evaluation_str, "education")
 
                 exp_rating = 0
                 exp_rationale = ""
                 if exp_result and "evaluation" in exp_result:
                     evaluation_str = exp_result['evaluation']
                     if isinstance(evaluation_str, str):
-                        # Remove any leading dashes or spaces
-                        evaluation_str = evaluation_str.lstrip('-').strip()
-                        # Try to find rating in different formats
-                        if 'Rating:' in evaluation_str:
-                            try:
-                                rating_part = evaluation_str.split('Rating:')[-1].strip()
-                                # Extract first number found
-                                import re
-                                numbers = re.findall(r'\d+', rating_part)
-                                if numbers:
-                                    exp_rating = int(numbers[0])
-                            except Exception as e:
-                                st.error(f"Error extracting experience rating: {str(e)}")
-                        exp_rationale = evaluation_str
+                        exp_rating = extract_section_rating(evaluation_str, "experience")
+                        exp_rationale = evaluation_str.lstrip('-').strip()
 
                 skills_rating = 0
                 skills_rationale = ""
                 if skills_result and "evaluation" in skills_result:
                     evaluation_str = skills_result['evaluation']
                     if isinstance(evaluation_str, str):
-                        # Remove any leading dashes or spaces
-                        evaluation_str = evaluation_str.lstrip('-').strip()
-                        # Try to find rating in different formats
-                        if 'Rating:' in evaluation_str:
-                            try:
-                                rating_part = evaluation_str.split('Rating:')[-1].strip()
-                                # Extract first number found
-                                import re
-                                numbers = re.findall(r'\d+', rating_part)
-                                if numbers:
-                                    skills_rating = int(numbers[0])
-                            except Exception as e:
-                                st.error(f"Error extracting skills rating: {str(e)}")
-                        skills_rationale = evaluation_str
+                        skills_rating = extract_section_rating(evaluation_str, "skills")
+                        skills_rationale = evaluation_str.lstrip('-').strip()
 
 
                 # Overall Score Calculation
@@ -323,11 +228,41 @@ def main():
                     mh_category=mh_category
                 )
 
-                overall_summary = supervisor_agent.generate_summary(
-                    experience_rationale=exp_rationale,
-                    skills_rationale=skills_rationale,
-                    education_rationale=edu_result.get('evaluation', '') if edu_result else ''
-                )
+                overall_summary = ''
+                if write_summary:
+                    overall_summary = supervisor_agent.generate_summary(
+                        experience_rationale=exp_rationale,
+                        skills_rationale=skills_rationale,
+                        education_rationale=edu_result.get('evaluation', '') if edu_result else ''
+                    )
+
+                # The PDF report is only built when asked for (see render_report_download)
+                st.session_state['last_analysis'] = {
+                    'jd_text': st.session_state['jd_text'],
+                    'resume_text': st.session_state['resume_text'],
+                    'edu_result': edu_result,
+                    'exp_result': exp_result,
+                    'skills_result': skills_result,
+                    'mh_result': mh_result,
+                    'overall_rating': overall_rating,
+                    'overall_category': overall_category,
+                    'weights': weights,
+                    'overall_summary': overall_summary
+                }
+                st.session_state['last_report'] = None
+
+                # Keep the ratings so candidates can be re-weighted without re-running the agents
+                if st.session_state.get('screened_jd') != st.session_state['jd_text']:
+                    st.session_state['screened_jd'] = st.session_state['jd_text']
+                    st.session_state['screened_candidates'] = {}
+                st.session_state['screened_weights'] = weights
+                st.session_state['screened_candidates'][resume_file.name] = {
+                    'candidate_id': resume_file.name,
+                    'experience': exp_rating,
+                    'skills': skills_rating,
+                    'education_and_certification': edu_rating,
+                    'mh_category': mh_category
+                }
 
                 # Display results
                 st.header("Overall Candidate Analysis")
@@ -335,30 +270,9 @@ def main():
                 st.write(f"**Section Weights:**")
                 for section, weight in weights.items():
                     st.write(f"- {section.replace('_', ' ').title()}: {weight}%")
-                st.subheader("Summary")
-                st.write(overall_summary)
-
-                # Generate PDF report
-                pdf_buffer = generate_pdf_report(
-                    jd_text=st.session_state['jd_text'],
-                    resume_text=st.session_state['resume_text'],
-                    edu_result=edu_result,
-                    exp_result=exp_result,
-                    skills_result=skills_result,
-                    mh_result=mh_result,
-                    overall_rating=overall_rating,
-                    overall_category=overall_category,
-                    weights=weights,
-                    overall_summary=overall_summary
-                )
-
-                # Add download report button
-                st.download_button(
-                    label="📥 Download Analysis Report",
-                    data=pdf_buffer,
-                    file_name=f"resume_analysis_report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                    mime="application/pdf"
-                )
+                if overall_summary:
+                    st.subheader("Summary")
+                    st.write(overall_summary)
 
                 # Add Must-Have Analysis Results section
                 if mh_result:
@@ -429,5 +343,52 @@ def main():
         else:
             st.warning("Please upload both a job description and resume.")
 
+    render_report_download()
+    render_reweighting()
+
+def render_report_download():
+    """Build the PDF report of the last analysis on request, writing its summary first if it was skipped."""
+    analysis = st.session_state.get('last_analysis')
+    if not analysis:
+        return
+
+    st.header("Analysis Report")
+    if st.session_state.get('last_report') is None and st.button("📄 Prepare PDF Report"):
+        with st.spinner("Building report..."):
+            if not analysis['overall_summary']:
+                analysis['overall_summary'] = SupervisorAgent().generate_summary(
+                    experience_rationale=(analysis['exp_result'] or {}).get('evaluation', ''),
+                    skills_rationale=(analysis['skills_result'] or {}).get('evaluation', ''),
+                    education_rationale=(analysis['edu_result'] or {}).get('evaluation', '')
+                )
+            st.session_state['last_report'] = report_service.render(render_report, **analysis)
+
+    if st.session_state.get('last_report') is not None:
+        st.download_button(
+            label="📥 Download Analysis Report",
+            data=st.session_state['last_report'],
+            file_name=f"resume_analysis_report_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+            mime="application/pdf"
+        )
+
+def render_reweighting():
+    """Re-rank the candidates analyzed for the current JD under manually adjusted weights."""
+    candidates = st.session_state.get('screened_candidates')
+    if not candidates:
+        return
+
+    st.header("Re-weight Candidates")
+    st.caption("Adjust the section weights or the must-have penalty; ratings are re-computed locally without new analysis.")
+    llm_weights = st.session_state.get('screened_weights', {})
+    columns = st.columns(len(SECTIONS) + 1)
+    weights = {}
+    for column, section in zip(columns, SECTIONS):
+        weights[section] = column.slider(section.replace('_', ' ').title(), 0, 100,
+                                         int(llm_weights.get(section, 33)), key=f"weight_{section}")
+    mh_penalty = columns[-1].slider("Must-have penalty", 0, 50, 20, key="mh_penalty")
+
+    engine = ScoringEngine.from_records(candidates.values())
+    st.table(engine.score(weights, mh_penalty=mh_penalty))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,100 @@
+# applicant_dedup.py
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from llm_cache import cache_bypassed
+from minhash import minhasher, normalize_text, content_hash, shingles, similarity, band_keys, has_fingerprint
+from requisition_store import RequisitionStore
+
+# Load environment variables
+load_dotenv()
+
+# Serve repeat applications (same or near-identical resume text) from an existing evaluation
+RESUME_DEDUP_ENABLED = os.getenv("RESUME_DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Minimum estimated Jaccard similarity of two resumes' word shingles to count as duplicates
+RESUME_DEDUP_THRESHOLD = float(os.getenv("RESUME_DEDUP_THRESHOLD", "0.9"))
+
+
+class DuplicateIndex:
+    """
+    Incremental duplicate detection over resumes seen one at a time: an exact-hash map and
+    MinHash LSH buckets of the first copies. Not thread-safe; callers sharing one lock it.
+    """
+
+    def __init__(self, threshold: float = RESUME_DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._first_by_hash: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, str], List[int]] = defaultdict(list)
+        self._signatures: Dict[int, object] = {}
+        self._keys: List[object] = []
+
+    def check(self, key, text: str) -> Optional[Dict]:
+        """
+        {'key', 'similarity', 'method'} of the earliest indexed resume text duplicates: "exact"
+        when the texts match apart from case, spacing and punctuation, "minhash" when an LSH
+        candidate's estimated similarity reaches threshold. Otherwise None, and text is indexed
+        under key. Resumes without text (e.g. failed extractions) are never duplicates, nor duplicated.
+        """
+        normalized = normalize_text(text)
+        if not shingles(normalized):
+            return None
+        digest = content_hash(text)
+        if digest in self._first_by_hash:
+            return {'key': self._keys[self._first_by_hash[digest]], 'similarity': 1.0, 'method': 'exact'}
+
+        signature = minhasher.signature(shingles(normalized))
+        bands = list(enumerate(band_keys(signature)))
+        best, best_order = None, None
+        for order in {order for band in bands for order in self._buckets[band]}:
+            score = similarity(signature, self._signatures[order])
+            if score >= self.threshold and (best is None or (score, -order) > (best['similarity'], -best_order)):
+                best, best_order = {'key': self._keys[order], 'similarity': round(score, 4), 'method': 'minhash'}, order
+        if best is None:
+            # Only first copies are indexed, so every duplicate points at one of them
+            order = len(self._keys)
+            self._keys.append(key)
+            self._first_by_hash[digest] = order
+            self._signatures[order] = signature
+            for band in bands:
+                self._buckets[band].append(order)
+        return best
+
+
+def find_batch_duplicates(texts: List[str], threshold: float = RESUME_DEDUP_THRESHOLD) -> List[Optional[Dict]]:
+    """
+    Flag resumes in a batch that duplicate an earlier one.
+
+    Entry i is None for the first copy of a resume, or {'index', 'similarity', 'method'}
+    pointing at the earliest copy (see DuplicateIndex.check).
+    """
+    index = DuplicateIndex(threshold)
+    duplicates: List[Optional[Dict]] = []
+    for position, text in enumerate(texts):
+        match = index.check(position, text)
+        duplicates.append({'index': match.pop('key'), **match} if match else None)
+    return duplicates
+
+
+def find_evaluated_duplicate(store: RequisitionStore, requisition_id: Optional[str],
+                             resume_text: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """
+    Look for an analysis already stored for the requisition whose resume duplicates resume_text.
+
+    Returns (match, result): match names the stored candidate_id, similarity and method;
+    result is that analysis, marked as served from it. (None, None) without a requisition,
+    when dedup is off or no_cache asked for a fresh evaluation.
+    """
+    if not (RESUME_DEDUP_ENABLED and requisition_id and has_fingerprint(resume_text)) or cache_bypassed():
+        return None, None
+    match = store.find_duplicate_analysis(requisition_id, resume_text, RESUME_DEDUP_THRESHOLD)
+    if not match:
+        return None, None
+    analysis = store.get_analysis(match.pop('analysis_id'))
+    match['source'] = 'requisition'
+    return match, duplicate_result(analysis['result'], match)
+
+
+def duplicate_result(result: Dict, match: Dict) -> Dict:
+    """Copy of another candidate's analysis for a duplicate resume; execution records where it came from."""
+    return {**result, 'execution': {'stage_seconds': {}, 'duplicate_of': match}}
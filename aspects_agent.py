@@ -3,6 +3,7 @@ from langchain.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
+from llm_cache import response_cache
 from typing import Dict
 
 # Load environment variables
@@ -19,7 +20,8 @@ model = ChatGoogleGenerativeAI(
     google_api_key=api_key,
     temperature=0.0,
     max_output_tokens=4000,  # Use max_output_tokens instead of max_tokens
-    top_p=1
+    top_p=1,
+    cache=response_cache
 )
 
 class AspectsAgent:
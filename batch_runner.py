@@ -0,0 +1,307 @@
+# batch_runner.py
+import os
+import csv
+import json
+import argparse
+import threading
+import contextvars
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+from llm_cache import cache_bypass, cache_bypassed
+from uploads import open_local_file, extract_text
+from response_views import analysis_view
+from aspects_agent import AspectsAgent
+from supervisor_agent import SupervisorAgent
+from pipeline import run_analysis, prepare_requisition, match_job_description
+from applicant_dedup import DuplicateIndex, duplicate_result, find_evaluated_duplicate, RESUME_DEDUP_ENABLED
+from requisition_store import RequisitionStore
+
+# Load environment variables
+load_dotenv()
+
+# Resumes evaluated at once
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+# Resumes read ahead of the running evaluations; bounds the texts held in memory
+BATCH_PREFETCH = int(os.getenv("BATCH_PREFETCH", "4"))
+
+# Columns of the compact score record kept in memory and written to the CSV sink
+SCORE_FIELDS = [
+    'candidate_id', 'overall_rating', 'overall_category', 'experience', 'skills',
+    'education_and_certification', 'mh_category', 'duplicate_of', 'error',
+]
+
+
+def score_record(candidate_id: str, result: Optional[Dict] = None, error: Optional[str] = None) -> Dict:
+    """Ratings and categories of one analysis, without its aspects, clarifications or evaluations."""
+    record = dict.fromkeys(SCORE_FIELDS)
+    record['candidate_id'] = candidate_id
+    record['error'] = error
+    if result is not None:
+        scores = analysis_view(result, "scores")
+        record.update(scores['section_ratings'])
+        record.update(overall_rating=scores['overall_rating'], overall_category=scores['overall_category'],
+                      mh_category=scores['mh_category'])
+        duplicate_of = (result.get('execution') or {}).get('duplicate_of')
+        record['duplicate_of'] = duplicate_of['candidate_id'] if duplicate_of else None
+    return record
+
+
+class ResultSink:
+    """
+    Append-only JSONL file of full results, one {"candidate_id", "result", "error"} line per
+    finished candidate, plus an optional CSV of score records.
+
+    Each line is flushed to disk as it is written, so a crashed run loses at most the
+    candidate being written. Opening an existing sink drops a torn last line, and
+    completed() tells the run which candidates to skip, and result() reads a full result
+    back. The JSONL file is the source of truth: the CSV is rewritten from it on open, then
+    appended to.
+    """
+
+    def __init__(self, jsonl_path: str, csv_path: Optional[str] = None):
+        self.jsonl_path = jsonl_path
+        self.csv_path = csv_path
+        # Byte offset of each candidate's latest successful line
+        self._offsets: Dict[str, int] = {}
+        self.records = self._recover()
+        self._jsonl = open(jsonl_path, "a", encoding="utf-8")
+        self._csv = None
+        if csv_path:
+            self._csv = open(csv_path, "w", encoding="utf-8", newline="")
+            self._csv_writer = csv.DictWriter(self._csv, fieldnames=SCORE_FIELDS)
+            self._csv_writer.writeheader()
+            self._csv_writer.writerows(self.records.values())
+            self._csv.flush()
+
+    def _recover(self) -> Dict[str, Dict]:
+        """Score records of the results already in the JSONL file, reading one line at a time."""
+        records: Dict[str, Dict] = {}
+        if not os.path.exists(self.jsonl_path):
+            return records
+        with open(self.jsonl_path, "rb+") as file:
+            offset = 0
+            for line in iter(file.readline, b""):
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    entry = json.loads(line)
+                except ValueError:
+                    # Only the last line can be torn by a crash
+                    print(f"Dropping a partial result at byte {offset} of {self.jsonl_path}")
+                    file.truncate(offset)
+                    break
+                # A later line for the same candidate (a retry after an error) replaces the earlier one
+                records[entry['candidate_id']] = score_record(entry['candidate_id'], entry.get('result'), entry.get('error'))
+                if entry.get('error') is None:
+                    self._offsets[entry['candidate_id']] = offset
+                offset += len(line)
+        return records
+
+    def completed(self) -> Set[str]:
+        """Candidates with a result; failed ones are run again."""
+        return {candidate_id for candidate_id, record in self.records.items() if record['error'] is None}
+
+    def write(self, candidate_id: str, result: Optional[Dict] = None, error: Optional[str] = None) -> Dict:
+        """Append one candidate's result (or error) and keep only its score record."""
+        if error is None:
+            self._offsets[candidate_id] = self._jsonl.tell()
+        else:
+            self._offsets.pop(candidate_id, None)
+        self._jsonl.write(json.dumps({'candidate_id': candidate_id, 'result': result, 'error': error},
+                                     separators=(",", ":")) + "\n")
+        self._jsonl.flush()
+        os.fsync(self._jsonl.fileno())
+        record = score_record(candidate_id, result, error)
+        self.records[candidate_id] = record
+        if self._csv:
+            self._csv_writer.writerow(record)
+            self._csv.flush()
+        return record
+
+    def result(self, candidate_id: str) -> Optional[Dict]:
+        """A candidate's full result, read back from the JSONL file; None without a successful one."""
+        offset = self._offsets.get(candidate_id)
+        if offset is None:
+            return None
+        with open(self.jsonl_path, "rb") as file:
+            file.seek(offset)
+            return json.loads(file.readline())['result']
+
+    def ranked(self) -> List[Dict]:
+        """Score records, best overall rating first; failures and "NA" ratings last."""
+        return sorted(self.records.values(),
+                      key=lambda record: (isinstance(record['overall_rating'], int),
+                                          record['overall_rating'] if isinstance(record['overall_rating'], int) else 0),
+                      reverse=True)
+
+    def close(self) -> None:
+        self._jsonl.close()
+        if self._csv:
+            self._csv.close()
+
+
+def resume_paths(directory: str) -> Iterator[str]:
+    """Files of a directory in name order."""
+    for name in sorted(entry.name for entry in os.scandir(directory) if entry.is_file()):
+        yield os.path.join(directory, name)
+
+
+def read_document(path: str, document: str = "resume") -> str:
+    upload = open_local_file(path)
+    try:
+        return extract_text(upload, document)
+    finally:
+        upload.close()
+
+
+def run_batch(jd_text: str, paths: Iterable[str], sink: ResultSink, store: Optional[RequisitionStore] = None,
+              requisition_id: Optional[str] = None, short_circuit: Optional[bool] = None,
+              tiered: Optional[bool] = None, include_summary: bool = True,
+              concurrency: int = BATCH_CONCURRENCY, prefetch: int = BATCH_PREFETCH,
+              replace: bool = False) -> List[Dict]:
+    """
+    Evaluate resume files against one JD, writing each result to the sink as soon as it
+    finishes, and return the ranked score records.
+
+    Aspects and weights are computed once (or loaded from the requisition). At most
+    concurrency + prefetch resumes are held in memory at any time, whatever the batch size;
+    finished results are only kept as score records. Candidates (file names) the sink
+    already holds a result for are skipped, so a crashed run is resumed by running it again.
+
+    A resume that duplicates an earlier one of the batch (RESUME_DEDUP_ENABLED) is not
+    analyzed: once the earlier copy's result is written, the duplicate is served from it, read
+    back from the sink; if the earlier copy fails, the duplicate is analyzed after all.
+    With requisition_id, every analysis, duplicates included, is stored under the requisition
+    (by file name; a stored analysis of a different resume under that name is only replaced
+    with replace), and resumes that duplicate one already analyzed for it are served from that analysis.
+    """
+    store = store or RequisitionStore()
+    if requisition_id:
+        aspects, weights = prepare_requisition(store, requisition_id, jd_text)
+    else:
+        _, duplicate = match_job_description(store, jd_text)
+        if duplicate:
+            aspects, weights = duplicate['aspects'], duplicate['weights']
+        else:
+            aspects = AspectsAgent().generate_all_aspects(jd_text)
+            weights, _ = SupervisorAgent().get_section_weights(jd_text)
+
+    # First copies of the resumes read so far; the check runs in the worker threads as each is read
+    batch_index = DuplicateIndex() if RESUME_DEDUP_ENABLED and not cache_bypassed() else None
+    index_lock = threading.Lock()
+
+    def evaluate(path: str, batch_dedup: bool = True) -> Tuple[str, Optional[Dict], Optional[Dict]]:
+        """(resume text, batch duplicate match, result); a batch duplicate has no result yet."""
+        resume_text = read_document(path)
+        if batch_index is not None and batch_dedup:
+            with index_lock:
+                match = batch_index.check(os.path.basename(path), resume_text)
+            if match:
+                return resume_text, match, None
+        _, result = find_evaluated_duplicate(store, requisition_id, resume_text)
+        if result is None:
+            result = run_analysis(jd_text, resume_text, aspects, weights, short_circuit=short_circuit,
+                                  tiered=tiered, include_summary=include_summary)
+        return resume_text, None, result
+
+    done = sink.completed()
+    pending = {}
+    # Earlier copy -> (path, match, resume text) of the duplicates waiting for its result
+    waiting: Dict[str, List[Tuple[str, Dict, str]]] = defaultdict(list)
+    failed: Set[str] = set()
+    skipped = written = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        def submit(path: str, batch_dedup: bool = True) -> None:
+            # Each evaluation keeps the caller's context (e.g. the cache bypass flag)
+            future = executor.submit(contextvars.copy_context().run, evaluate, path, batch_dedup)
+            pending[future] = path
+
+        def finish(path: str, resume_text: str, result: Optional[Dict] = None, error: Optional[str] = None) -> None:
+            nonlocal written
+            candidate_id = os.path.basename(path)
+            if result is not None and requisition_id:
+                try:
+                    store.save_analysis(requisition_id, candidate_id, resume_text, result, replace=replace)
+                except Exception as e:
+                    result, error = None, str(e)
+            if error is not None:
+                print(f"Error analyzing {candidate_id}: {error}")
+                failed.add(candidate_id)
+            sink.write(candidate_id, result=result, error=error)
+            written += 1
+            for duplicate_path, match, duplicate_text in waiting.pop(candidate_id, []):
+                if error is None:
+                    serve(duplicate_path, match, duplicate_text)
+                else:
+                    submit(duplicate_path, batch_dedup=False)
+
+        def serve(path: str, match: Dict, resume_text: str) -> None:
+            source = match['key']
+            if source in failed:
+                submit(path, batch_dedup=False)
+                return
+            result = sink.result(source)
+            if result is None:
+                # The earlier copy has not finished yet
+                waiting[source].append((path, match, resume_text))
+                return
+            finish(path, resume_text, duplicate_result(result, {
+                'candidate_id': source, 'similarity': match['similarity'], 'method': match['method'], 'source': 'batch'
+            }))
+
+        def drain(return_when) -> None:
+            finished, _ = wait(pending, return_when=return_when)
+            for future in finished:
+                path = pending.pop(future)
+                try:
+                    resume_text, match, result = future.result()
+                except Exception as e:
+                    finish(path, "", error=str(e))
+                    continue
+                if match:
+                    serve(path, match, resume_text)
+                else:
+                    finish(path, resume_text, result)
+
+        for path in paths:
+            if os.path.basename(path) in done:
+                skipped += 1
+                continue
+            if len(pending) >= concurrency + prefetch:
+                drain(FIRST_COMPLETED)
+            submit(path)
+        # Duplicates of a failed copy are submitted again while draining
+        while pending:
+            drain(FIRST_COMPLETED)
+
+    print(f"Batch finished: {written} written, {skipped} already in {sink.jsonl_path}")
+    return sink.ranked()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate a directory of resumes against a JD, streaming results to disk")
+    parser.add_argument("jd", help="Job description file (PDF, DOCX or text)")
+    parser.add_argument("resumes", help="Directory of resume files")
+    parser.add_argument("--output", required=True, help="JSONL file of full results; an existing one is resumed")
+    parser.add_argument("--csv", help="CSV file of score records")
+    parser.add_argument("--requisition-id", help="Store analyses under this requisition")
+    parser.add_argument("--replace", action="store_true",
+                        help="Replace stored analyses of different resumes with the same file name")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument("--no-summary", action="store_true", help="Skip the overall summaries")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the LLM response cache")
+    parser.add_argument("--top", type=int, default=10, help="Number of top candidates to print")
+    args = parser.parse_args()
+
+    sink = ResultSink(args.output, args.csv)
+    try:
+        with cache_bypass(args.no_cache):
+            ranked = run_batch(read_document(args.jd, "jd"), resume_paths(args.resumes), sink,
+                               requisition_id=args.requisition_id, include_summary=not args.no_summary,
+                               concurrency=args.concurrency, replace=args.replace)
+    finally:
+        sink.close()
+    for rank, record in enumerate(ranked[:args.top], start=1):
+        print(f"{rank}. {record['candidate_id']}: {record['overall_rating']} ({record['overall_category'] or record['error']})")
@@ -0,0 +1,49 @@
+# benchmarks/bench_extract.py
+import io
+import tempfile
+
+import pytest
+
+import app
+from conftest import RESUME_PAGES
+from uploads import SpooledUpload, extract_text, sniff_kind
+
+KINDS = ("pdf", "docx", "txt")
+
+
+def spooled(data: bytes, filename: str) -> SpooledUpload:
+    target = tempfile.TemporaryFile()
+    target.write(data)
+    target.flush()
+    return SpooledUpload(filename, target, len(data), "", sniff_kind(data[:4096]))
+
+
+@pytest.mark.parametrize("size", RESUME_PAGES)
+@pytest.mark.parametrize("kind", KINDS)
+def bench_api_extract_text(benchmark, corpus, kind, size):
+    """API path: mmap the spooled upload and parse it by sniffed kind."""
+    resume = corpus["resumes"][size]
+    data = resume["text"].encode("utf-8") if kind == "txt" else resume[kind]
+    upload = spooled(data, f"resume.{kind}")
+    benchmark.extra_info.update({"bytes": len(data), "pages": resume["pages"]})
+    try:
+        text = benchmark(extract_text, upload)
+    finally:
+        upload.close()
+    assert "Jane Doe" in text
+
+
+@pytest.mark.parametrize("size", RESUME_PAGES)
+def bench_app_extract_text_from_pdf(benchmark, corpus, size):
+    data = corpus["resumes"][size]["pdf"]
+    benchmark.extra_info.update({"bytes": len(data), "pages": corpus["resumes"][size]["pages"]})
+    text = benchmark(lambda: app.extract_text_from_pdf(io.BytesIO(data)))
+    assert "Jane Doe" in text
+
+
+@pytest.mark.parametrize("size", RESUME_PAGES)
+def bench_app_extract_text_from_docx(benchmark, corpus, size):
+    data = corpus["resumes"][size]["docx"]
+    benchmark.extra_info.update({"bytes": len(data), "pages": corpus["resumes"][size]["pages"]})
+    text = benchmark(lambda: app.extract_text_from_docx(io.BytesIO(data)))
+    assert "Jane Doe" in text
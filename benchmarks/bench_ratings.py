@@ -0,0 +1,49 @@
+# benchmarks/bench_ratings.py
+import pytest
+
+import api
+import app
+from conftest import evaluation_text
+from pipeline import extract_rating
+from supervisor_agent import SupervisorAgent
+
+# Rationale paragraphs before the "Rating:" line
+EVALUATION_PARAGRAPHS = {"short": 1, "medium": 8, "long": 60}
+WEIGHTS = {"experience": 45, "skills": 35, "education_and_certification": 20}
+# (education, experience, skills) ratings and must-have category of each scored candidate
+CANDIDATES = [((60 + i % 40), (30 + i * 7 % 70), (50 + i * 3 % 50), ("III" if i % 5 == 0 else "I"))
+              for i in range(1000)]
+
+
+@pytest.mark.parametrize("length", EVALUATION_PARAGRAPHS)
+def bench_pipeline_extract_rating(benchmark, length):
+    evaluation = evaluation_text(82, EVALUATION_PARAGRAPHS[length])
+    benchmark.extra_info["chars"] = len(evaluation)
+    assert benchmark(extract_rating, evaluation) == 82
+
+
+@pytest.mark.parametrize("length", EVALUATION_PARAGRAPHS)
+def bench_app_extract_section_rating(benchmark, length):
+    evaluation = evaluation_text(82, EVALUATION_PARAGRAPHS[length])
+    benchmark.extra_info["chars"] = len(evaluation)
+    assert benchmark(app.extract_section_rating, evaluation, "experience") == 82
+
+
+def bench_api_calculate_overall_rating(benchmark):
+    """1000 candidates through the API scorer (must-have category as a number)."""
+    def score_all():
+        return [api.calculate_overall_rating(exp, skills, edu, WEIGHTS, 3 if mh == "III" else 1)
+                for edu, exp, skills, mh in CANDIDATES]
+
+    assert len(benchmark(score_all)) == len(CANDIDATES)
+
+
+def bench_supervisor_calculate_overall_rating(benchmark):
+    """1000 candidates through SupervisorAgent (must-have category as a roman numeral)."""
+    supervisor = SupervisorAgent()
+
+    def score_all():
+        return [supervisor.calculate_overall_rating(edu, exp, skills, WEIGHTS, mh)
+                for edu, exp, skills, mh in CANDIDATES]
+
+    assert len(benchmark(score_all)) == len(CANDIDATES)
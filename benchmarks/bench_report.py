@@ -0,0 +1,28 @@
+# benchmarks/bench_report.py
+import pytest
+
+import reports
+from conftest import section_result
+
+# Paragraphs of aspects, clarifications and evaluation text per section
+REPORT_SECTION_PARAGRAPHS = {"short": 1, "medium": 5, "long": 25}
+WEIGHTS = {"experience": 45, "skills": 35, "education_and_certification": 20}
+
+
+@pytest.mark.parametrize("length", REPORT_SECTION_PARAGRAPHS)
+def bench_generate_pdf_report(benchmark, corpus, length):
+    paragraphs = REPORT_SECTION_PARAGRAPHS[length]
+    results = {name: section_result(paragraphs, rating)
+               for name, rating in (("edu", 70), ("exp", 85), ("skills", 64), ("mh", 0))}
+    summary = results["exp"]["evaluation"]
+
+    def build():
+        return reports.generate_pdf_report(
+            corpus["jds"]["medium"], corpus["resumes"]["3p"]["text"],
+            results["edu"], results["exp"], results["skills"], results["mh"],
+            75, "Strong fit", WEIGHTS, summary
+        ).getvalue()
+
+    report = benchmark(build)
+    benchmark.extra_info["bytes"] = len(report)
+    assert report.startswith(b"%PDF-")
@@ -0,0 +1,114 @@
+# benchmarks/conftest.py
+import io
+import os
+import sys
+import random
+import tempfile
+from typing import Dict, List
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The modules under test build their model clients and stores at import time. No model is
+# called by the benchmarks, so any key will do; the stores go to a throwaway directory.
+_scratch = tempfile.mkdtemp(prefix="resume-bench-")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("REQUISITION_DB_PATH", os.path.join(_scratch, "requisitions.db"))
+os.environ.setdefault("QUEUE_DB_PATH", os.path.join(_scratch, "tasks.db"))
+
+from docx import Document
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate
+
+# Resume sizes in pages and job description sizes in requirement lines
+RESUME_PAGES = {"1p": 1, "3p": 3, "10p": 10}
+JD_LINES = {"short": 10, "medium": 40, "long": 150}
+LINES_PER_PAGE = 40
+
+WORDS = (
+    "python java sql aws docker kubernetes terraform spark kafka airflow react typescript "
+    "designed built led migrated scaled reduced improved automated mentored delivered "
+    "platform pipeline service latency throughput reliability customers revenue team "
+    "bachelor master degree certification university engineering computer science "
+    "years experience senior staff backend data cloud security analytics production"
+).split()
+SECTIONS = ("Summary", "Experience", "Education", "Skills", "Certifications", "Projects")
+
+
+def _sentence(rng: random.Random, low: int = 8, high: int = 18) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + "."
+
+
+def resume_lines(pages: int, seed: int = 7) -> List[str]:
+    """Resume text lines: section headings followed by bullet sentences, LINES_PER_PAGE per page."""
+    rng = random.Random(seed + pages)
+    lines = ["Jane Doe", "jane.doe@example.com | +1 555 0100 | Springfield"]
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(SECTIONS[len(lines) // 12 % len(SECTIONS)])
+        lines.extend(f"- {_sentence(rng)}" for _ in range(11))
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def jd_text(lines: int, seed: int = 11) -> str:
+    rng = random.Random(seed + lines)
+    body = [f"- {_sentence(rng, 6, 14)}" for _ in range(lines)]
+    return "\n".join(["Senior Backend Engineer", "Requirements:"] + body)
+
+
+def build_pdf(lines: List[str], pages: int) -> bytes:
+    buffer = io.BytesIO()
+    styles = getSampleStyleSheet()
+    elements = []
+    for page in range(pages):
+        elements.extend(Paragraph(line, styles["Normal"])
+                        for line in lines[page * LINES_PER_PAGE:(page + 1) * LINES_PER_PAGE])
+        if page < pages - 1:
+            elements.append(PageBreak())
+    SimpleDocTemplate(buffer, pagesize=letter).build(elements)
+    return buffer.getvalue()
+
+
+def build_docx(lines: List[str], pages: int) -> bytes:
+    document = Document()
+    for page in range(pages):
+        for line in lines[page * LINES_PER_PAGE:(page + 1) * LINES_PER_PAGE]:
+            document.add_paragraph(line)
+        if page < pages - 1:
+            document.add_page_break()
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="session")
+def corpus() -> Dict[str, Dict]:
+    """Synthetic resumes (text, PDF and DOCX bytes) by page count, and job descriptions by length."""
+    resumes = {}
+    for name, pages in RESUME_PAGES.items():
+        lines = resume_lines(pages)
+        resumes[name] = {
+            "pages": pages,
+            "text": "\n".join(lines),
+            "pdf": build_pdf(lines, pages),
+            "docx": build_docx(lines, pages),
+        }
+    return {"resumes": resumes, "jds": {name: jd_text(lines) for name, lines in JD_LINES.items()}}
+
+
+def evaluation_text(rating: int, paragraphs: int, seed: int = 3) -> str:
+    """An agent evaluation: rationale paragraphs followed by the rating line the parsers look for."""
+    rng = random.Random(seed + paragraphs)
+    rationale = "\n".join(" ".join(_sentence(rng) for _ in range(4)) for _ in range(paragraphs))
+    return f"- {rationale}\nRating: {rating} out of 100"
+
+
+def section_result(paragraphs: int, rating: int) -> Dict[str, str]:
+    rng = random.Random(paragraphs)
+    return {
+        "aspects": "\n".join(f"- {_sentence(rng, 5, 10)}" for _ in range(paragraphs * 2)),
+        "clarifications": "\n".join(f"- {_sentence(rng)}" for _ in range(paragraphs * 2)),
+        "evaluation": evaluation_text(rating, paragraphs),
+    }
@@ -0,0 +1,417 @@
+# cache_tiers.py
+import os
+import time
+import sqlite3
+import argparse
+import threading
+from collections import OrderedDict
+from multiprocessing.managers import BaseManager
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Shared on-host tier: one SQLite file used by every worker process on the machine
+CACHE_SHARED_PATH = os.getenv("CACHE_SHARED_PATH", "")
+# Entries kept per namespace in the SQLite tier (oldest written are evicted first), and their lifetime
+CACHE_SHARED_MAX_ENTRIES = int(os.getenv("CACHE_SHARED_MAX_ENTRIES", "100000"))
+CACHE_SHARED_TTL = int(os.getenv("CACHE_SHARED_TTL", "0")) or None
+# Network tier shared across machines: redis://host:port/db, or manager://host:port for the
+# bundled stand-in server (python cache_tiers.py --port 50000)
+CACHE_NETWORK_URL = os.getenv("CACHE_NETWORK_URL", "")
+# Required by the stand-in server and its clients: the server unpickles what clients send, so
+# the key must be a secret shared only by the hosts that use the cache
+CACHE_NETWORK_AUTHKEY = os.getenv("CACHE_NETWORK_AUTHKEY", "")
+CACHE_NETWORK_TTL = int(os.getenv("CACHE_NETWORK_TTL", "0")) or None
+
+
+class CacheTier:
+    """One storage level of a TieredCache. Values are strings unless stores_objects is True."""
+
+    name = "tier"
+    stores_objects = False
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class MemoryTier(CacheTier):
+    """
+    Bounded in-process LRU holding decoded values. With max_bytes it is also bounded by the
+    total weight of its values (weigh, len by default); a value heavier than that is not kept.
+    """
+
+    name = "memory"
+    stores_objects = True
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None, weigh: Callable[[Any], int] = len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.weigh = weigh
+        self.bytes = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._weights: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        weight = self.weigh(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._entries:
+                del self._entries[key]
+                self.bytes -= self._weights.pop(key)
+            if self.max_bytes is not None and weight > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._weights[key] = weight
+            self.bytes += weight
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                evicted, _ = self._entries.popitem(last=False)
+                self.bytes -= self._weights.pop(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._weights.clear()
+            self.bytes = 0
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+                self.bytes -= self._weights.pop(key)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteTier(CacheTier):
+    """
+    SQLite file in WAL mode shared by all processes on the host; survives restarts.
+
+    Bounded like the other tiers: entries older than ttl seconds are not returned, and every
+    prune_interval writes the namespace is trimmed to max_entries, oldest written first.
+    """
+
+    name = "shared"
+
+    def __init__(self, db_path: str, namespace: str, max_entries: int = CACHE_SHARED_MAX_ENTRIES,
+                 ttl: Optional[int] = CACHE_SHARED_TTL, prune_interval: int = 100):
+        self.db_path = db_path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prune_interval = prune_interval
+        self._writes = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    written_at REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            # Files created before entries were bounded lack the write time
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")}
+            if "written_at" not in columns:
+                conn.execute("ALTER TABLE cache_entries ADD COLUMN written_at REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_written ON cache_entries (namespace, written_at)")
+        self.prune()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, key: str) -> Optional[str]:
+        oldest = time.time() - self.ttl if self.ttl else 0
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM cache_entries WHERE namespace = ? AND key = ? AND written_at >= ?",
+                (self.namespace, key, oldest)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, written_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, value, time.time())
+            )
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_interval == 0
+        if due:
+            self.prune()
+
+    def prune(self) -> None:
+        """Delete expired entries and the oldest ones beyond max_entries."""
+        with self._connect() as conn:
+            if self.ttl:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND written_at < ?",
+                             (self.namespace, time.time() - self.ttl))
+            conn.execute("""
+                DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache_entries WHERE namespace = ?
+                    ORDER BY written_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.namespace, self.namespace, self.max_entries))
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def size(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+
+class RedisTier(CacheTier):
+    """Redis, shared by every host; needs the optional redis package."""
+
+    name = "network"
+
+    def __init__(self, url: str, namespace: str, ttl: Optional[int] = CACHE_NETWORK_TTL):
+        import redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = f"{namespace}:"
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: str) -> None:
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class SharedStore:
+    """Key-value LRU served by the stand-in cache server."""
+
+    def __init__(self, max_entries: int):
+        self._memory = MemoryTier(max_entries)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._memory.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self._memory.set(key, value)
+
+    def delete_prefix(self, prefix: str) -> None:
+        self._memory.delete_prefix(prefix)
+
+    def size(self) -> int:
+        return self._memory.size()
+
+
+class CacheManager(BaseManager):
+    pass
+
+
+class ManagerTier(CacheTier):
+    """Client of the stand-in cache server, for deployments without Redis."""
+
+    name = "network"
+
+    def __init__(self, host: str, port: int, namespace: str, authkey: str = CACHE_NETWORK_AUTHKEY):
+        if not authkey:
+            raise ValueError("CACHE_NETWORK_AUTHKEY must be set to use a manager:// network cache")
+        self.address = (host, port)
+        self.authkey = authkey.encode("utf-8")
+        self.prefix = f"{namespace}:"
+        self._store = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        with self._lock:
+            if self._store is None:
+                CacheManager.register("get_store")
+                manager = CacheManager(address=self.address, authkey=self.authkey)
+                manager.connect()
+                self._store = manager.get_store()
+            return self._store
+
+    def _call(self, method: str, *args):
+        try:
+            return getattr(self._connect(), method)(*args)
+        except Exception:
+            # Reconnect on the next call, e.g. after the server restarts
+            self._store = None
+            raise
+
+    def get(self, key: str) -> Optional[str]:
+        return self._call("get", self.prefix + key)
+
+    def set(self, key: str, value: str) -> None:
+        self._call("set", self.prefix + key, value)
+
+    def clear(self) -> None:
+        self._call("delete_prefix", self.prefix)
+
+    def size(self) -> int:
+        return self._call("size")
+
+
+def network_tier(url: str, namespace: str) -> CacheTier:
+    parsed = urlparse(url)
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisTier(url, namespace)
+    if parsed.scheme == "manager":
+        return ManagerTier(parsed.hostname or "127.0.0.1", parsed.port or 50000, namespace)
+    raise ValueError(f"Unsupported CACHE_NETWORK_URL scheme: {parsed.scheme}")
+
+
+def build_tiers(namespace: str, max_entries: int, shared_path: Optional[str] = CACHE_SHARED_PATH or None,
+                network_url: Optional[str] = CACHE_NETWORK_URL or None,
+                max_bytes: Optional[int] = None) -> List[CacheTier]:
+    """Memory tier (bounded by max_bytes too, if given), then the shared SQLite and network tiers when they are configured."""
+    tiers: List[CacheTier] = [MemoryTier(max_entries, max_bytes)]
+    if shared_path:
+        tiers.append(SQLiteTier(shared_path, namespace))
+    if network_url:
+        tiers.append(network_tier(network_url, namespace))
+    return tiers
+
+
+class TieredCache:
+    """
+    Read-through, write-through cache over an ordered list of tiers (fastest first).
+
+    A hit in a lower tier is copied into the tiers above it, and every write goes to
+    all tiers, so a value computed by one worker process is found by the others.
+    A tier that raises is counted as an error and skipped. encode/decode convert
+    values to and from the strings stored by non-memory tiers.
+    """
+
+    def __init__(self, tiers: List[CacheTier], encode: Callable[[Any], str] = str,
+                 decode: Callable[[str], Any] = lambda value: value):
+        self.tiers = tiers
+        self.encode = encode
+        self.decode = decode
+        self._lock = threading.Lock()
+        self.stats = {tier.name: {"hits": 0, "misses": 0, "writes": 0, "errors": 0} for tier in tiers}
+
+    def _count(self, tier: CacheTier, counter: str) -> None:
+        with self._lock:
+            self.stats[tier.name][counter] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        for level, tier in enumerate(self.tiers):
+            try:
+                value = tier.get(key)
+            except Exception as e:
+                print(f"Error reading {tier.name} cache tier: {e}")
+                self._count(tier, "errors")
+                continue
+            if value is None:
+                self._count(tier, "misses")
+                continue
+
+            self._count(tier, "hits")
+            if not tier.stores_objects:
+                value = self.decode(value)
+            self._write(self.tiers[:level], key, value)
+            return value
+        return None
+
+    def _write(self, tiers: List[CacheTier], key: str, value: Any) -> None:
+        encoded = None
+        for tier in tiers:
+            try:
+                if tier.stores_objects:
+                    tier.set(key, value)
+                else:
+                    if encoded is None:
+                        encoded = self.encode(value)
+                    tier.set(key, encoded)
+                self._count(tier, "writes")
+            except Exception as e:
+                print(f"Error writing {tier.name} cache tier: {e}")
+                self._count(tier, "errors")
+
+    def set(self, key: str, value: Any) -> None:
+        self._write(self.tiers, key, value)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-tier counters, hit rate (of the lookups that reached the tier) and size."""
+        with self._lock:
+            stats = {name: dict(counters) for name, counters in self.stats.items()}
+        for tier in self.tiers:
+            tier_stats = stats[tier.name]
+            lookups = tier_stats["hits"] + tier_stats["misses"]
+            tier_stats["hit_rate"] = round(tier_stats["hits"] / lookups, 4) if lookups else 0.0
+            try:
+                tier_stats["entries"] = tier.size()
+            except Exception:
+                tier_stats["entries"] = None
+        return stats
+
+    def summary(self) -> Dict:
+        """
+        Overall counters: hits in the memory tier, hits in any lower tier (disk_hits),
+        lookups that missed every tier, the memory tier size and per-tier stats.
+        """
+        tiers = self.get_stats()
+        memory = tiers[self.tiers[0].name]
+        hits = memory["hits"]
+        disk_hits = sum(tier["hits"] for name, tier in tiers.items() if name != self.tiers[0].name)
+        misses = tiers[self.tiers[-1].name]["misses"]
+        lookups = hits + disk_hits + misses
+        return {
+            "hits": hits,
+            "disk_hits": disk_hits,
+            "misses": misses,
+            "entries": memory["entries"],
+            "hit_rate": round((hits + disk_hits) / lookups, 4) if lookups else 0.0,
+            "tiers": tiers,
+        }
+
+
+def serve(host: str, port: int, max_entries: int, authkey: str = CACHE_NETWORK_AUTHKEY) -> None:
+    """Run the stand-in network cache server until interrupted; refuses to start without an authkey."""
+    if not authkey:
+        raise ValueError("Set CACHE_NETWORK_AUTHKEY (or --authkey) to a shared secret before starting the cache server")
+    store = SharedStore(max_entries)
+    CacheManager.register("get_store", callable=lambda: store)
+    manager = CacheManager(address=(host, port), authkey=authkey.encode("utf-8"))
+    print(f"Cache server listening on {host}:{port}")
+    manager.get_server().serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in network cache server (CACHE_NETWORK_URL=manager://host:port)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=50000)
+    parser.add_argument("--max-entries", type=int, default=100000)
+    parser.add_argument("--authkey", default=CACHE_NETWORK_AUTHKEY, help="Shared secret (default CACHE_NETWORK_AUTHKEY)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.max_entries, args.authkey)
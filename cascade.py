@@ -0,0 +1,203 @@
+# cascade.py
+import os
+import re
+import time
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_google_genai import ChatGoogleGenerativeAI
+from llm_cache import response_cache
+from stage_timing import stage_stats
+from edu_agent import CombinedEducationAgent
+from exp_agent import CombinedExperienceAgent
+from skills_agent import CombinedSkillsAgent
+
+# Load environment variables
+load_dotenv()
+
+# Model tiers; prices are USD per million tokens and only used for reporting
+MODEL_TIERS = {
+    "fast": {
+        "model": os.getenv("CASCADE_FAST_MODEL", "gemini-2.0-flash-lite"),
+        "max_output_tokens": int(os.getenv("CASCADE_FAST_MAX_OUTPUT_TOKENS", "1500")),
+        "input_price": float(os.getenv("CASCADE_FAST_INPUT_PRICE", "0.075")),
+        "output_price": float(os.getenv("CASCADE_FAST_OUTPUT_PRICE", "0.30")),
+    },
+    "full": {
+        "model": os.getenv("CASCADE_FULL_MODEL", "gemini-2.0-flash"),
+        "max_output_tokens": int(os.getenv("CASCADE_FULL_MAX_OUTPUT_TOKENS", "4000")),
+        "input_price": float(os.getenv("CASCADE_FULL_INPUT_PRICE", "0.10")),
+        "output_price": float(os.getenv("CASCADE_FULL_OUTPUT_PRICE", "0.40")),
+    },
+}
+
+# Run the section agents through the cascade by default
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Category cut-offs shared by calculate_overall_rating and SupervisorAgent.find_category
+CATEGORY_BOUNDARIES = (40, 60, 80)
+CASCADE_MARGIN = float(os.getenv("CASCADE_MARGIN", "5"))
+
+SECTION_AGENTS = {
+    "education": CombinedEducationAgent,
+    "experience": CombinedExperienceAgent,
+    "skills": CombinedSkillsAgent,
+}
+
+
+def parse_rating(evaluation: str) -> Optional[int]:
+    """Return the numeric rating from an evaluation, or None if the output cannot be parsed."""
+    if not evaluation or not isinstance(evaluation, str):
+        return None
+    match = re.search(r"Rating\**\s*:\**\s*(\d+)", evaluation, re.IGNORECASE)
+    return int(match.group(1)) if match else None
+
+
+def is_borderline(rating: float, margin: float = CASCADE_MARGIN) -> bool:
+    return any(abs(rating - boundary) <= margin for boundary in CATEGORY_BOUNDARIES)
+
+
+class TierUsageHandler(BaseCallbackHandler):
+    """Accumulates token usage reported by one tier's model."""
+
+    def __init__(self, tier: str, stats: "CascadeStats"):
+        self.tier = tier
+        self.stats = stats
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                self.stats.add_tokens(self.tier, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+
+class CascadeStats:
+    """Thread-safe counters for escalation rate, latency, tokens and estimated cost per tier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.candidates = 0
+            self.escalated_candidates = 0
+            self.escalations = {"parse_failure": 0, "borderline": 0}
+            self.tiers = {
+                tier: {"sections": 0, "latency_seconds": 0.0, "input_tokens": 0, "output_tokens": 0}
+                for tier in MODEL_TIERS
+            }
+
+    def add_tokens(self, tier: str, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            self.tiers[tier]["input_tokens"] += input_tokens
+            self.tiers[tier]["output_tokens"] += output_tokens
+
+    def add_section(self, tier: str, latency: float) -> None:
+        with self._lock:
+            self.tiers[tier]["sections"] += 1
+            self.tiers[tier]["latency_seconds"] += latency
+
+    def add_candidate(self, escalation_reasons: Dict[str, str]) -> None:
+        with self._lock:
+            self.candidates += 1
+            if escalation_reasons:
+                self.escalated_candidates += 1
+            for reason in escalation_reasons.values():
+                self.escalations[reason] += 1
+
+    def report(self) -> Dict:
+        with self._lock:
+            tiers = {}
+            for tier, usage in self.tiers.items():
+                config = MODEL_TIERS[tier]
+                cost = (usage["input_tokens"] * config["input_price"] +
+                        usage["output_tokens"] * config["output_price"]) / 1_000_000
+                tiers[tier] = {
+                    **usage,
+                    "latency_seconds": round(usage["latency_seconds"], 3),
+                    "model": config["model"],
+                    "avg_latency_seconds": round(usage["latency_seconds"] / usage["sections"], 3) if usage["sections"] else 0.0,
+                    "estimated_cost_usd": round(cost, 6),
+                }
+            return {
+                "candidates": self.candidates,
+                "escalated_candidates": self.escalated_candidates,
+                "escalation_rate": round(self.escalated_candidates / self.candidates, 4) if self.candidates else 0.0,
+                "escalations": dict(self.escalations),
+                "tiers": tiers,
+            }
+
+
+cascade_stats = CascadeStats()
+
+
+def build_tier_model(tier: str) -> ChatGoogleGenerativeAI:
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY environment variable is not set")
+    config = MODEL_TIERS[tier]
+    return ChatGoogleGenerativeAI(
+        model=config["model"],
+        google_api_key=api_key,
+        temperature=0.0,
+        max_output_tokens=config["max_output_tokens"],
+        top_p=1,
+        cache=response_cache,
+        callbacks=[TierUsageHandler(tier, cascade_stats)]
+    )
+
+
+class CascadeRunner:
+    """
+    Runs the education, experience and skills agents on the fast tier first.
+
+    A section is re-run on the full tier when its output has no parseable rating.
+    If the overall rating computed from the fast-tier ratings lands within
+    CASCADE_MARGIN points of a category cut-off, every remaining fast-tier section
+    is escalated so the category decision is made by the full model.
+    """
+
+    def __init__(self, margin: float = CASCADE_MARGIN):
+        self.margin = margin
+        self.models = {tier: build_tier_model(tier) for tier in MODEL_TIERS}
+
+    def _run_section(self, section: str, tier: str, jd_text: str, resume_text: str, aspects: Dict) -> Dict:
+        start = time.perf_counter()
+        result = SECTION_AGENTS[section](chat_model=self.models[tier]).run(jd_text, resume_text, aspects)
+        latency = time.perf_counter() - start
+        cascade_stats.add_section(tier, latency)
+        stage_stats.record(f"section:{tier}", latency)
+        return result
+
+    def run_sections(self, jd_text: str, resume_text: str, aspects: Dict,
+                     overall_rating_fn: Callable[[Dict[str, int]], float]) -> Tuple[Dict[str, Dict], Dict]:
+        """
+        Evaluate the three rated sections with escalation.
+
+        overall_rating_fn maps {"education", "experience", "skills"} ratings to the overall rating.
+        Returns the section results and a report of the tier used for each section.
+        """
+        results = {}
+        tiers = {}
+        escalation_reasons = {}
+        for section in SECTION_AGENTS:
+            results[section] = self._run_section(section, "fast", jd_text, resume_text, aspects)
+            tiers[section] = "fast"
+            if "error" in results[section] or parse_rating(results[section].get("evaluation")) is None:
+                escalation_reasons[section] = "parse_failure"
+                results[section] = self._run_section(section, "full", jd_text, resume_text, aspects)
+                tiers[section] = "full"
+
+        ratings = {section: parse_rating(result.get("evaluation")) or 0 for section, result in results.items()}
+        overall = overall_rating_fn(ratings)
+        if isinstance(overall, (int, float)) and is_borderline(overall, self.margin):
+            for section, tier in tiers.items():
+                if tier == "fast":
+                    escalation_reasons[section] = "borderline"
+                    results[section] = self._run_section(section, "full", jd_text, resume_text, aspects)
+                    tiers[section] = "full"
+
+        cascade_stats.add_candidate(escalation_reasons)
+        return results, {"tiers": tiers, "escalations": escalation_reasons, "fast_overall_rating": overall}
@@ -0,0 +1,46 @@
+# checkpoints.py
+import re
+from typing import List
+
+# Matches "Checkpoint 1:", "**Checkpoint 2:**", "- Checkpoint 3 -" and similar prefixes
+CHECKPOINT_PATTERN = re.compile(r"^[\s\-\*#>]*\**\s*checkpoint\s*\d+\s*\**\s*[:.\-]\s*\**\s*", re.IGNORECASE)
+
+
+def parse_checkpoints(aspects_text: str, separator: str = " ") -> List[str]:
+    """
+    Split the checkpoint block produced by AspectsAgent into individual checkpoints.
+
+    Continuation lines are joined (with separator) to the checkpoint they belong to and any square
+    brackets the model copies from the output-format examples are dropped.
+    Text without "Checkpoint N:" markers is returned as a single checkpoint.
+    """
+    if not aspects_text or not aspects_text.strip():
+        return []
+
+    checkpoints: List[str] = []
+    current: List[str] = []
+    for line in aspects_text.splitlines():
+        if CHECKPOINT_PATTERN.match(line):
+            if current:
+                checkpoints.append(separator.join(current))
+            current = [CHECKPOINT_PATTERN.sub("", line).strip()]
+        elif line.strip() and current:
+            current.append(line.strip())
+
+    if current:
+        checkpoints.append(separator.join(current))
+    if not checkpoints:
+        return [aspects_text.strip()]
+
+    return [re.sub(r"^\[(.*)\]$", r"\1", checkpoint.strip(), flags=re.DOTALL).strip()
+            for checkpoint in checkpoints if checkpoint.strip()]
+
+
+def normalize_checkpoint(checkpoint: str) -> str:
+    """Comparison form of a checkpoint: case, whitespace and trailing punctuation are ignored."""
+    return re.sub(r"\s+", " ", checkpoint).strip().rstrip(".;").lower()
+
+
+def format_checkpoints(checkpoints: List[str]) -> str:
+    """Render checkpoints back into the "Checkpoint N: ..." block the agent prompts expect."""
+    return "\n".join(f"Checkpoint {number}: {checkpoint}" for number, checkpoint in enumerate(checkpoints, start=1))
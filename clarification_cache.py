@@ -0,0 +1,117 @@
+# clarification_cache.py
+import os
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from checkpoints import parse_checkpoints, format_checkpoints, normalize_checkpoint
+from llm_cache import cache_bypassed
+from clarification_chunks import clarification_chunker
+from cache_tiers import TieredCache, build_tiers, CACHE_SHARED_PATH, CACHE_NETWORK_URL
+
+# Load environment variables
+load_dotenv()
+
+# Cache configuration (the disk tier is only enabled when a path is given)
+CLARIFICATION_CACHE_ENABLED = os.getenv("CLARIFICATION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CLARIFICATION_CACHE_SIZE = int(os.getenv("CLARIFICATION_CACHE_SIZE", "4096"))
+CLARIFICATION_CACHE_PATH = os.getenv("CLARIFICATION_CACHE_PATH", CACHE_SHARED_PATH)
+
+
+def model_name(chat_model) -> str:
+    return getattr(chat_model, "model", None) or getattr(chat_model, "model_name", None) or type(chat_model).__name__
+
+
+class ClarificationCache:
+    """
+    Caches clarifications per (section, checkpoint, resume) instead of per checkpoint block.
+
+    A JD that shares some checkpoints with an earlier one only sends the unseen
+    checkpoints to the model; the clarifications are reassembled in the JD's order.
+    Keys include the agent section, the model and any extra prompt context (e.g. the
+    current date), because each of these changes the clarification prompt.
+    """
+
+    def __init__(self, max_entries: int = CLARIFICATION_CACHE_SIZE,
+                 db_path: Optional[str] = CLARIFICATION_CACHE_PATH or None,
+                 enabled: bool = CLARIFICATION_CACHE_ENABLED, network_url: Optional[str] = CACHE_NETWORK_URL or None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.enabled = enabled
+        self.cache = TieredCache(build_tiers("clarifications", max_entries, shared_path=db_path, network_url=network_url))
+        self._lock = threading.Lock()
+        self.stats = {"unparsed_responses": 0}
+
+    @staticmethod
+    def _key(section: str, model: str, checkpoint: str, resume: str, context: str) -> str:
+        resume_hash = hashlib.sha256(resume.encode("utf-8")).hexdigest()
+        raw = "\x00".join((section, model, context, normalize_checkpoint(checkpoint), resume_hash))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.cache.get(key)
+
+    def put(self, key: str, clarification: str) -> None:
+        self.cache.set(key, clarification)
+
+    def clarify(self, section: str, checkpoints_text: str, resume: str, chat_model,
+                generate: Callable[[str], str], context: str = "") -> str:
+        """
+        Return clarifications for a checkpoint block, calling generate(checkpoints) only
+        for the checkpoints without a cached clarification.
+
+        If the model does not answer checkpoint by checkpoint, its response is returned
+        as it is (for a partial block, the whole block is regenerated) and nothing is cached.
+        Long lists of missing checkpoints are clarified in concurrent chunks when
+        clarification_chunker is enabled; if a chunk's answers do not parse, the whole
+        block is regenerated in one call.
+        """
+        checkpoints = parse_checkpoints(checkpoints_text)
+        if not checkpoints or (not self.enabled and len(clarification_chunker.plan(section, len(checkpoints))) == 1):
+            return generate(checkpoints_text)
+
+        keys = [self._key(section, model_name(chat_model), checkpoint, resume, context) for checkpoint in checkpoints]
+        # A bypassed request regenerates every checkpoint but still refreshes the cache
+        clarifications: List[Optional[str]] = [
+            None if cache_bypassed() or not self.enabled else self.get(key) for key in keys
+        ]
+        missing = [index for index, clarification in enumerate(clarifications) if clarification is None]
+        if not missing:
+            return format_checkpoints(clarifications)
+
+        pending = [checkpoints[index] for index in missing]
+        if len(clarification_chunker.plan(section, len(pending))) > 1:
+            answers = clarification_chunker.clarify(section, pending, generate)
+            if answers is None:
+                return generate(checkpoints_text)
+        else:
+            response = clarification_chunker.timed_generate(section, pending, generate)
+            answers = parse_checkpoints(response, separator="\n")
+            if len(answers) != len(missing):
+                with self._lock:
+                    self.stats["unparsed_responses"] += 1
+                return response if len(missing) == len(checkpoints) else generate(checkpoints_text)
+
+        for index, answer in zip(missing, answers):
+            clarifications[index] = answer
+            if self.enabled:
+                self.put(keys[index], answer)
+        return format_checkpoints(clarifications)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def get_stats(self) -> Dict:
+        """Return per-checkpoint hit/miss counters overall and per tier, along with the in-memory size."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update(self.cache.summary())
+        stats["max_entries"] = self.max_entries
+        stats["disk_tier"] = bool(self.db_path)
+        stats["enabled"] = self.enabled
+        stats["chunking"] = clarification_chunker.get_stats()
+        return stats
+
+
+# Shared instance used by the section agents' generate_clarifications
+clarification_cache = ClarificationCache()
@@ -0,0 +1,151 @@
+# clarification_chunks.py
+import os
+import math
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from checkpoints import parse_checkpoints, format_checkpoints
+from llm_cache import model_responses
+
+# Load environment variables
+load_dotenv()
+
+# Split long checkpoint lists into chunks clarified concurrently (map) and merged in order (reduce)
+CLARIFICATION_CHUNKING = os.getenv("CLARIFICATION_CHUNKING", "false").lower() in ("1", "true", "yes")
+# Lists shorter than this are always clarified in one call
+CLARIFICATION_CHUNK_MIN_CHECKPOINTS = int(os.getenv("CLARIFICATION_CHUNK_MIN_CHECKPOINTS", "8"))
+# Latency one chunk should stay within, given the measured per-call and per-checkpoint seconds
+CLARIFICATION_CHUNK_TARGET_SECONDS = float(os.getenv("CLARIFICATION_CHUNK_TARGET_SECONDS", "6.0"))
+# Bounds of a chunk; the upper one keeps a chunk's answers well inside max_output_tokens
+CLARIFICATION_CHUNK_MIN_SIZE = int(os.getenv("CLARIFICATION_CHUNK_MIN_SIZE", "3"))
+CLARIFICATION_CHUNK_MAX_SIZE = int(os.getenv("CLARIFICATION_CHUNK_MAX_SIZE", "12"))
+# Chunks of one section in flight at once; further chunks wait for a free worker
+CLARIFICATION_CHUNK_MAX_PARALLEL = int(os.getenv("CLARIFICATION_CHUNK_MAX_PARALLEL", "4"))
+# Weight of the newest call in the latency model
+CLARIFICATION_LATENCY_ALPHA = float(os.getenv("CLARIFICATION_LATENCY_ALPHA", "0.1"))
+
+# Starting latency model (seconds per call, seconds per checkpoint), used until calls are measured
+PRIOR_CALL_SECONDS = 2.0
+PRIOR_CHECKPOINT_SECONDS = 0.6
+MIN_SAMPLES = 5
+
+
+class ClarificationChunker:
+    """
+    Plans and runs map-reduce clarification of long checkpoint lists.
+
+    Clarification latency is modelled per section as call_seconds + n * checkpoint_seconds,
+    fitted from the measured calls by exponentially weighted least squares. A list is split
+    into chunks small enough to finish within target_seconds each (between min_size and
+    max_size checkpoints) and balanced in size; at most max_parallel of them run at once.
+    """
+
+    def __init__(self, enabled: bool = CLARIFICATION_CHUNKING,
+                 min_checkpoints: int = CLARIFICATION_CHUNK_MIN_CHECKPOINTS,
+                 target_seconds: float = CLARIFICATION_CHUNK_TARGET_SECONDS,
+                 min_size: int = CLARIFICATION_CHUNK_MIN_SIZE, max_size: int = CLARIFICATION_CHUNK_MAX_SIZE,
+                 max_parallel: int = CLARIFICATION_CHUNK_MAX_PARALLEL, alpha: float = CLARIFICATION_LATENCY_ALPHA):
+        self.enabled = enabled
+        self.min_checkpoints = min_checkpoints
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_parallel = max_parallel
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        # Per section: sample count and moving averages of n, t, n*n and n*t
+        self._latency: Dict[str, Dict[str, float]] = {}
+        self.stats = {"chunked_calls": 0, "chunks": 0, "unparsed_chunks": 0}
+
+    def record(self, section: str, checkpoints: int, seconds: float) -> None:
+        with self._lock:
+            entry = self._latency.get(section)
+            if entry is None:
+                self._latency[section] = {"count": 1, "n": checkpoints, "t": seconds,
+                                          "nn": checkpoints * checkpoints, "nt": checkpoints * seconds}
+                return
+            entry["count"] += 1
+            for key, value in (("n", checkpoints), ("t", seconds), ("nn", checkpoints * checkpoints),
+                               ("nt", checkpoints * seconds)):
+                entry[key] += self.alpha * (value - entry[key])
+
+    def latency_model(self, section: str) -> Dict[str, float]:
+        """Estimated seconds per call and per checkpoint of a section's clarification calls."""
+        with self._lock:
+            entry = dict(self._latency.get(section) or {})
+        call_seconds, checkpoint_seconds = PRIOR_CALL_SECONDS, PRIOR_CHECKPOINT_SECONDS
+        if entry.get("count", 0) >= MIN_SAMPLES:
+            variance = entry["nn"] - entry["n"] ** 2
+            if variance > 1e-6:
+                # Clamped so a noisy fit cannot make checkpoints free or calls negative
+                checkpoint_seconds = max((entry["nt"] - entry["n"] * entry["t"]) / variance, 0.05)
+                call_seconds = max(entry["t"] - checkpoint_seconds * entry["n"], 0.0)
+            else:
+                checkpoint_seconds = max(entry["t"] / max(entry["n"], 1), 0.05)
+                call_seconds = 0.0
+        return {"call_seconds": call_seconds, "checkpoint_seconds": checkpoint_seconds}
+
+    def plan(self, section: str, count: int) -> List[int]:
+        """Chunk sizes, in order, for clarifying count checkpoints; a single entry means one call."""
+        if not self.enabled or count < self.min_checkpoints:
+            return [count]
+        model = self.latency_model(section)
+        size = int((self.target_seconds - model["call_seconds"]) / model["checkpoint_seconds"])
+        size = min(max(size, self.min_size), self.max_size)
+        chunks = math.ceil(count / size)
+        # Balanced sizes, never above size: the slowest chunk sets the latency
+        return [count // chunks + (1 if index < count % chunks else 0) for index in range(chunks)]
+
+    def timed_generate(self, section: str, checkpoints: List[str], generate: Callable[[str], str]) -> str:
+        """Call generate, recording its latency only if the model answered (not the response cache)."""
+        responses, start = model_responses(), time.perf_counter()
+        response = generate(format_checkpoints(checkpoints))
+        if model_responses() > responses:
+            self.record(section, len(checkpoints), time.perf_counter() - start)
+        return response
+
+    def clarify(self, section: str, checkpoints: List[str], generate: Callable[[str], str]) -> Optional[List[str]]:
+        """
+        Clarify checkpoints chunk by chunk in parallel and merge the answers in order.
+        Returns None if a chunk's response is not answered checkpoint by checkpoint.
+        """
+        sizes = self.plan(section, len(checkpoints))
+        chunks, start = [], 0
+        for size in sizes:
+            chunks.append(checkpoints[start:start + size])
+            start += size
+
+        with ThreadPoolExecutor(max_workers=max(min(len(chunks), self.max_parallel), 1)) as executor:
+            # Each chunk keeps the caller's context (e.g. the cache bypass flag)
+            futures = [executor.submit(contextvars.copy_context().run, self.timed_generate, section, chunk, generate)
+                       for chunk in chunks]
+            responses = [future.result() for future in futures]
+
+        answers: List[str] = []
+        for chunk, response in zip(chunks, responses):
+            chunk_answers = parse_checkpoints(response, separator="\n")
+            if len(chunk_answers) != len(chunk):
+                with self._lock:
+                    self.stats["unparsed_chunks"] += 1
+                return None
+            answers.extend(chunk_answers)
+        with self._lock:
+            self.stats["chunked_calls"] += 1
+            self.stats["chunks"] += len(chunks)
+        return answers
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            sections = list(self._latency)
+        stats["enabled"] = self.enabled
+        stats["latency"] = {section: {key: round(value, 3) for key, value in self.latency_model(section).items()}
+                            for section in sections}
+        return stats
+
+
+# Shared instance used by the clarification cache
+clarification_chunker = ClarificationChunker()
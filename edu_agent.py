@@ -3,6 +3,9 @@ from langchain_google_genai import ChatGoogleGenerativeAI  # Import Gemini model
 from langchain.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
+from llm_cache import response_cache
+from clarification_cache import clarification_cache
+from resume_facts import resume_fact_sheets
 
 # Load environment variables
 load_dotenv()
@@ -19,13 +22,14 @@ model = ChatGoogleGenerativeAI(
     temperature=0.0,
     max_output_tokens=4000,  # Use max_output_tokens instead of max_tokens
     top_p=1,
-    top_k=1
+    top_k=1,
+    cache=response_cache
 )
 
 # Define the combined agent class
 class CombinedEducationAgent:
-    def __init__(self):
-        self.model = model
+    def __init__(self, chat_model=None):
+        self.model = chat_model or model
 
         # Define the prompts for each step
         self.clarification_prompt = PromptTemplate(
@@ -111,6 +115,9 @@ certifications mentioned in the 'Checkpoints' and 'Answer Script' and how they a
             if not aspects_text:
                 return {"error": "No education aspects provided."}
 
+            # Prefix (or, for education, replace) the resume with its locally extracted fact sheet
+            resume_text = resume_fact_sheets.agent_resume('education', resume_text)
+
             # Step 2: Generate clarifications (based on resume)
             clarifications = self.generate_clarifications(aspects_text, resume_text)
             if not clarifications:
@@ -130,6 +137,12 @@ certifications mentioned in the 'Checkpoints' and 'Answer Script' and how they a
             return {"error": f"An error occurred: {str(e)}"}
 
     def generate_clarifications(self, checkpoints: str, resume: str) -> str:
+        return clarification_cache.clarify(
+            'education', checkpoints, resume, self.model,
+            lambda block: self._generate_clarifications(block, resume)
+        )
+
+    def _generate_clarifications(self, checkpoints: str, resume: str) -> str:
         prompt_text = self.clarification_prompt.format(checkpoints=checkpoints, resume=resume)
         response = self.model.invoke([HumanMessage(content=prompt_text)])
         return response.content.strip()
@@ -3,6 +3,9 @@ from langchain_google_genai import ChatGoogleGenerativeAI  # Import Gemini model
 from langchain.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
+from llm_cache import response_cache
+from clarification_cache import clarification_cache
+from resume_facts import resume_fact_sheets
 from datetime import datetime
 
 # Load environment variables
@@ -19,12 +22,13 @@ model = ChatGoogleGenerativeAI(
     google_api_key=api_key,
     temperature=0.0,
     max_output_tokens=4000,  # Use max_output_tokens instead of max_tokens
-    top_p=1
+    top_p=1,
+    cache=response_cache
 )
 # Define the combined agent class
 class CombinedExperienceAgent:
-    def __init__(self):
-        self.model = model
+    def __init__(self, chat_model=None):
+        self.model = chat_model or model
 
         # Define the prompts for each step
         self.clarification_prompt = PromptTemplate(
@@ -133,6 +137,9 @@ Provide justification pointers for the rating, explaining why the candidate's pr
             if not aspects_text:
                 return {"error": "No experience aspects provided."}
 
+            # Positions, month counts and total years extracted locally, ahead of the resume (RESUME_FACTS_MODE)
+            resume_text = resume_fact_sheets.agent_resume('experience', resume_text)
+
             # Step 2: Generate clarifications (based on resume)
             clarifications = self.generate_clarifications(aspects_text, resume_text, current_date)
             if not clarifications:
@@ -152,6 +159,13 @@ Provide justification pointers for the rating, explaining why the candidate's pr
             return {"error": f"An error occurred: {str(e)}"}
 
     def generate_clarifications(self, checkpoints: str, resume: str, current_date: str) -> str:
+        return clarification_cache.clarify(
+            'experience', checkpoints, resume, self.model,
+            lambda block: self._generate_clarifications(block, resume, current_date),
+            context=current_date
+        )
+
+    def _generate_clarifications(self, checkpoints: str, resume: str, current_date: str) -> str:
         prompt_text = self.clarification_prompt.format(
             checkpoints=checkpoints, 
             resume=resume,
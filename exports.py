@@ -0,0 +1,156 @@
+# exports.py
+import os
+import argparse
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+from response_views import analysis_view
+from requisition_store import RequisitionStore
+
+# Load environment variables
+load_dotenv()
+
+# Rows per Arrow record batch (and Parquet row group); bounds the memory of an export
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+
+EXPORT_FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+# execution.stage_seconds key -> column
+STAGE_COLUMNS = {
+    'aspects': 'aspects_seconds',
+    'weights': 'weights_seconds',
+    'must_have': 'must_have_seconds',
+    'section:full': 'section_full_seconds',
+    'section:fast': 'section_fast_seconds',
+    'section:cascade': 'section_cascade_seconds',
+    'summary': 'summary_seconds',
+}
+
+# Columns are only ever added, at the end, so readers of older exports keep working
+EXPORT_SCHEMA = pa.schema([
+    pa.field('analysis_id', pa.string(), nullable=False),
+    pa.field('requisition_id', pa.string(), nullable=False),
+    pa.field('candidate_id', pa.string(), nullable=False),
+    pa.field('created_at', pa.timestamp('us'), nullable=False),
+    pa.field('updated_at', pa.timestamp('us'), nullable=False),
+    # Null when the overall rating is not numeric ("NA")
+    pa.field('overall_rating', pa.int32()),
+    pa.field('overall_category', pa.string()),
+    pa.field('experience_rating', pa.int32()),
+    pa.field('skills_rating', pa.int32()),
+    pa.field('education_rating', pa.int32()),
+    pa.field('mh_category', pa.string()),
+    pa.field('experience_weight', pa.float64()),
+    pa.field('skills_weight', pa.float64()),
+    pa.field('education_weight', pa.float64()),
+    pa.field('short_circuited', pa.bool_()),
+    pa.field('summary_written', pa.bool_()),
+    pa.field('duplicate_of', pa.string()),
+    *[pa.field(column, pa.float64()) for column in STAGE_COLUMNS.values()],
+    pa.field('total_seconds', pa.float64()),
+    # Null for analyses stored before token usage was recorded
+    pa.field('input_tokens', pa.int64()),
+    pa.field('output_tokens', pa.int64()),
+], metadata={'schema_version': '1'})
+
+
+def _number(value) -> Optional[float]:
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def export_row(analysis: Dict) -> Dict:
+    """Flat export row of a stored analysis (id, requisition_id, candidate_id, result and timestamps)."""
+    result = analysis['result']
+    scores = analysis_view(result, "scores")
+    weights = result.get('section_weights') or {}
+    execution = result.get('execution') or {}
+    stage_seconds = execution.get('stage_seconds') or {}
+    tokens = execution.get('token_usage') or {}
+    duplicate_of = execution.get('duplicate_of')
+    overall_rating = _number(scores['overall_rating'])
+    return {
+        'analysis_id': analysis['id'],
+        'requisition_id': analysis['requisition_id'],
+        'candidate_id': analysis['candidate_id'],
+        'created_at': datetime.fromisoformat(analysis['created_at']),
+        'updated_at': datetime.fromisoformat(analysis['updated_at']),
+        'overall_rating': int(overall_rating) if overall_rating is not None else None,
+        'overall_category': scores['overall_category'],
+        'experience_rating': scores['section_ratings']['experience'],
+        'skills_rating': scores['section_ratings']['skills'],
+        'education_rating': scores['section_ratings']['education_and_certification'],
+        'mh_category': scores['mh_category'],
+        'experience_weight': _number(weights.get('experience')),
+        'skills_weight': _number(weights.get('skills')),
+        'education_weight': _number(weights.get('education_and_certification')),
+        # Short-circuited candidates never reach the section agents
+        'short_circuited': not any(result.get(key) for key in
+                                   ('education_analysis', 'experience_analysis', 'skills_analysis')),
+        'summary_written': bool(result.get('overall_summary')),
+        'duplicate_of': duplicate_of['candidate_id'] if duplicate_of else None,
+        **{column: _number(stage_seconds.get(stage)) for stage, column in STAGE_COLUMNS.items()},
+        'total_seconds': round(sum(_number(value) or 0 for value in stage_seconds.values()), 4)
+        if stage_seconds else None,
+        'input_tokens': tokens.get('input_tokens'),
+        'output_tokens': tokens.get('output_tokens'),
+    }
+
+
+def record_batches(analyses: Iterable[Dict], batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[pa.RecordBatch]:
+    """Export rows of the analyses as record batches of at most batch_rows rows."""
+    rows: List[Dict] = []
+    for analysis in analyses:
+        rows.append(export_row(analysis))
+        if len(rows) >= batch_rows:
+            yield pa.RecordBatch.from_pylist(rows, schema=EXPORT_SCHEMA)
+            rows = []
+    if rows:
+        yield pa.RecordBatch.from_pylist(rows, schema=EXPORT_SCHEMA)
+
+
+def export_analyses(store: RequisitionStore, sink, export_format: str = "parquet",
+                    requisition_ids: Optional[List[str]] = None, since: Optional[str] = None,
+                    until: Optional[str] = None, min_rating: Optional[float] = None,
+                    max_rating: Optional[float] = None, batch_rows: int = EXPORT_BATCH_ROWS) -> int:
+    """
+    Write the stored analyses matching the filters (see RequisitionStore.iter_analyses) to sink,
+    a path or binary file, as Parquet or an Arrow IPC file with EXPORT_SCHEMA. Analyses are read
+    and written batch_rows at a time. Returns the number of rows written; an export with
+    no matching analyses still carries the schema.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {export_format}; use one of {', '.join(EXPORT_FORMATS)}")
+    writer = (pq.ParquetWriter(sink, EXPORT_SCHEMA) if export_format == "parquet"
+              else ipc.new_file(sink, EXPORT_SCHEMA))
+    count = 0
+    try:
+        analyses = store.iter_analyses(requisition_ids, since, until, min_rating, max_rating, batch_size=batch_rows)
+        for batch in record_batches(analyses, batch_rows):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    finally:
+        writer.close()
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export stored analyses to Parquet or Arrow for analytics")
+    parser.add_argument("output", help="Output file")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--requisition-id", action="append", dest="requisition_ids",
+                        help="Only this requisition (repeatable)")
+    parser.add_argument("--since", help="Only analyses updated at or after this ISO date")
+    parser.add_argument("--until", help="Only analyses updated before this ISO date")
+    parser.add_argument("--min-rating", type=float)
+    parser.add_argument("--max-rating", type=float)
+    args = parser.parse_args()
+
+    rows = export_analyses(RequisitionStore(), args.output, args.format, args.requisition_ids,
+                           args.since, args.until, args.min_rating, args.max_rating)
+    print(f"Exported {rows} analyses to {args.output}")
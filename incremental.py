@@ -0,0 +1,48 @@
+# incremental.py
+from typing import Dict, List, Optional, Tuple
+from checkpoints import parse_checkpoints, normalize_checkpoint
+from pipeline import SECTION_AGENTS, rerun_sections
+
+# Sections the supervisor weighs; must-haves only feed the category penalty
+WEIGHTED_SECTIONS = ('edu', 'exp', 'skills')
+
+
+def normalize_checkpoints(aspects_text) -> List[str]:
+    """Checkpoints of one section with case, whitespace and trailing punctuation ignored."""
+    if not isinstance(aspects_text, str):
+        return []
+    return [normalize_checkpoint(checkpoint) for checkpoint in parse_checkpoints(aspects_text)]
+
+
+def diff_aspects(old_aspects: Dict, new_aspects: Dict) -> List[str]:
+    """Return the aspect sections whose checkpoints differ between two aspect sets."""
+    return [
+        section for section in SECTION_AGENTS
+        if normalize_checkpoints(old_aspects.get(section)) != normalize_checkpoints(new_aspects.get(section))
+    ]
+
+
+def weights_affected(changed_sections: List[str]) -> bool:
+    return any(section in WEIGHTED_SECTIONS for section in changed_sections)
+
+
+def plan_update(requisition: Dict, new_aspects: Dict) -> Tuple[List[str], bool]:
+    """Return the sections to re-run for every stored candidate and whether weights need recomputing."""
+    changed_sections = diff_aspects(requisition['aspects'], new_aspects)
+    return changed_sections, weights_affected(changed_sections)
+
+
+def reevaluate_analysis(jd_text: str, analysis: Dict, aspects: Dict, weights: Dict,
+                        changed_sections: List[str], short_circuit: Optional[bool] = None) -> Dict:
+    """
+    Bring one stored analysis up to date with an edited JD.
+
+    Only the changed sections are re-run; the rest of the stored result is reused.
+    Weights only change along with a weighted section, so an analysis with no
+    changed section is returned as stored.
+    """
+    previous = analysis['result']
+    if not changed_sections:
+        return previous
+    return rerun_sections(jd_text, analysis['resume_text'], aspects, weights, previous,
+                          changed_sections, short_circuit=short_circuit)
@@ -0,0 +1,173 @@
+# job_queue.py
+import os
+import json
+import time
+import uuid
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Queue configuration
+QUEUE_DB_PATH = os.getenv("QUEUE_DB_PATH", "tasks.db")
+QUEUE_VISIBILITY_TIMEOUT = float(os.getenv("QUEUE_VISIBILITY_TIMEOUT", "600"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_RETRY_DELAY = float(os.getenv("QUEUE_RETRY_DELAY", "30"))
+
+# Task states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class TaskQueue:
+    """
+    Durable task queue on a SQLite file shared by the API and any number of worker processes.
+
+    A claimed task stays invisible to other workers until its visibility timeout
+    passes. A worker that dies mid-task therefore loses nothing: the task becomes
+    claimable again and is retried until max_attempts is used up.
+    """
+
+    def __init__(self, db_path: str = QUEUE_DB_PATH, visibility_timeout: float = QUEUE_VISIBILITY_TIMEOUT):
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    visible_at REAL NOT NULL,
+                    worker_id TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_claimable ON tasks (status, visible_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _task_row(row: sqlite3.Row, include_payload: bool = False) -> Dict:
+        task = {
+            'id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'max_attempts': row['max_attempts'],
+            'worker_id': row['worker_id'],
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+        if include_payload:
+            task['payload'] = json.loads(row['payload'])
+        return task
+
+    def enqueue(self, kind: str, payload: Dict, max_attempts: int = QUEUE_MAX_ATTEMPTS) -> str:
+        task_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO tasks (id, kind, payload, status, max_attempts, visible_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (task_id, kind, json.dumps(payload), QUEUED, max_attempts, time.time(), now, now)
+            )
+        return task_id
+
+    def claim(self, worker_id: str, kinds: Optional[List[str]] = None) -> Optional[Dict]:
+        """Atomically take the oldest visible task, or return None if there is none."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same row
+            conn.execute("BEGIN IMMEDIATE")
+            # Tasks whose last attempt timed out with no attempts left are given up on
+            conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, updated_at = ? "
+                "WHERE status = ? AND visible_at <= ? AND attempts >= max_attempts",
+                (FAILED, "Visibility timeout expired on the last attempt", datetime.now().isoformat(), RUNNING, now)
+            )
+            query = "SELECT * FROM tasks WHERE status IN (?, ?) AND visible_at <= ?"
+            params: list = [QUEUED, RUNNING, now]
+            if kinds:
+                query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+                params.extend(kinds)
+            row = conn.execute(query + " ORDER BY visible_at, created_at LIMIT 1", params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE tasks SET status = ?, attempts = attempts + 1, visible_at = ?, worker_id = ?, updated_at = ? "
+                "WHERE id = ?",
+                (RUNNING, now + self.visibility_timeout, worker_id, datetime.now().isoformat(), row['id'])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return self.get(row['id'], include_payload=True)
+
+    def extend(self, task_id: str, worker_id: str) -> bool:
+        """Push back the visibility timeout of a task this worker is still running."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET visible_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (time.time() + self.visibility_timeout, task_id, worker_id, RUNNING)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker_id: str, result: Dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = NULL, updated_at = ? WHERE id = ? AND worker_id = ?",
+                (DONE, json.dumps(result), datetime.now().isoformat(), task_id, worker_id)
+            )
+
+    def fail(self, task_id: str, worker_id: str, error: str, retry: bool = True,
+             retry_delay: float = QUEUE_RETRY_DELAY) -> None:
+        """Record a failed attempt; unless retry is False the task is re-queued until its attempts are used up."""
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE tasks SET
+                    status = CASE WHEN ? OR attempts >= max_attempts THEN ? ELSE ? END,
+                    visible_at = ?, error = ?, updated_at = ?
+                WHERE id = ? AND worker_id = ?
+                """,
+                (not retry, FAILED, QUEUED, time.time() + retry_delay, error, datetime.now().isoformat(),
+                 task_id, worker_id)
+            )
+
+    def get(self, task_id: str, include_payload: bool = False) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._task_row(row, include_payload) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks in each state."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update({row['status']: row['n'] for row in rows})
+        return counts
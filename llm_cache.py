@@ -0,0 +1,102 @@
+# llm_cache.py
+import os
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from dotenv import load_dotenv
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from cache_tiers import TieredCache, build_tiers, CACHE_SHARED_PATH, CACHE_NETWORK_URL
+
+# Load environment variables
+load_dotenv()
+
+# Cache configuration (the disk tier is only enabled when a path is given)
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", CACHE_SHARED_PATH)
+
+# Set per request (or per block of work) to skip cache reads
+_bypass_cache: ContextVar[bool] = ContextVar("bypass_llm_cache", default=False)
+# Responses the model generated (cache misses written back) in the current context
+_model_responses: ContextVar[int] = ContextVar("llm_model_responses", default=0)
+
+
+@contextmanager
+def cache_bypass(enabled: bool = True):
+    """Skip cached responses for model calls made inside this block.
+
+    Fresh responses are still written back, so a bypassed call refreshes the cache.
+    """
+    token = _bypass_cache.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass_cache.reset(token)
+
+
+def cache_bypassed() -> bool:
+    """True inside a cache_bypass() block."""
+    return _bypass_cache.get()
+
+
+def model_responses() -> int:
+    """Number of responses generated by the model, not served from the cache, in this context."""
+    return _model_responses.get()
+
+
+class LLMResponseCache(BaseCache):
+    """
+    Memoizes chat model responses keyed by the formatted prompt and the model configuration.
+
+    All agents run with temperature=0.0, so identical prompts return identical responses.
+    Entries live in a bounded in-memory LRU and, when configured, in a SQLite file shared
+    by every process on the host and a network tier shared across hosts (see cache_tiers).
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_SIZE, db_path: Optional[str] = LLM_CACHE_PATH or None,
+                 network_url: Optional[str] = CACHE_NETWORK_URL or None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.cache = TieredCache(
+            build_tiers("llm", max_entries, shared_path=db_path, network_url=network_url),
+            encode=lambda generations: json.dumps([dumps(generation) for generation in generations]),
+            decode=lambda payload: [loads(item) for item in json.loads(payload)]
+        )
+        self._lock = threading.Lock()
+        self.stats = {"bypassed": 0, "writes": 0}
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if _bypass_cache.get():
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return None
+        return self.cache.get(self._key(prompt, llm_string))
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        _model_responses.set(_model_responses.get() + 1)
+        self.cache.set(self._key(prompt, llm_string), return_val)
+        with self._lock:
+            self.stats["writes"] += 1
+
+    def clear(self, **kwargs) -> None:
+        self.cache.clear()
+
+    def get_stats(self) -> Dict:
+        """Return hit/miss counters overall and per tier, along with the current in-memory size."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update(self.cache.summary())
+        stats["max_entries"] = self.max_entries
+        stats["disk_tier"] = bool(self.db_path)
+        return stats
+
+
+# Shared instance passed to every chat model via `cache=response_cache`
+response_cache = LLMResponseCache()
@@ -3,7 +3,11 @@ from langchain_google_genai import ChatGoogleGenerativeAI  # Import Gemini model
 from langchain.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
+from llm_cache import response_cache
+from clarification_cache import clarification_cache
 from datetime import datetime
+from typing import Optional
+from mh_rules import MustHaveRuleEngine, MH_SHORT_CIRCUIT
 
 # Load environment variables
 load_dotenv()
@@ -19,13 +23,15 @@ model = ChatGoogleGenerativeAI(
     google_api_key=api_key,
     temperature=0.0,
     max_output_tokens=4000,  # Use max_output_tokens instead of max_tokens
-    top_p=1
+    top_p=1,
+    cache=response_cache
 )
 
 # Define the combined agent class
 class CombinedMHAgent:
-    def __init__(self):
-        self.model = model
+    def __init__(self, chat_model=None):
+        self.model = chat_model or model
+        self.rule_engine = MustHaveRuleEngine()
 
         # Define the prompts for each step
         self.clarification_prompt = PromptTemplate(
@@ -99,16 +105,32 @@ class CombinedMHAgent:
     """
         )
 
-    def run(self, jd_text: str, resume_text: str, aspects: dict) -> dict:
+    def run(self, jd_text: str, resume_text: str, aspects: dict, use_rules: Optional[bool] = None) -> dict:
         try:
             # Get current date
-            current_date = datetime.now().strftime("%B %d, %Y")
+            now = datetime.now()
+            current_date = now.strftime("%B %d, %Y")
             
             # Step 1: Use provided aspects (checkpoints) from JD
             aspects_text = aspects.get('mh', '')
             if not aspects_text:
                 return {"error": "No must-have aspects provided."}
 
+            # Deterministic checks settle clear passes and failures without the LLM, but only
+            # when short-circuiting is on (use_rules defaults to MH_SHORT_CIRCUIT)
+            if use_rules is None:
+                use_rules = MH_SHORT_CIRCUIT
+            if use_rules:
+                verdict = self.rule_engine.evaluate(aspects_text, resume_text, now)
+                if verdict['category']:
+                    return {
+                        'aspects': aspects_text,
+                        'clarifications': self.rule_engine.format_clarifications(verdict),
+                        'evaluation': self.rule_engine.format_evaluation(verdict),
+                        'source': 'rules',
+                        'rule_checks': verdict['checkpoints']
+                    }
+
             # Step 2: Generate clarifications (based on resume)
             clarifications = self.generate_clarifications(aspects_text, resume_text, current_date)
             if not clarifications:
@@ -128,6 +150,13 @@ class CombinedMHAgent:
             return {"error": f"An error occurred: {str(e)}"}
 
     def generate_clarifications(self, checkpoints: str, resume: str, current_date: str) -> str:
+        return clarification_cache.clarify(
+            'must_have', checkpoints, resume, self.model,
+            lambda block: self._generate_clarifications(block, resume, current_date),
+            context=current_date
+        )
+
+    def _generate_clarifications(self, checkpoints: str, resume: str, current_date: str) -> str:
         prompt_text = self.clarification_prompt.format(
             checkpoints=checkpoints, 
             resume=resume,
@@ -0,0 +1,290 @@
+# mh_rules.py
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from checkpoints import parse_checkpoints
+
+# Load environment variables
+load_dotenv()
+
+# When a candidate clearly fails a must-have, skip the education, experience and skills agents
+MH_SHORT_CIRCUIT = os.getenv("MH_SHORT_CIRCUIT", "false").lower() in ("1", "true", "yes")
+
+PASS = "pass"
+FAIL = "fail"
+AMBIGUOUS = "ambiguous"
+
+# Degree levels, ordered so that a higher level satisfies a lower requirement
+DEGREE_LEVELS = {1: "Associate", 2: "Bachelor's", 3: "Master's", 4: "Doctorate"}
+
+# Words used in checkpoints (and resumes) to name a degree level
+DEGREE_WORDS = [
+    (4, re.compile(r"\b(ph\.?\s?d|doctorate|doctoral)\b", re.IGNORECASE)),
+    (3, re.compile(r"\b(master'?s?|post[\s-]?graduat\w*|mba)\b", re.IGNORECASE)),
+    (2, re.compile(r"\b(bachelor'?s?|undergraduate degree|graduat(?:e|ion)\b(?! degree))", re.IGNORECASE)),
+    (1, re.compile(r"\bassociate'?s? (?:degree|of)\b", re.IGNORECASE)),
+]
+
+# A bare "degree" (e.g. "MUST HAVE DEGREE IN DATA SCIENCE") is read as at least a bachelor's
+GENERIC_DEGREE = re.compile(r"\bdegree\b", re.IGNORECASE)
+
+# Abbreviations only found on resumes; case-sensitive so "MS Office" or "BE" in prose do not match
+DEGREE_ABBREVIATIONS = [
+    (4, re.compile(r"\b(Ph\.\s?D\.?|PhD|D\.Phil)\b")),
+    (3, re.compile(r"(?<![\w.])(M\.S\.|M\.A\.|M\.E\.|MSc|M\.Sc\.?|MTech|M\.Tech\.?|MEng|MCom|M\.Com\.?|MBA|MCA)(?![\w])")),
+    (2, re.compile(r"(?<![\w.])(B\.S\.|B\.A\.|B\.E\.|BSc|B\.Sc\.?|BTech|B\.Tech\.?|BEng|BCom|B\.Com\.?|BBA|BCA)(?![\w])")),
+]
+
+# Words that make a short resume line a job title ("Senior Data Analyst", "Data Analyst, Initech")
+TITLE_WORDS = re.compile(
+    r"\b(?:engineer|developer|manager|analyst|lead|director|consultant|scientist|intern|architect|specialist|"
+    r"officer|head|associate|administrator|designer|coordinator|executive|president|vp|accountant|programmer|"
+    r"technician|supervisor|researcher|teacher|professor|assistant|representative|owner|founder|nurse)\b",
+    re.IGNORECASE
+)
+
+CERTIFICATION_HINT = re.compile(r"certif|licen[cs]e", re.IGNORECASE)
+CERTIFIED_PHRASE = re.compile(r"((?:[A-Z][\w+&/\-]*\s+)+Certified(?:\s+[A-Z][\w+&/\-]*)*|Certified(?:\s+[A-Z][\w+&/\-]*)+)")
+ACRONYM = re.compile(r"\b[A-Z][A-Z0-9+&\-]{1,9}\b")
+NOT_ACRONYMS = frozenset("MUST HAVE AND OR THE IN OF FOR A AN IT US UK EU JD CV DEGREE WITH ANY".split())
+
+YEARS_REQUIREMENT = re.compile(
+    r"(?:at least|minimum(?: of)?|min\.?|over|more than)?\s*(\d{1,2}(?:\.\d)?)\s*(\+)?\s*(?:-|to)?\s*(?:\d{1,2}\s*)?\+?\s*(?:years?|yrs?)\b",
+    re.IGNORECASE
+)
+EQUIVALENT_HINT = re.compile(r"\bequivalent\b", re.IGNORECASE)
+
+MONTHS = {m: i for i, m in enumerate(["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_DATE = r"(?:(?P<{p}m>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?,?\s+|(?P<{p}n>\d{{1,2}})[/\-.])?(?P<{p}y>(?:19|20)\d{{2}})"
+DATE_RANGE = re.compile(
+    _DATE.format(p="s") + r"\s*(?:-|–|—|to|until|till)\s*(?:" + _DATE.format(p="e") +
+    r"|(?P<present>present|current|now|today|date))",
+    re.IGNORECASE
+)
+
+
+def month_index(month_name: Optional[str], month_number: Optional[str], year: str, default_month: int) -> int:
+    month = default_month
+    if month_name:
+        month = MONTHS[month_name[:3].lower()]
+    elif month_number and 1 <= int(month_number) <= 12:
+        month = int(month_number)
+    return int(year) * 12 + month - 1
+
+
+def extract_date_ranges(resume_text: str, current_date: Optional[datetime] = None) -> List[Tuple[int, int]]:
+    """
+    Find employment-style date ranges ("Jan 2019 - Present", "03/2017 – 05/2020", "2015 to 2018").
+
+    Returns (start, end) pairs as month indices (year * 12 + month - 1). Ranges that only
+    give years are widened to whole years so totals err on the generous side.
+    """
+    current_date = current_date or datetime.now()
+    now = current_date.year * 12 + current_date.month - 1
+    ranges = []
+    for match in DATE_RANGE.finditer(resume_text or ""):
+        start = month_index(match.group("sm"), match.group("sn"), match.group("sy"), 1)
+        if match.group("present"):
+            end = now
+        else:
+            end = month_index(match.group("em"), match.group("en"), match.group("ey"), 12)
+        end = min(end, now)
+        if start <= end:
+            ranges.append((start, end))
+    return ranges
+
+
+def total_experience_years(date_ranges: List[Tuple[int, int]]) -> float:
+    """Total years covered by the date ranges, counting overlapping months once."""
+    total_months = 0
+    current_start, current_end = None, None
+    for start, end in sorted(date_ranges):
+        if current_end is None or start > current_end + 1:
+            if current_end is not None:
+                total_months += current_end - current_start + 1
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total_months += current_end - current_start + 1
+    return round(total_months / 12, 1)
+
+
+def undated_roles(resume_text: str) -> int:
+    """Job-title lines with no date range on them or on the next line, i.e. roles missing from the totals."""
+    lines = [line.strip() for line in (resume_text or "").splitlines() if line.strip()]
+    count = 0
+    for index, line in enumerate(lines):
+        following = lines[index + 1] if index + 1 < len(lines) else ""
+        if (len(line.split()) <= 10 and TITLE_WORDS.search(line)
+                and not DATE_RANGE.search(line) and not DATE_RANGE.search(following)):
+            count += 1
+    return count
+
+
+def _degree_levels(text: str, include_abbreviations: bool) -> List[int]:
+    patterns = DEGREE_WORDS + (DEGREE_ABBREVIATIONS if include_abbreviations else [])
+    levels = sorted({level for level, pattern in patterns if pattern.search(text)})
+    if not levels and GENERIC_DEGREE.search(text):
+        levels = [2]
+    return levels
+
+
+def _normalize(text: str) -> str:
+    return " " + re.sub(r"[^a-z0-9+#]+", " ", text.lower()).strip() + " "
+
+
+def _degree_fields(checkpoint: str) -> Tuple[List[str], bool]:
+    """Fields of study named after "degree in" and whether related fields are also accepted."""
+    match = re.search(r"\b(?:degree|graduation|bachelor'?s?|master'?s?|ph\.?\s?d)\s+(?:in|of)\s+([^.;:()]+)", checkpoint, re.IGNORECASE)
+    if not match:
+        return [], False
+    phrase = match.group(1)
+    flexible = bool(re.search(r"related|equivalent|similar|relevant", phrase, re.IGNORECASE))
+    phrase = re.split(r"\b(?:or|and)\s+(?:a\s+)?(?:closely\s+)?(?:related|equivalent|similar|relevant)\b|\bfrom\b|\bwith\b", phrase, flags=re.IGNORECASE)[0]
+    fields = [field.strip() for field in re.split(r",|/|\bor\b|\band\b", phrase, flags=re.IGNORECASE)]
+    return [field for field in fields if field and field.lower() not in ("a", "an", "any")], flexible
+
+
+def check_degree(checkpoint: str, resume_text: str) -> Optional[Dict]:
+    required = _degree_levels(checkpoint, include_abbreviations=False)
+    if not required:
+        return None
+    required_level = required[0]
+    found = _degree_levels(resume_text, include_abbreviations=True)
+    fields, flexible = _degree_fields(checkpoint)
+    detail = {"rule": "degree", "required": DEGREE_LEVELS[required_level],
+              "found": [DEGREE_LEVELS[level] for level in found], "fields": fields}
+
+    if not found or EQUIVALENT_HINT.search(checkpoint):
+        # Nothing degree-like was extracted, or experience may substitute for the degree
+        return {**detail, "status": AMBIGUOUS}
+    if max(found) < required_level:
+        return {**detail, "status": FAIL,
+                "reason": f"Highest degree found is {DEGREE_LEVELS[max(found)]}; {DEGREE_LEVELS[required_level]} required."}
+    if fields and not any(_normalize(field) in _normalize(resume_text) for field in fields):
+        # Level is met but the field is not named; "related field" needs judgement
+        return {**detail, "status": AMBIGUOUS}
+    return {**detail, "status": PASS, "reason": f"{DEGREE_LEVELS[max(found)]} degree found."}
+
+
+def check_certification(checkpoint: str, resume_text: str) -> Optional[Dict]:
+    if not CERTIFICATION_HINT.search(checkpoint):
+        return None
+    names = [phrase.strip() for phrase in CERTIFIED_PHRASE.findall(checkpoint)]
+    acronyms = []
+    if not checkpoint.isupper():
+        # Acronyms inside a "... Certified ..." name (e.g. AWS) are not certifications on their own
+        acronyms = [acronym for acronym in ACRONYM.findall(checkpoint)
+                    if acronym not in NOT_ACRONYMS and not any(acronym in name.split() for name in names)]
+    names = list(dict.fromkeys(names + acronyms))
+    detail = {"rule": "certification", "required": names}
+    if not names:
+        return {**detail, "status": AMBIGUOUS}
+
+    normalized_resume = _normalize(resume_text)
+    matched = [name for name in names if _normalize(name) in normalized_resume]
+    if matched:
+        return {**detail, "status": PASS, "reason": f"Found {', '.join(matched)}."}
+    if EQUIVALENT_HINT.search(checkpoint) or acronyms:
+        # An acronym may be spelled out on the resume ("CPA" as "Certified Public Accountant", "RN" as
+        # "Registered Nurse"); without a list of expansions only the model can tell
+        return {**detail, "status": AMBIGUOUS}
+    # The must-have prompt only accepts explicitly mentioned certifications
+    return {**detail, "status": FAIL, "reason": f"None of {', '.join(names)} is mentioned in the resume."}
+
+
+def check_years(checkpoint: str, resume_text: str, current_date: Optional[datetime] = None) -> Optional[Dict]:
+    match = YEARS_REQUIREMENT.search(checkpoint)
+    if not match:
+        return None
+    required_years = float(match.group(1))
+    date_ranges = extract_date_ranges(resume_text, current_date)
+    detail = {"rule": "years", "required": required_years}
+    if not date_ranges:
+        return {**detail, "status": AMBIGUOUS}
+
+    total_years = total_experience_years(date_ranges)
+    # Same leniency as the agent prompts: 1-2 years short for junior roles, ~20% for senior ones
+    tolerance = max(2.0, 0.2 * required_years)
+    detail["found"] = total_years
+    detail["undated_roles"] = undated_roles(resume_text)
+    if detail["undated_roles"]:
+        # Roles without dates add unknown years to the total
+        return {**detail, "status": AMBIGUOUS}
+    if total_years < required_years - tolerance:
+        return {**detail, "status": FAIL,
+                "reason": f"Resume dates cover {total_years} years in total; {required_years:g} required."}
+    # Total tenure cannot confirm role- or technology-specific years, so leave it to the LLM
+    return {**detail, "status": AMBIGUOUS}
+
+
+class MustHaveRuleEngine:
+    """
+    Deterministic checks for must-have checkpoints that can be verified without an LLM.
+
+    Each checkpoint is tested for degree level/field, named certifications and minimum
+    years of experience. A candidate who clearly fails any checkpoint is Category III,
+    one who clearly passes every checkpoint is Category II, and anything else is left
+    to CombinedMHAgent. Certifications named only by an acronym and year totals that
+    miss undated roles are never clear failures. The agent only applies the rules when
+    must-have short-circuiting is enabled.
+    """
+
+    def check_checkpoint(self, checkpoint: str, resume_text: str, current_date: Optional[datetime] = None) -> Dict:
+        checks = [
+            check
+            for check in (
+                check_degree(checkpoint, resume_text),
+                check_certification(checkpoint, resume_text),
+                check_years(checkpoint, resume_text, current_date),
+            )
+            if check is not None
+        ]
+        statuses = [check["status"] for check in checks]
+        if FAIL in statuses:
+            status = FAIL
+        elif statuses and all(s == PASS for s in statuses):
+            status = PASS
+        else:
+            status = AMBIGUOUS
+        return {"checkpoint": checkpoint, "status": status, "checks": checks}
+
+    def evaluate(self, mh_aspects: str, resume_text: str, current_date: Optional[datetime] = None) -> Dict:
+        """
+        Run every must-have checkpoint through the rules.
+
+        Returns the per-checkpoint results and a category ("II", "III") when the rules
+        are decisive, or None when the LLM still has to decide.
+        """
+        results = [self.check_checkpoint(checkpoint, resume_text, current_date)
+                   for checkpoint in parse_checkpoints(mh_aspects)]
+        statuses = [result["status"] for result in results]
+        if FAIL in statuses:
+            category = "III"
+        elif statuses and all(s == PASS for s in statuses):
+            category = "II"
+        else:
+            category = None
+        return {"category": category, "checkpoints": results}
+
+    @staticmethod
+    def format_evaluation(verdict: Dict) -> str:
+        """Render a decisive verdict in the same **category**/**evidence** format as the MH agent."""
+        reasons = [
+            f"{check['reason']}"
+            for result in verdict["checkpoints"]
+            for check in result["checks"]
+            if check["status"] == (FAIL if verdict["category"] == "III" else PASS) and check.get("reason")
+        ]
+        return f"**category**: Category {verdict['category']}\n**evidence**: Rule-based check. {' '.join(reasons)}"
+
+    @staticmethod
+    def format_clarifications(verdict: Dict) -> str:
+        return "\n".join(
+            f"Checkpoint {number}: [{result['status']}] " +
+            "; ".join(check.get("reason", f"{check['rule']} check inconclusive") for check in result["checks"])
+            for number, result in enumerate(verdict["checkpoints"], start=1)
+        )
@@ -0,0 +1,111 @@
+# minhash.py
+import re
+import hashlib
+import unicodedata
+from typing import Iterable, List, Set
+import numpy as np
+
+# Mersenne-style prime just below 2**32: a * x + b stays below 2**64 for 32-bit a, b and x
+PRIME = 4294967291
+NUM_PERM = 128
+# LSH banding: BANDS * ROWS must equal the signature length. 32 bands of 4 rows make
+# pairs above ~0.45 Jaccard likely to share a bucket; candidates are verified afterwards.
+BANDS = 32
+
+URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+|\S+@\S+\.\w+")
+NUMBER_PATTERN = re.compile(r"\d+")
+NON_WORD_PATTERN = re.compile(r"[^\w+#]+")
+# Punctuation dropped from the exact-match form; "@", "." and "/" keep e-mail addresses and URLs
+EXACT_PUNCTUATION_PATTERN = re.compile(r"[^\w+#@./:-]+")
+
+
+def exact_text(text: str) -> str:
+    """
+    Exact-match form of a text: Unicode forms, case, spacing and most punctuation are ignored,
+    but digits and contact details are kept, so resumes with different dates or e-mail
+    addresses are never exact duplicates.
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return " ".join(EXACT_PUNCTUATION_PATTERN.sub(" ", text).split())
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase, fold Unicode forms and drop URLs, e-mail addresses, digits and punctuation,
+    so copies that differ only in formatting, dates or numbers give the same shingles.
+    Only used for the MinHash signature; the exact-match hash uses exact_text.
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = URL_PATTERN.sub(" ", text)
+    text = NUMBER_PATTERN.sub("0", text)
+    return " ".join(NON_WORD_PATTERN.sub(" ", text).split())
+
+
+def content_hash(text: str) -> str:
+    """Exact-duplicate key of a text (see exact_text)."""
+    return hashlib.sha256(exact_text(text).encode("utf-8")).hexdigest()
+
+
+def shingles(normalized: str, k: int = 3) -> Set[str]:
+    """Word k-shingles of normalized text; shorter texts give a single shingle."""
+    words = normalized.split()
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def has_fingerprint(text: str) -> bool:
+    """True when text has words to fingerprint; empty or symbol-only text matches nothing."""
+    return bool(shingles(normalize_text(text)))
+
+
+def _hash32(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class MinHasher:
+    """
+    MinHash signatures over shingle sets, using num_perm universal hash functions
+    (a * x + b) mod PRIME with fixed seeds, so signatures are comparable across processes.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set: Iterable[str]) -> np.ndarray:
+        values = np.fromiter((_hash32(shingle) for shingle in shingle_set), dtype=np.uint64)
+        if not len(values):
+            return np.full(self.num_perm, PRIME, dtype=np.uint32)
+        hashed = (self.a[:, None] * values[None, :] + self.b[:, None]) % PRIME
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def text_signature(self, text: str, k: int = 3) -> np.ndarray:
+        return self.signature(shingles(normalize_text(text), k))
+
+
+def similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity: the share of positions where the signatures agree."""
+    return float(np.mean(signature_a == signature_b))
+
+
+def band_keys(signature: np.ndarray, bands: int = BANDS) -> List[str]:
+    """LSH bucket key of each band; near-duplicates share at least one key with high probability."""
+    rows = len(signature) // bands
+    return [
+        hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()
+        for band in range(bands)
+    ]
+
+
+def to_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype(np.uint32).tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.uint32)
+
+
+minhasher = MinHasher()
@@ -0,0 +1,319 @@
+# pipeline.py
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Set, Tuple
+from langchain_core.callbacks import get_usage_metadata_callback
+from aspects_agent import AspectsAgent
+from edu_agent import CombinedEducationAgent
+from exp_agent import CombinedExperienceAgent
+from skills_agent import CombinedSkillsAgent
+from supervisor_agent import SupervisorAgent
+from mh_agent import CombinedMHAgent
+from mh_rules import MH_SHORT_CIRCUIT
+from ratings import extract_rating, get_mh_category
+from cascade import CascadeRunner, CASCADE_ENABLED, build_tier_model
+from stage_timing import timed
+from requisition_store import RequisitionStore, RequisitionConflictError, JD_DEDUP_MODE
+
+# Aspect key -> (agent class, key of its result in the analysis)
+SECTION_AGENTS = {
+    'edu': (CombinedEducationAgent, 'education_analysis'),
+    'exp': (CombinedExperienceAgent, 'experience_analysis'),
+    'skills': (CombinedSkillsAgent, 'skills_analysis'),
+    'mh': (CombinedMHAgent, 'must_have_analysis'),
+}
+
+
+def is_short_circuited(mh_result: Optional[Dict]) -> bool:
+    """True when the must-have rules, not the LLM, placed the candidate in Category III."""
+    return bool(mh_result) and mh_result.get('source') == 'rules' and get_mh_category(mh_result) == "III"
+
+
+def assemble_result(supervisor_agent: SupervisorAgent, weights: Dict, edu_result: Optional[Dict],
+                    exp_result: Optional[Dict], skills_result: Optional[Dict], mh_result: Optional[Dict],
+                    execution: Optional[Dict] = None, include_summary: bool = True,
+                    timings: Optional[Dict] = None) -> Dict:
+    """
+    Combine section results into the AnalysisResponse fields (ratings, overall rating and summary).
+
+    Without include_summary the summary model call is skipped, overall_summary is empty and
+    execution notes summary_deferred; write_summary can add it later.
+    """
+    # Extract ratings
+    edu_rating = extract_rating(edu_result.get('evaluation', '')) if edu_result else 0
+    exp_rating = extract_rating(exp_result.get('evaluation', '')) if exp_result else 0
+    skills_rating = extract_rating(skills_result.get('evaluation', '')) if skills_result else 0
+
+    # Calculate overall rating
+    overall_rating, overall_category = supervisor_agent.calculate_overall_rating(
+        edu_rating=edu_rating,
+        exp_rating=exp_rating,
+        skills_rating=skills_rating,
+        weights=weights,
+        mh_category=get_mh_category(mh_result)
+    )
+
+    # Generate summary
+    overall_summary = ''
+    if include_summary:
+        with timed('summary', timings):
+            overall_summary = summarize(supervisor_agent, edu_result, exp_result, skills_result)
+    elif execution is not None:
+        execution['summary_deferred'] = True
+
+    return {
+        'overall_rating': overall_rating,
+        'overall_category': overall_category,
+        'section_weights': weights,
+        'overall_summary': overall_summary,
+        'education_analysis': edu_result,
+        'experience_analysis': exp_result,
+        'skills_analysis': skills_result,
+        'must_have_analysis': mh_result,
+        'execution': execution
+    }
+
+
+def summarize(supervisor_agent: SupervisorAgent, edu_result: Optional[Dict], exp_result: Optional[Dict],
+              skills_result: Optional[Dict]) -> str:
+    return supervisor_agent.generate_summary(
+        experience_rationale=exp_result.get('evaluation', '') if exp_result else '',
+        skills_rationale=skills_result.get('evaluation', '') if skills_result else '',
+        education_rationale=edu_result.get('evaluation', '') if edu_result else ''
+    )
+
+
+def write_summary(result: Dict) -> Dict:
+    """Add the summary to an analysis that was run without it; others are returned unchanged."""
+    if result.get('overall_summary'):
+        return result
+    with timed('summary'):
+        summary = summarize(SupervisorAgent(), result.get('education_analysis'),
+                            result.get('experience_analysis'), result.get('skills_analysis'))
+    execution = {key: value for key, value in (result.get('execution') or {}).items() if key != 'summary_deferred'}
+    return {**result, 'overall_summary': summary, 'execution': execution}
+
+
+def short_circuit_result(supervisor_agent: SupervisorAgent, weights: Dict, mh_result: Dict) -> Dict:
+    """Result for a candidate who clearly fails a must-have and is not evaluated further."""
+    return {
+        'overall_rating': 0,
+        'overall_category': supervisor_agent.find_category(0),
+        'section_weights': weights,
+        'overall_summary': "Not evaluated further: the candidate does not meet the must-have requirements. "
+                           + mh_result['evaluation'].split('**evidence**:')[-1].strip(),
+        'education_analysis': None,
+        'experience_analysis': None,
+        'skills_analysis': None,
+        'must_have_analysis': mh_result
+    }
+
+
+def match_job_description(store: RequisitionStore, jd_text: str, requisition_id: Optional[str] = None,
+                          mode: str = JD_DEDUP_MODE) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """
+    Look for a stored requisition whose JD is a near-duplicate of jd_text and audit the match.
+
+    Returns (match, requisition): match has the matched requisition_id, similarity, method
+    and whether it was reused; requisition is the stored one (aspects, weights and weight
+    reasoning) when mode is "reuse", else None. Both are None when nothing matches or mode is "off".
+    """
+    if mode == "off":
+        return None, None
+    match = store.find_similar_requisition(jd_text, exclude_id=requisition_id)
+    if not match:
+        return None, None
+    requisition = store.get_requisition(match['requisition_id']) if mode == "reuse" else None
+    match['reused'] = requisition is not None
+    store.record_jd_match(match, match['reused'], requisition_id)
+    print(f"JD matches requisition {match['requisition_id']} ({match['method']}, similarity {match['similarity']})"
+          + ("; reusing its aspects and weights" if match['reused'] else ""))
+    return match, requisition
+
+
+def prepare_requisition(store: RequisitionStore, requisition_id: str, jd_text: str) -> Tuple[Dict, Dict]:
+    """
+    Return (aspects, weights) for a requisition, generating and storing them on first use.
+
+    A new requisition whose JD is a near-duplicate of a stored one (a repost) takes over
+    its aspects and weights instead of generating them (see match_job_description).
+    A stored requisition must be analyzed against the JD it was created with;
+    edits go through PUT /requisitions/{requisition_id}/job_description.
+    """
+    requisition = store.get_requisition(requisition_id)
+    if requisition:
+        if requisition['jd_text'] != jd_text:
+            raise RequisitionConflictError(
+                f"Requisition {requisition_id} has a different job description; update it first"
+            )
+        return requisition['aspects'], requisition['weights']
+
+    _, duplicate = match_job_description(store, jd_text, requisition_id)
+    if duplicate:
+        aspects, weights, weight_reasoning = duplicate['aspects'], duplicate['weights'], duplicate['weight_reasoning']
+    else:
+        aspects = AspectsAgent().generate_all_aspects(jd_text)
+        weights, weight_reasoning = SupervisorAgent().get_section_weights(jd_text)
+    store.save_requisition(jd_text, aspects, weights, weight_reasoning, requisition_id=requisition_id)
+    return aspects, weights
+
+
+def run_section_agents(jd_text: str, resume_text: str, aspects: Dict, model_tier: Optional[str] = None,
+                       parallel: bool = False, timings: Optional[Dict] = None) -> Tuple[Dict, Dict, Dict]:
+    """Run the education, experience and skills agents, on the given model tier and optionally in parallel."""
+    chat_model = build_tier_model(model_tier) if model_tier else None
+    stage = f"section:{model_tier or 'full'}"
+
+    def run_agent(agent_class) -> Dict:
+        with timed(stage, timings):
+            return agent_class(chat_model=chat_model).run(jd_text, resume_text, aspects)
+
+    agent_classes = (CombinedEducationAgent, CombinedExperienceAgent, CombinedSkillsAgent)
+    if not parallel:
+        return tuple(run_agent(agent_class) for agent_class in agent_classes)
+    with ThreadPoolExecutor(max_workers=len(agent_classes)) as executor:
+        # Each agent keeps the caller's context (e.g. the cache bypass flag)
+        futures = [executor.submit(contextvars.copy_context().run, run_agent, agent_class)
+                   for agent_class in agent_classes]
+        return tuple(future.result() for future in futures)
+
+
+def token_usage(usage_metadata: Dict) -> Dict:
+    """Input and output tokens summed over the models that reported usage."""
+    return {
+        'input_tokens': sum(usage.get('input_tokens', 0) for usage in usage_metadata.values()),
+        'output_tokens': sum(usage.get('output_tokens', 0) for usage in usage_metadata.values()),
+    }
+
+
+def run_analysis(jd_text: str, resume_text: str, aspects: Optional[Dict] = None,
+                 weights: Optional[Dict] = None, short_circuit: Optional[bool] = None,
+                 tiered: Optional[bool] = None, model_tier: Optional[str] = None,
+                 parallel: bool = False, include_summary: bool = True) -> Dict:
+    """
+    Run the full agent pipeline for one resume and return the AnalysisResponse fields.
+
+    With short_circuit (default MH_SHORT_CIRCUIT), a candidate whom the must-have rules
+    clearly place in Category III is not sent to the education, experience and skills agents.
+    With tiered (default CASCADE_ENABLED), those agents run on the fast model tier first
+    and only borderline or unparseable results are escalated to the full model. Otherwise
+    model_tier ("fast" or "full") picks their model and parallel runs them concurrently.
+    execution reports the seconds spent in each stage and the tokens used by model calls
+    (cached responses use none).
+    """
+    # Agent threads copy the caller's context, so their calls are counted too
+    with get_usage_metadata_callback() as usage:
+        result = _run_pipeline(jd_text, resume_text, aspects, weights, short_circuit, tiered,
+                               model_tier, parallel, include_summary)
+    result['execution']['token_usage'] = token_usage(usage.usage_metadata)
+    return result
+
+
+def _run_pipeline(jd_text: str, resume_text: str, aspects: Optional[Dict], weights: Optional[Dict],
+                  short_circuit: Optional[bool], tiered: Optional[bool], model_tier: Optional[str],
+                  parallel: bool, include_summary: bool) -> Dict:
+    supervisor_agent = SupervisorAgent()
+    if short_circuit is None:
+        short_circuit = MH_SHORT_CIRCUIT
+    if tiered is None:
+        tiered = CASCADE_ENABLED
+    timings: Dict[str, float] = {}
+
+    # Generate aspects unless they were computed once for a whole batch
+    if aspects is None:
+        with timed('aspects', timings):
+            aspects = AspectsAgent().generate_all_aspects(jd_text)
+
+    # Get section weights
+    if weights is None:
+        with timed('weights', timings):
+            weights, weight_reasoning = supervisor_agent.get_section_weights(jd_text)
+
+    # Must-haves first: the rule engine settles clear cases without any LLM call
+    with timed('must_have', timings):
+        mh_result = CombinedMHAgent().run(jd_text, resume_text, aspects, use_rules=short_circuit)
+    if short_circuit and is_short_circuited(mh_result):
+        return {**short_circuit_result(supervisor_agent, weights, mh_result), 'execution': {'stage_seconds': timings}}
+    mh_category = get_mh_category(mh_result)
+
+    # Run analyses
+    execution = {'stage_seconds': timings}
+    if tiered:
+        with timed('section:cascade', timings):
+            section_results, cascade_execution = CascadeRunner().run_sections(
+                jd_text, resume_text, aspects,
+                lambda ratings: supervisor_agent.calculate_overall_rating(
+                    edu_rating=ratings['education'],
+                    exp_rating=ratings['experience'],
+                    skills_rating=ratings['skills'],
+                    weights=weights,
+                    mh_category=mh_category
+                )[0]
+            )
+        execution.update(cascade_execution)
+        edu_result = section_results['education']
+        exp_result = section_results['experience']
+        skills_result = section_results['skills']
+    else:
+        edu_result, exp_result, skills_result = run_section_agents(
+            jd_text, resume_text, aspects, model_tier, parallel, timings
+        )
+
+    return assemble_result(supervisor_agent, weights, edu_result, exp_result, skills_result, mh_result,
+                           execution, include_summary, timings)
+
+
+def rerun_sections(jd_text: str, resume_text: str, aspects: Dict, weights: Dict, previous: Dict,
+                   sections: Iterable[str], short_circuit: Optional[bool] = None) -> Dict:
+    """
+    Re-run only the given aspect sections ('edu', 'exp', 'skills', 'mh') for a stored analysis.
+
+    Results of the other sections are reused as they are; ratings and overall rating are
+    recomputed from the combined results. The summary is only written again when an
+    education, experience or skills evaluation changed; otherwise the previous one is kept.
+    execution is reported as by run_analysis, with the sections that were re-run.
+    """
+    with get_usage_metadata_callback() as usage:
+        result = _rerun_sections(jd_text, resume_text, aspects, weights, previous, set(sections), short_circuit)
+    result['execution']['token_usage'] = token_usage(usage.usage_metadata)
+    return result
+
+
+def _rerun_sections(jd_text: str, resume_text: str, aspects: Dict, weights: Dict, previous: Dict,
+                    sections: Set[str], short_circuit: Optional[bool]) -> Dict:
+    supervisor_agent = SupervisorAgent()
+    if short_circuit is None:
+        short_circuit = MH_SHORT_CIRCUIT
+    timings: Dict[str, float] = {}
+    execution = {'stage_seconds': timings, 'rerun_sections': sorted(sections)}
+    results = {result_key: previous.get(result_key) for _, result_key in SECTION_AGENTS.values()}
+
+    if 'mh' in sections:
+        with timed('must_have', timings):
+            results['must_have_analysis'] = CombinedMHAgent().run(jd_text, resume_text, aspects, use_rules=short_circuit)
+        sections.discard('mh')
+    if short_circuit and is_short_circuited(results['must_have_analysis']):
+        return {**short_circuit_result(supervisor_agent, weights, results['must_have_analysis']), 'execution': execution}
+
+    # Sections skipped by an earlier short circuit have nothing to reuse
+    sections |= {section for section, (_, result_key) in SECTION_AGENTS.items() if results[result_key] is None}
+    for section in ('edu', 'exp', 'skills'):
+        if section in sections:
+            agent_class, result_key = SECTION_AGENTS[section]
+            with timed('section:full', timings):
+                results[result_key] = agent_class().run(jd_text, resume_text, aspects)
+
+    # The summary is written from the three evaluations only
+    unchanged = all((results[key] or {}).get('evaluation') == (previous.get(key) or {}).get('evaluation')
+                    for key in ('education_analysis', 'experience_analysis', 'skills_analysis'))
+    result = assemble_result(
+        supervisor_agent, weights,
+        results['education_analysis'], results['experience_analysis'],
+        results['skills_analysis'], results['must_have_analysis'],
+        execution, include_summary=not unchanged, timings=timings
+    )
+    if unchanged and previous.get('overall_summary'):
+        result['overall_summary'] = previous['overall_summary']
+        execution.pop('summary_deferred', None)
+        execution['summary_reused'] = True
+    return result
@@ -0,0 +1,100 @@
+# planner.py
+import os
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from cascade import MODEL_TIERS, cascade_stats
+from stage_timing import stage_stats
+
+# Load environment variables
+load_dotenv()
+
+# Typical prompt and response size of one agent call, for cost estimates
+PLANNER_INPUT_TOKENS_PER_CALL = int(os.getenv("PLANNER_INPUT_TOKENS_PER_CALL", "2500"))
+PLANNER_OUTPUT_TOKENS_PER_CALL = int(os.getenv("PLANNER_OUTPUT_TOKENS_PER_CALL", "400"))
+# Share of cascade sections escalated to the full tier, until cascade_stats has measured it
+PLANNER_PRIOR_ESCALATION_RATE = float(os.getenv("PLANNER_PRIOR_ESCALATION_RATE", "0.3"))
+
+# Model calls made by each stage (aspects: one per section; sections: clarification + evaluation)
+STAGE_CALLS = {"aspects": 4, "weights": 1, "must_have": 2, "section": 2, "summary": 1}
+RATED_SECTIONS = 3
+
+# Execution plans, most thorough first. tier is the model tier of the education, experience
+# and skills agents: "full", "cascade" (fast first, escalate borderline) or "fast".
+PLANS: List[Dict] = [
+    {"name": "full", "tier": "full", "summary": True, "short_circuit": False},
+    {"name": "cascade", "tier": "cascade", "summary": True, "short_circuit": True},
+    {"name": "fast", "tier": "fast", "summary": True, "short_circuit": True},
+    {"name": "minimal", "tier": "fast", "summary": False, "short_circuit": True},
+]
+
+
+def call_cost(tier: str) -> float:
+    config = MODEL_TIERS[tier]
+    return (PLANNER_INPUT_TOKENS_PER_CALL * config["input_price"] +
+            PLANNER_OUTPUT_TOKENS_PER_CALL * config["output_price"]) / 1_000_000
+
+
+def escalation_rate() -> float:
+    report = cascade_stats.report()
+    if not report["tiers"]["fast"]["sections"]:
+        return PLANNER_PRIOR_ESCALATION_RATE
+    return report["tiers"]["full"]["sections"] / report["tiers"]["fast"]["sections"]
+
+
+def estimate_plan(plan: Dict, aspects_ready: bool = False, parallel: bool = True) -> Dict:
+    """Estimated latency (from measured stage averages) and model cost of running a plan for one resume."""
+    seconds = 0.0
+    cost = 0.0
+    if not aspects_ready:
+        seconds += stage_stats.estimate("aspects") + stage_stats.estimate("weights")
+        cost += (STAGE_CALLS["aspects"] + STAGE_CALLS["weights"]) * call_cost("full")
+    seconds += stage_stats.estimate("must_have")
+    cost += STAGE_CALLS["must_have"] * call_cost("full")
+
+    if plan["tier"] == "cascade":
+        rate = escalation_rate()
+        section_seconds = stage_stats.estimate("section:fast") + rate * stage_stats.estimate("section:full")
+        section_cost = STAGE_CALLS["section"] * (call_cost("fast") + rate * call_cost("full"))
+        # The cascade runs its sections one after another
+        seconds += RATED_SECTIONS * section_seconds
+    else:
+        section_seconds = stage_stats.estimate(f"section:{plan['tier']}")
+        section_cost = STAGE_CALLS["section"] * call_cost(plan["tier"])
+        seconds += section_seconds if parallel else RATED_SECTIONS * section_seconds
+    cost += RATED_SECTIONS * section_cost
+
+    if plan["summary"]:
+        seconds += stage_stats.estimate("summary")
+        cost += STAGE_CALLS["summary"] * call_cost("full")
+    return {"estimated_seconds": round(seconds, 2), "estimated_cost_usd": round(cost, 6)}
+
+
+def plan_run_options(plan: Dict) -> Dict:
+    """run_analysis keyword arguments that carry out a plan."""
+    return {
+        'tiered': plan["tier"] == "cascade",
+        # The full tier runs on the agents' default model
+        'model_tier': "fast" if plan["tier"] == "fast" else None,
+        'parallel': plan["parallel"],
+        'include_summary': plan["summary"],
+        'short_circuit': plan["short_circuit"],
+    }
+
+
+def plan_execution(deadline_seconds: Optional[float] = None, max_cost_usd: Optional[float] = None,
+                   aspects_ready: bool = False, allow_cascade: bool = True) -> Dict:
+    """
+    Pick the most thorough plan whose estimates fit the deadline and cost budget.
+
+    Section agents run in parallel when there is a deadline. If no plan fits, the
+    cheapest and fastest one is returned with within_budget set to False.
+    """
+    parallel = deadline_seconds is not None
+    candidates = [plan for plan in PLANS if allow_cascade or plan["tier"] != "cascade"]
+    for plan in candidates:
+        estimate = estimate_plan(plan, aspects_ready, parallel)
+        if ((deadline_seconds is None or estimate["estimated_seconds"] <= deadline_seconds) and
+                (max_cost_usd is None or estimate["estimated_cost_usd"] <= max_cost_usd)):
+            return {**plan, **estimate, "parallel": parallel, "within_budget": True}
+    plan = candidates[-1]
+    return {**plan, **estimate_plan(plan, aspects_ready, parallel), "parallel": parallel, "within_budget": False}
@@ -0,0 +1,134 @@
+# prescreen.py
+import re
+import math
+from collections import Counter
+from typing import Dict, List, Optional
+import numpy as np
+from scipy import sparse
+
+# Tokens keep characters used in technology names (C++, C#, Node.js, .NET)
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+# Words that appear in almost every checkpoint and carry no signal about the resume
+STOPWORDS = frozenset("""
+a an and any are as at be been being by can candidate candidates check checkpoint confirm demonstrate
+demonstrated do does e.g etc evaluate evidence experience for from has have if in including is it its
+least like lists mentions must of on or other proficiency professional related resume role should
+skills such that the their them they this to verify was were whether with within years
+""".split())
+
+# Aspect keys used as lexical queries (skills and experience checkpoints)
+DEFAULT_QUERY_SECTIONS = {"skills": 0.5, "exp": 0.5}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into search tokens, dropping stopwords."""
+    if not text:
+        return []
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    return [token for token in tokens if token not in STOPWORDS and len(token) > 1]
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over resume text, stored as a SciPy sparse matrix.
+
+    Per-term BM25 weights are precomputed at fit time, so scoring a query is a
+    single sparse matrix-vector product over the query's columns.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: Dict[str, int] = {}
+        self.weights: Optional[sparse.csc_matrix] = None
+        self.num_documents = 0
+
+    def fit(self, documents: List[str]) -> "BM25Index":
+        indptr = [0]
+        indices: List[int] = []
+        counts: List[int] = []
+        for document in documents:
+            for term, count in Counter(tokenize(document)).items():
+                indices.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                counts.append(count)
+            indptr.append(len(indices))
+
+        self.num_documents = len(documents)
+        tf = sparse.csr_matrix(
+            (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(self.num_documents, len(self.vocabulary))
+        )
+
+        doc_lengths = np.asarray(tf.sum(axis=1)).ravel()
+        avg_length = doc_lengths.mean() if self.num_documents and doc_lengths.mean() > 0 else 1.0
+        doc_freq = np.bincount(tf.indices, minlength=len(self.vocabulary))
+        idf = np.log((self.num_documents - doc_freq + 0.5) / (doc_freq + 0.5) + 1.0).astype(np.float32)
+
+        # Expand per-row length normalization to every stored entry of the row
+        row_norm = self.k1 * (1 - self.b + self.b * doc_lengths / avg_length)
+        row_norm = np.repeat(row_norm, np.diff(tf.indptr)).astype(np.float32)
+        tf.data = idf[tf.indices] * tf.data * (self.k1 + 1) / (tf.data + row_norm)
+        self.weights = tf.tocsc()
+        return self
+
+    def score(self, query: str) -> np.ndarray:
+        """Return the BM25 score of every indexed document for the query."""
+        if self.weights is None:
+            raise ValueError("Index has not been fitted")
+        query_terms = Counter(term for term in tokenize(query) if term in self.vocabulary)
+        if not query_terms:
+            return np.zeros(self.num_documents, dtype=np.float32)
+        columns = np.fromiter((self.vocabulary[term] for term in query_terms), dtype=np.int64)
+        query_weights = np.fromiter(query_terms.values(), dtype=np.float32)
+        return self.weights[:, columns] @ query_weights
+
+
+class ResumePrescreener:
+    """
+    CPU-only ranking stage that shortlists resumes before any LLM evaluation.
+
+    The queries are the skills and experience checkpoints produced by AspectsAgent.
+    Each section's scores are scaled to 0-1 by the best resume and then combined
+    with the section weights, so thresholds are comparable across requisitions.
+    """
+
+    def __init__(self, resumes: List[str], k1: float = 1.5, b: float = 0.75):
+        self.index = BM25Index(k1=k1, b=b).fit(resumes)
+
+    def score(self, aspects: Dict[str, str], section_weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        section_weights = section_weights or DEFAULT_QUERY_SECTIONS
+        combined = np.zeros(self.index.num_documents, dtype=np.float32)
+        total_weight = 0.0
+        for section, weight in section_weights.items():
+            query = aspects.get(section, '')
+            if not query or weight <= 0:
+                continue
+            scores = self.index.score(query)
+            best = scores.max() if scores.size else 0.0
+            if best > 0:
+                combined += weight * scores / best
+            total_weight += weight
+        return combined / total_weight if total_weight > 0 else combined
+
+    def shortlist(self, aspects: Dict[str, str], top_k: Optional[int] = None, min_score: Optional[float] = None,
+                  section_weights: Optional[Dict[str, float]] = None) -> List[Dict]:
+        """
+        Rank resumes and flag the ones that should go to the full agent pipeline.
+
+        Returns one dict per resume, best first, with its original index, score and rank.
+        Without top_k or min_score every resume is shortlisted.
+        """
+        scores = self.score(aspects, section_weights)
+        order = np.argsort(-scores, kind="stable")
+        ranking = []
+        for rank, index in enumerate(order, start=1):
+            score = float(scores[index])
+            shortlisted = (top_k is None or rank <= top_k) and (min_score is None or score >= min_score)
+            ranking.append({
+                "index": int(index),
+                "rank": rank,
+                "score": round(score, 4) if math.isfinite(score) else 0.0,
+                "shortlisted": shortlisted
+            })
+        return ranking
@@ -0,0 +1,34 @@
+# ratings.py
+import re
+from typing import Dict, Optional
+
+
+def extract_rating(evaluation_str: str) -> int:
+    """Extract numeric rating from evaluation string."""
+    if not evaluation_str or not isinstance(evaluation_str, str):
+        return 0
+
+    evaluation_str = evaluation_str.strip()
+    if 'Rating:' in evaluation_str:
+        try:
+            rating_part = evaluation_str.split('Rating:')[-1].strip()
+            numbers = re.findall(r'\d+', rating_part)
+            if numbers:
+                return int(numbers[0])
+        except Exception:
+            pass
+    return 0
+
+
+def get_mh_category(mh_result: Optional[Dict]) -> Optional[str]:
+    """Read the must-have category (I, II or III) from the MH agent's evaluation."""
+    if mh_result and "evaluation" in mh_result:
+        evaluation_str = mh_result['evaluation']
+        if isinstance(evaluation_str, str):
+            if "Category III" in evaluation_str:
+                return "III"
+            elif "Category II" in evaluation_str:
+                return "II"
+            elif "Category I" in evaluation_str:
+                return "I"
+    return None
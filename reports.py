@@ -0,0 +1,379 @@
+# reports.py
+import io
+import os
+import base64
+import asyncio
+import datetime
+import tempfile
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
+from dotenv import load_dotenv
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject,
+                            StreamObject, TextStringObject)
+from cache_tiers import TieredCache, build_tiers
+
+# Load environment variables
+load_dotenv()
+
+# Processes rendering reports; ReportLab layout is CPU-bound and holds the GIL
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+# Rendered single-candidate reports kept in the cache tiers, keyed by analysis id and version
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "128"))
+# Total size of the rendered reports held in memory; older reports are evicted beyond it
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Candidates rendered at once while a shortlist report is assembled
+REPORT_BATCH_SIZE = int(os.getenv("REPORT_BATCH_SIZE", "16"))
+REPORT_STREAM_CHUNK = 64 * 1024
+# Shortlist reports stay in memory up to this size, then spill to a temporary file
+REPORT_SPOOL_BYTES = 8 * 1024 * 1024
+# Page attributes a page may inherit from its page tree
+INHERITED_PAGE_KEYS = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+# Result key, heading and the labels of its aspects, clarifications and evaluation
+REPORT_SECTIONS = [
+    ('mh_result', "Must-Have Requirements Analysis", "Must-Have Criteria:", "Resume Evidence:", "Evaluation:"),
+    ('edu_result', "Education Analysis", "Education Criteria:", "Resume Education Details:", "Education Match Score:"),
+    ('exp_result', "Experience Analysis", "Experience Criteria:", "Resume Experience Details:", "Experience Match Score:"),
+    ('skills_result', "Skills Analysis", "Skills Criteria:", "Resume Skills Details:", "Skills Match Score:"),
+]
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 14),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 12),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+def _paragraph(text, style) -> Paragraph:
+    # Model output can contain <, > and &, which Paragraph would read as markup
+    return Paragraph(escape(str(text or "")), style)
+
+
+def _header(styles, title: str) -> List:
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24, spaceAfter=30)
+    date_style = ParagraphStyle('DateStyle', parent=styles['Normal'], fontSize=10, textColor=colors.gray)
+    return [
+        _paragraph(title, title_style),
+        _paragraph(f"Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", date_style),
+        Spacer(1, 20),
+    ]
+
+
+def analysis_elements(styles, edu_result, exp_result, skills_result, mh_result,
+                      overall_rating, overall_category, weights, overall_summary) -> List:
+    """Flowables of one candidate's analysis: overall rating, weights, summary and each section."""
+    elements = [
+        _paragraph("Overall Candidate Analysis", styles['Heading2']),
+        _paragraph(f"Overall Rating: {overall_rating}", styles['Normal']),
+        _paragraph(f"Category: {overall_category}", styles['Normal']),
+        _paragraph("Section Weights:", styles['Heading3']),
+    ]
+    weight_data = [[section.replace('_', ' ').title(), f"{weight}%"] for section, weight in weights.items()]
+    weight_table = Table(weight_data, colWidths=[2*inch, 1*inch])
+    weight_table.setStyle(TABLE_STYLE)
+    elements.append(weight_table)
+
+    elements.append(_paragraph("Summary:", styles['Heading3']))
+    elements.append(_paragraph(overall_summary or "Not written for this analysis.", styles['Normal']))
+    elements.append(Spacer(1, 20))
+
+    results = {'edu_result': edu_result, 'exp_result': exp_result, 'skills_result': skills_result, 'mh_result': mh_result}
+    for key, heading, aspects_label, clarifications_label, evaluation_label in REPORT_SECTIONS:
+        result = results[key]
+        if result and "error" not in result:
+            elements.extend([
+                _paragraph(heading, styles['Heading2']),
+                _paragraph(aspects_label, styles['Heading3']),
+                _paragraph(result.get('aspects'), styles['Normal']),
+                _paragraph(clarifications_label, styles['Heading3']),
+                _paragraph(result.get('clarifications'), styles['Normal']),
+                _paragraph(evaluation_label, styles['Heading3']),
+                _paragraph(result.get('evaluation'), styles['Normal']),
+                Spacer(1, 20),
+            ])
+    return elements
+
+
+def generate_pdf_report(jd_text, resume_text, edu_result, exp_result, skills_result, mh_result,
+                        overall_rating, overall_category, weights, overall_summary,
+                        title: str = "JD & Resume Analysis Report") -> io.BytesIO:
+    """Generate a PDF report of the analysis results."""
+    buffer = io.BytesIO()
+    styles = getSampleStyleSheet()
+    elements = _header(styles, title) + analysis_elements(
+        styles, edu_result, exp_result, skills_result, mh_result,
+        overall_rating, overall_category, weights, overall_summary
+    )
+    SimpleDocTemplate(buffer, pagesize=letter).build(elements)
+    buffer.seek(0)
+    return buffer
+
+
+def render_report(**analysis) -> bytes:
+    """generate_pdf_report as bytes, for rendering in the process pool."""
+    return generate_pdf_report(**analysis).getvalue()
+
+
+def render_analysis_report(result: Dict, title: str = "JD & Resume Analysis Report") -> bytes:
+    """PDF of an AnalysisResponse dict (as stored with a requisition's analyses)."""
+    return generate_pdf_report(
+        None, None,
+        result.get('education_analysis'), result.get('experience_analysis'),
+        result.get('skills_analysis'), result.get('must_have_analysis'),
+        result.get('overall_rating'), result.get('overall_category'),
+        result.get('section_weights') or {}, result.get('overall_summary'),
+        title=title
+    ).getvalue()
+
+
+def render_shortlist_cover(title: str, header: List[str], rows: List[List]) -> bytes:
+    """Cover pages of a shortlist report: the ranking table, one row per candidate."""
+    buffer = io.BytesIO()
+    styles = getSampleStyleSheet()
+    table = Table([header] + [[str(value) for value in row] for row in rows], repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+    SimpleDocTemplate(buffer, pagesize=letter).build(_header(styles, title) + [table])
+    return buffer.getvalue()
+
+
+class PdfConcatenator:
+    """
+    Writes PDFs one after another into a single PDF file, with an outline entry per document.
+
+    Each appended document's pages, and the objects they use, are copied to the output as
+    soon as it is read, so only page numbers and outline titles are kept in memory until
+    close() writes the page tree, the outline and the cross-reference table.
+    """
+
+    CATALOG, PAGES, OUTLINES = 1, 2, 3
+
+    def __init__(self, output: BinaryIO):
+        self.output = output
+        self.offsets: Dict[int, int] = {}
+        self.pages: List[int] = []
+        self.outline: List[Tuple[str, int]] = []
+        self._next_id = self.OUTLINES + 1
+        output.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _allocate(self) -> int:
+        self._next_id += 1
+        return self._next_id - 1
+
+    def _write_object(self, idnum: int, obj) -> None:
+        self.offsets[idnum] = self.output.tell()
+        self.output.write(f"{idnum} 0 obj\n".encode("ascii"))
+        obj.write_to_stream(self.output, None)
+        self.output.write(b"\nendobj\n")
+
+    def append(self, pdf: bytes, title: str) -> None:
+        reader = PdfReader(io.BytesIO(pdf))
+        ids: Dict[Tuple[int, int], int] = {}
+        pending = deque()
+
+        def copy(obj):
+            # Indirect references are renumbered into the output and queued to be written once
+            if isinstance(obj, IndirectObject):
+                key = (obj.idnum, obj.generation)
+                if key not in ids:
+                    ids[key] = self._allocate()
+                    pending.append((ids[key], obj))
+                return IndirectObject(ids[key], 0, None)
+            if isinstance(obj, StreamObject):
+                # Copy the still-encoded bytes: PyPDF2 3.0 has no public setter for encoded
+                # streams (EncodedStreamObject.set_data raises), and get_data() would decode
+                # and re-compress every page. _data is why PyPDF2 is pinned in requirements.txt
+                clone = StreamObject()
+                clone._data = obj._data
+            elif isinstance(obj, DictionaryObject):
+                clone = DictionaryObject()
+            elif isinstance(obj, ArrayObject):
+                return ArrayObject(copy(item) for item in obj)
+            else:
+                return obj
+            for key, value in obj.items():
+                clone[key] = copy(value)
+            return clone
+
+        page_ids = set()
+        for page in reader.pages:
+            reference = page.indirect_reference
+            ids[(reference.idnum, reference.generation)] = page_id = self._allocate()
+            page_ids.add(page_id)
+            pending.append((page_id, reference))
+            self.pages.append(page_id)
+        if reader.pages:
+            self.outline.append((title, self.pages[-len(reader.pages)]))
+
+        while pending:
+            idnum, reference = pending.popleft()
+            obj = reference.get_object()
+            if idnum in page_ids:
+                # The page joins the output's page tree, taking along what it inherited from its own
+                page = DictionaryObject({key: value for key, value in obj.items() if key != "/Parent"})
+                parent = obj.get("/Parent")
+                while parent is not None:
+                    parent = parent.get_object()
+                    for key in INHERITED_PAGE_KEYS:
+                        if key in parent and key not in page:
+                            page[NameObject(key)] = parent[key]
+                    parent = parent.get("/Parent")
+                obj = copy(page)
+                obj[NameObject("/Parent")] = IndirectObject(self.PAGES, 0, None)
+            else:
+                obj = copy(obj)
+            self._write_object(idnum, obj)
+
+    def close(self) -> None:
+        """Write the page tree, outline, catalog and cross-reference table."""
+        self._write_object(self.PAGES, DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(IndirectObject(page, 0, None) for page in self.pages),
+            NameObject("/Count"): NumberObject(len(self.pages)),
+        }))
+
+        item_ids = [self._allocate() for _ in self.outline]
+        for position, ((title, page), idnum) in enumerate(zip(self.outline, item_ids)):
+            item = DictionaryObject({
+                NameObject("/Title"): TextStringObject(title),
+                NameObject("/Parent"): IndirectObject(self.OUTLINES, 0, None),
+                NameObject("/Dest"): ArrayObject([IndirectObject(page, 0, None), NameObject("/Fit")]),
+            })
+            if position > 0:
+                item[NameObject("/Prev")] = IndirectObject(item_ids[position - 1], 0, None)
+            if position + 1 < len(item_ids):
+                item[NameObject("/Next")] = IndirectObject(item_ids[position + 1], 0, None)
+            self._write_object(idnum, item)
+        outlines = DictionaryObject({NameObject("/Type"): NameObject("/Outlines"),
+                                     NameObject("/Count"): NumberObject(len(item_ids))})
+        if item_ids:
+            outlines[NameObject("/First")] = IndirectObject(item_ids[0], 0, None)
+            outlines[NameObject("/Last")] = IndirectObject(item_ids[-1], 0, None)
+        self._write_object(self.OUTLINES, outlines)
+
+        self._write_object(self.CATALOG, DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): IndirectObject(self.PAGES, 0, None),
+            NameObject("/Outlines"): IndirectObject(self.OUTLINES, 0, None),
+        }))
+
+        xref = self.output.tell()
+        self.output.write(f"xref\n0 {self._next_id}\n0000000000 65535 f \n".encode("ascii"))
+        for idnum in range(1, self._next_id):
+            self.output.write(f"{self.offsets[idnum]:010d} 00000 n \n".encode("ascii"))
+        self.output.write(f"trailer\n<< /Size {self._next_id} /Root {self.CATALOG} 0 R >>\n"
+                          f"startxref\n{xref}\n%%EOF\n".encode("ascii"))
+
+
+class ReportService:
+    """
+    Renders PDF reports in a pool of worker processes and caches single-candidate
+    reports by analysis id and version, so a report is rendered once per analysis.
+    The in-memory cache is bounded by cache_bytes as well as cache_size.
+    Used by the API and the Streamlit app.
+    """
+
+    def __init__(self, workers: int = REPORT_WORKERS, cache_size: int = REPORT_CACHE_SIZE,
+                 batch_size: int = REPORT_BATCH_SIZE, cache_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.cache = TieredCache(
+            build_tiers("reports", cache_size, max_bytes=cache_bytes),
+            encode=lambda pdf: base64.b64encode(pdf).decode("ascii"),
+            decode=base64.b64decode
+        )
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs server threads is unsafe
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def render(self, func: Callable[..., bytes], *args, **kwargs) -> bytes:
+        """Run a render function in the pool and wait for the PDF."""
+        return self._executor().submit(func, *args, **kwargs).result()
+
+    async def render_async(self, func: Callable[..., bytes], *args) -> bytes:
+        return await asyncio.get_running_loop().run_in_executor(self._executor(), func, *args)
+
+    async def analysis_report(self, analysis: Dict, title: Optional[str] = None) -> bytes:
+        """Report of a stored analysis (id, updated_at, candidate_id and result), from the cache when rendered before."""
+        key = f"{analysis['id']}:{analysis['updated_at']}"
+        pdf = self.cache.get(key)
+        if pdf is None:
+            pdf = await self.render_async(
+                render_analysis_report, analysis['result'], title or f"Candidate Report: {analysis['candidate_id']}"
+            )
+            self.cache.set(key, pdf)
+        return pdf
+
+    async def shortlist_report(self, title: str, header: List[str], rows: List[List],
+                               analyses: List[Dict]) -> tempfile.SpooledTemporaryFile:
+        """
+        Ranking table followed by one report per analysis, in the given order, written to a
+        temporary file. Candidates are rendered batch_size at a time in the pool and each
+        batch's pages are written to the file as it completes, so at most one batch of
+        reports is held in memory.
+        """
+        output = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES)
+        try:
+            concatenator = PdfConcatenator(output)
+            concatenator.append(await self.render_async(render_shortlist_cover, title, header, rows), "Ranking")
+            for start in range(0, len(analyses), self.batch_size):
+                batch = analyses[start:start + self.batch_size]
+                pdfs = await asyncio.gather(*[self.analysis_report(analysis) for analysis in batch])
+                for position, (analysis, pdf) in enumerate(zip(batch, pdfs), start=start + 1):
+                    concatenator.append(pdf, f"{position}. {analysis['candidate_id']}")
+            concatenator.close()
+        except BaseException:
+            output.close()
+            raise
+        output.seek(0)
+        return output
+
+    def get_stats(self) -> Dict:
+        return {**self.cache.summary(), "cache_bytes": self.cache.tiers[0].bytes, "workers": self.workers}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+def iter_file(file, chunk_size: int = REPORT_STREAM_CHUNK) -> Iterable[bytes]:
+    """Read a file in chunks for a streaming response, closing it at the end."""
+    try:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file.close()
+
+
+# Shared instance used by the API and the Streamlit app
+report_service = ReportService()
@@ -0,0 +1,420 @@
+# requisition_store.py
+import os
+import json
+import uuid
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from minhash import minhasher, normalize_text, content_hash, shingles, similarity, band_keys, to_bytes, from_bytes
+
+# Load environment variables
+load_dotenv()
+
+REQUISITION_DB_PATH = os.getenv("REQUISITION_DB_PATH", "requisitions.db")
+# Near-duplicate JDs (reposts with small edits): "reuse" their stored aspects and weights,
+# "offer" (only report the match) or "off"
+JD_DEDUP_MODE = os.getenv("JD_DEDUP_MODE", "reuse").lower()
+# Minimum estimated Jaccard similarity of the JDs' word shingles to count as a near-duplicate
+JD_DEDUP_THRESHOLD = float(os.getenv("JD_DEDUP_THRESHOLD", "0.8"))
+
+
+class RequisitionConflictError(ValueError):
+    """Raised when a requisition is used with a JD other than the one it stores."""
+
+
+class CandidateConflictError(ValueError):
+    """Raised when a candidate id already holds the analysis of a different resume."""
+
+
+def default_candidate_id(filename: Optional[str], resume_text: str) -> str:
+    """
+    Candidate id for an upload that was not given one: the file name and a hash of the resume,
+    so two applicants who both upload "resume.pdf" are stored apart, and the same resume uploaded
+    again maps to the same candidate.
+    """
+    stem = os.path.splitext(os.path.basename(filename or ""))[0] or "resume"
+    return f"{stem}-{content_hash(resume_text)[:12]}"
+
+
+class RequisitionStore:
+    """
+    SQLite store for requisitions (JD text, aspects and section weights) and the
+    analyses of candidates screened against them.
+
+    Each call opens its own connection, so the store can be shared by request
+    handlers and worker threads; WAL mode lets readers proceed during writes.
+
+    Every saved JD is fingerprinted (hash of its normalized text plus a MinHash
+    signature indexed by LSH band) so reposts of a requisition can be found; every
+    saved analysis's resume likewise, so repeat applications can be served from it.
+    """
+
+    def __init__(self, db_path: str = REQUISITION_DB_PATH):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS requisitions (
+                    id TEXT PRIMARY KEY,
+                    jd_text TEXT NOT NULL,
+                    aspects TEXT NOT NULL,
+                    weights TEXT NOT NULL,
+                    weight_reasoning TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    id TEXT PRIMARY KEY,
+                    requisition_id TEXT NOT NULL REFERENCES requisitions(id),
+                    candidate_id TEXT NOT NULL,
+                    resume_text TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    UNIQUE (requisition_id, candidate_id)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jd_fingerprints (
+                    requisition_id TEXT PRIMARY KEY REFERENCES requisitions(id),
+                    content_hash TEXT NOT NULL,
+                    signature BLOB NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jd_fingerprints_hash ON jd_fingerprints (content_hash)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jd_bands (
+                    band INTEGER NOT NULL,
+                    bucket TEXT NOT NULL,
+                    requisition_id TEXT NOT NULL,
+                    PRIMARY KEY (band, bucket, requisition_id)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jd_matches (
+                    id TEXT PRIMARY KEY,
+                    requisition_id TEXT,
+                    matched_requisition_id TEXT NOT NULL,
+                    similarity REAL NOT NULL,
+                    method TEXT NOT NULL,
+                    reused INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_fingerprints (
+                    analysis_id TEXT PRIMARY KEY REFERENCES analyses(id),
+                    requisition_id TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    signature BLOB NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS analysis_fingerprints_requisition ON analysis_fingerprints (requisition_id)"
+            )
+            # Requisitions and analyses saved before fingerprinting existed
+            for row in conn.execute(
+                "SELECT id, jd_text FROM requisitions WHERE id NOT IN (SELECT requisition_id FROM jd_fingerprints)"
+            ).fetchall():
+                self._save_fingerprint(conn, row['id'], row['jd_text'])
+            for row in conn.execute(
+                "SELECT id, requisition_id, resume_text FROM analyses "
+                "WHERE id NOT IN (SELECT analysis_id FROM analysis_fingerprints)"
+            ).fetchall():
+                self._save_resume_fingerprint(conn, row['id'], row['requisition_id'], row['resume_text'])
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _requisition_row(row: sqlite3.Row) -> Dict:
+        return {
+            'id': row['id'],
+            'jd_text': row['jd_text'],
+            'aspects': json.loads(row['aspects']),
+            'weights': json.loads(row['weights']),
+            'weight_reasoning': json.loads(row['weight_reasoning']) if row['weight_reasoning'] else None,
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+
+    @staticmethod
+    def _analysis_row(row: sqlite3.Row) -> Dict:
+        return {
+            'id': row['id'],
+            'requisition_id': row['requisition_id'],
+            'candidate_id': row['candidate_id'],
+            'resume_text': row['resume_text'],
+            'result': json.loads(row['result']),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+
+    def save_requisition(self, jd_text: str, aspects: Dict, weights: Dict, weight_reasoning: Optional[Dict] = None,
+                         requisition_id: Optional[str] = None) -> str:
+        """Insert a requisition, or replace its JD, aspects and weights if the id exists."""
+        requisition_id = requisition_id or uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO requisitions (id, jd_text, aspects, weights, weight_reasoning, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    jd_text = excluded.jd_text, aspects = excluded.aspects, weights = excluded.weights,
+                    weight_reasoning = excluded.weight_reasoning, updated_at = excluded.updated_at
+                """,
+                (requisition_id, jd_text, json.dumps(aspects), json.dumps(weights),
+                 json.dumps(weight_reasoning) if weight_reasoning else None, now, now)
+            )
+            self._save_fingerprint(conn, requisition_id, jd_text)
+        return requisition_id
+
+    @staticmethod
+    def _save_fingerprint(conn: sqlite3.Connection, requisition_id: str, jd_text: str) -> None:
+        normalized = normalize_text(jd_text)
+        signature = minhasher.signature(shingles(normalized))
+        conn.execute(
+            "INSERT OR REPLACE INTO jd_fingerprints (requisition_id, content_hash, signature) VALUES (?, ?, ?)",
+            (requisition_id, content_hash(jd_text), to_bytes(signature))
+        )
+        conn.execute("DELETE FROM jd_bands WHERE requisition_id = ?", (requisition_id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO jd_bands (band, bucket, requisition_id) VALUES (?, ?, ?)",
+            [(band, bucket, requisition_id) for band, bucket in enumerate(band_keys(signature))]
+        )
+
+    def find_similar_requisition(self, jd_text: str, threshold: float = JD_DEDUP_THRESHOLD,
+                                 exclude_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        The stored requisition whose JD is most similar to jd_text, if it reaches threshold.
+
+        Returns requisition_id, similarity and method: "exact" when the texts match
+        apart from case, spacing and punctuation, "minhash" when an LSH candidate's estimated similarity is high enough.
+        """
+        normalized = normalize_text(jd_text)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT requisition_id FROM jd_fingerprints WHERE content_hash = ? AND requisition_id IS NOT ? LIMIT 1",
+                (content_hash(jd_text), exclude_id)
+            ).fetchone()
+            if row:
+                return {'requisition_id': row['requisition_id'], 'similarity': 1.0, 'method': 'exact'}
+
+            signature = minhasher.signature(shingles(normalized))
+            buckets = list(enumerate(band_keys(signature)))
+            rows = conn.execute(
+                f"""
+                SELECT requisition_id, signature FROM jd_fingerprints WHERE requisition_id IN (
+                    SELECT requisition_id FROM jd_bands WHERE {' OR '.join(['(band = ? AND bucket = ?)'] * len(buckets))}
+                ) AND requisition_id IS NOT ?
+                """,
+                [value for bucket in buckets for value in bucket] + [exclude_id]
+            ).fetchall()
+
+        best = None
+        for row in rows:
+            score = similarity(signature, from_bytes(row['signature']))
+            if score >= threshold and (best is None or score > best['similarity']):
+                best = {'requisition_id': row['requisition_id'], 'similarity': round(score, 4), 'method': 'minhash'}
+        return best
+
+    def record_jd_match(self, match: Dict, reused: bool, requisition_id: Optional[str] = None) -> str:
+        """Audit a near-duplicate JD match; requisition_id is None for analyses without a requisition."""
+        match_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO jd_matches (id, requisition_id, matched_requisition_id, similarity, method, reused, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (match_id, requisition_id, match['requisition_id'], match['similarity'], match['method'],
+                 int(reused), datetime.now().isoformat())
+            )
+        return match_id
+
+    def list_jd_matches(self, requisition_id: str) -> List[Dict]:
+        """Matches made for a requisition, or that reused it, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jd_matches WHERE requisition_id = ? OR matched_requisition_id = ? ORDER BY created_at",
+                (requisition_id, requisition_id)
+            ).fetchall()
+        return [{**dict(row), 'reused': bool(row['reused'])} for row in rows]
+
+    def get_requisition(self, requisition_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM requisitions WHERE id = ?", (requisition_id,)).fetchone()
+        return self._requisition_row(row) if row else None
+
+    def list_requisitions(self, requisition_ids: Optional[List[str]] = None) -> List[Dict]:
+        """All requisitions, or those with the given ids, oldest first."""
+        with self._connect() as conn:
+            if requisition_ids is None:
+                rows = conn.execute("SELECT * FROM requisitions ORDER BY created_at").fetchall()
+            else:
+                rows = conn.execute(
+                    f"SELECT * FROM requisitions WHERE id IN ({', '.join('?' * len(requisition_ids))}) ORDER BY created_at",
+                    requisition_ids
+                ).fetchall()
+        return [self._requisition_row(row) for row in rows]
+
+    def save_analysis(self, requisition_id: str, candidate_id: str, resume_text: str, result: Dict,
+                      replace: bool = False) -> str:
+        """
+        Store a candidate's analysis, replacing the previous one for the same requisition and candidate.
+        A stored analysis of a different resume is only replaced with replace=True; otherwise
+        CandidateConflictError is raised, so applicants given the same id do not overwrite each other.
+        """
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            # Held until commit, so the check and the write see the same row
+            conn.execute("BEGIN IMMEDIATE")
+            existing = conn.execute(
+                "SELECT resume_text FROM analyses WHERE requisition_id = ? AND candidate_id = ?",
+                (requisition_id, candidate_id)
+            ).fetchone()
+            if (existing and not replace
+                    and content_hash(existing['resume_text'] or "") != content_hash(resume_text)):
+                raise CandidateConflictError(
+                    f"Candidate {candidate_id} of requisition {requisition_id} already has the analysis "
+                    "of a different resume; pass replace to update it"
+                )
+            conn.execute(
+                """
+                INSERT INTO analyses (id, requisition_id, candidate_id, resume_text, result, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(requisition_id, candidate_id) DO UPDATE SET
+                    resume_text = excluded.resume_text, result = excluded.result, updated_at = excluded.updated_at
+                """,
+                (uuid.uuid4().hex, requisition_id, candidate_id, resume_text, json.dumps(result), now, now)
+            )
+            row = conn.execute(
+                "SELECT id FROM analyses WHERE requisition_id = ? AND candidate_id = ?", (requisition_id, candidate_id)
+            ).fetchone()
+            self._save_resume_fingerprint(conn, row['id'], requisition_id, resume_text)
+        return row['id']
+
+    @staticmethod
+    def _save_resume_fingerprint(conn: sqlite3.Connection, analysis_id: str, requisition_id: str,
+                                 resume_text: str) -> None:
+        normalized = normalize_text(resume_text)
+        if not shingles(normalized):
+            # A resume without text (e.g. a failed extraction) must not match every other one
+            conn.execute("DELETE FROM analysis_fingerprints WHERE analysis_id = ?", (analysis_id,))
+            return
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO analysis_fingerprints (analysis_id, requisition_id, content_hash, signature)
+            VALUES (?, ?, ?, ?)
+            """,
+            (analysis_id, requisition_id, content_hash(resume_text), to_bytes(minhasher.signature(shingles(normalized))))
+        )
+
+    def find_duplicate_analysis(self, requisition_id: str, resume_text: str, threshold: float) -> Optional[Dict]:
+        """
+        The stored analysis for this requisition whose resume is most similar to resume_text,
+        if it reaches threshold: analysis_id, candidate_id, similarity and method ("exact" or "minhash").
+
+        A requisition holds few enough analyses that their signatures are compared directly.
+        A resume without text matches nothing.
+        """
+        normalized = normalize_text(resume_text)
+        if not shingles(normalized):
+            return None
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT f.analysis_id, f.content_hash, f.signature, a.candidate_id
+                FROM analysis_fingerprints f JOIN analyses a ON a.id = f.analysis_id
+                WHERE f.requisition_id = ?
+                """,
+                (requisition_id,)
+            ).fetchall()
+        if not rows:
+            return None
+
+        digest = content_hash(resume_text)
+        for row in rows:
+            if row['content_hash'] == digest:
+                return {'analysis_id': row['analysis_id'], 'candidate_id': row['candidate_id'],
+                        'similarity': 1.0, 'method': 'exact'}
+
+        signature = minhasher.signature(shingles(normalized))
+        stored = np.vstack([from_bytes(row['signature']) for row in rows])
+        scores = (stored == signature).mean(axis=1)
+        best = int(scores.argmax())
+        if scores[best] < threshold:
+            return None
+        return {'analysis_id': rows[best]['analysis_id'], 'candidate_id': rows[best]['candidate_id'],
+                'similarity': round(float(scores[best]), 4), 'method': 'minhash'}
+
+    def get_analysis(self, analysis_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+        return self._analysis_row(row) if row else None
+
+    def get_candidate_analysis(self, requisition_id: str, candidate_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM analyses WHERE requisition_id = ? AND candidate_id = ?", (requisition_id, candidate_id)
+            ).fetchone()
+        return self._analysis_row(row) if row else None
+
+    def list_analyses(self, requisition_id: str) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM analyses WHERE requisition_id = ? ORDER BY created_at", (requisition_id,)
+            ).fetchall()
+        return [self._analysis_row(row) for row in rows]
+
+    def iter_analyses(self, requisition_ids: Optional[List[str]] = None, since: Optional[str] = None,
+                      until: Optional[str] = None, min_rating: Optional[float] = None,
+                      max_rating: Optional[float] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stored analyses matching the filters, oldest first, fetched batch_size rows at a time.
+
+        since and until bound updated_at (ISO dates or timestamps; until is exclusive). A rating
+        range keeps only analyses with a numeric overall rating inside it. The filters run in SQLite,
+        so analyses outside them are never decoded. resume_text is not read.
+        """
+        clauses, params = [], []
+        if requisition_ids is not None:
+            clauses.append(f"requisition_id IN ({', '.join('?' * len(requisition_ids))})")
+            params.extend(requisition_ids)
+        if since is not None:
+            clauses.append("updated_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("updated_at < ?")
+            params.append(until)
+        if min_rating is not None or max_rating is not None:
+            clauses.append("json_type(result, '$.overall_rating') IN ('integer', 'real')")
+        if min_rating is not None:
+            clauses.append("json_extract(result, '$.overall_rating') >= ?")
+            params.append(min_rating)
+        if max_rating is not None:
+            clauses.append("json_extract(result, '$.overall_rating') <= ?")
+            params.append(max_rating)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "SELECT id, requisition_id, candidate_id, '' AS resume_text, result, created_at, updated_at "
+                f"FROM analyses {where} ORDER BY updated_at", params
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._analysis_row(row)
+        finally:
+            conn.close()
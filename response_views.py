@@ -0,0 +1,85 @@
+# response_views.py
+from typing import Any, Dict, Optional
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from ratings import extract_rating, get_mh_category
+
+try:
+    import orjson
+except ImportError:  # optional: faster serialization when installed
+    orjson = None
+
+VIEWS = ("full", "summary", "scores")
+
+# AnalysisResponse key of each rated section -> key in the lean views
+ANALYSIS_SECTIONS = {
+    'experience_analysis': 'experience',
+    'skills_analysis': 'skills',
+    'education_analysis': 'education_and_certification',
+}
+
+
+class CompactJSONResponse(JSONResponse):
+    """JSON without whitespace, serialized with orjson when it is available."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+def validate_view(view: str) -> None:
+    if view not in VIEWS:
+        raise HTTPException(status_code=400, detail=f"Unknown view: {view}; use one of {', '.join(VIEWS)}")
+
+
+def select_fields(content: Dict, fields: Optional[str]) -> Dict:
+    """Keep only the comma-separated top-level fields, if any are given."""
+    if not fields:
+        return content
+    wanted = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in wanted if field not in content]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return {field: content[field] for field in wanted}
+
+
+def analysis_view(result: Dict, view: str = "full", fields: Optional[str] = None) -> Dict:
+    """
+    Shape a run_analysis result for the response.
+
+    - full: everything, including aspects, clarifications and evaluation text
+    - summary: overall rating, category, weights, section ratings, must-have category and summary
+    - scores: as summary, without the summary text
+    """
+    if view == "full":
+        return select_fields(result, fields)
+
+    content = {
+        'overall_rating': result['overall_rating'],
+        'overall_category': result['overall_category'],
+        'section_weights': result['section_weights'],
+        'section_ratings': {
+            key: extract_rating(result[section].get('evaluation', '')) if result.get(section) else 0
+            for section, key in ANALYSIS_SECTIONS.items()
+        },
+        'mh_category': get_mh_category(result.get('must_have_analysis')),
+    }
+    if view == "summary":
+        content['overall_summary'] = result['overall_summary']
+    return select_fields(content, fields)
+
+
+def evaluation_view(evaluation: Dict, view: str = "full", fields: Optional[str] = None) -> Dict:
+    """Shape an EvaluationResponse dict; summary and scores drop the evidence lists."""
+    if view == "full":
+        return select_fields(evaluation, fields)
+
+    content = {}
+    for key, value in evaluation.items():
+        if isinstance(value, dict) and 'evidence' in value:
+            value = {name: item for name, item in value.items() if name != 'evidence'}
+        content[key] = value
+    if view == "scores":
+        content.pop('overall_summary', None)
+    return select_fields(content, fields)
@@ -0,0 +1,193 @@
+# resume_facts.py
+import os
+import re
+import json
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from cache_tiers import TieredCache, build_tiers
+from mh_rules import (
+    DEGREE_LEVELS, DEGREE_WORDS, DEGREE_ABBREVIATIONS, CERTIFICATION_HINT, CERTIFIED_PHRASE, DATE_RANGE, TITLE_WORDS,
+    MONTHS, extract_date_ranges, total_experience_years, month_index
+)
+
+# Load environment variables
+load_dotenv()
+
+# How the education, experience and skills agents use the fact sheet: "off", "alongside"
+# (fact sheet followed by the resume) or "replace" (the education agent gets only the
+# fact sheet; experience and skills still need the resume's narrative and get both)
+RESUME_FACTS_MODE = os.getenv("RESUME_FACTS_MODE", "off").lower()
+RESUME_FACTS_CACHE_SIZE = int(os.getenv("RESUME_FACTS_CACHE_SIZE", "2048"))
+# Bumped whenever the extracted facts change, so cached fact sheets are not reused across versions
+RESUME_FACTS_VERSION = "1"
+
+INSTITUTION_PATTERN = re.compile(
+    r"((?:[A-Z][\w.&'\-]*\s+)*(?:University|College|Institute|School|Academy|Polytechnic)"
+    r"(?:\s+(?:of|for|and|&)\s+[A-Z][\w.&'\-]*(?:\s+[A-Z][\w.&'\-]*)*)?)"
+)
+# "Master of Science in Computer Science": the degree's own name is not its field
+GENERIC_FIELD = re.compile(r"(?:arts|science|engineering|technology|commerce|business administration)$", re.IGNORECASE)
+FIELD_PATTERN = re.compile(r"\b(?:in|of)\s+((?:[A-Z][\w&\-]*|and|&)(?:\s+(?:[A-Z][\w&\-]*|and|&))*)")
+YEAR_PATTERN = re.compile(r"\b(?:19|20)\d{2}\b")
+VALIDITY_PATTERN = re.compile(
+    r"(?:valid\s+(?:until|till|through|thru|to)|expir(?:es|y|ed|ation)|exp\.)\s*(?:on|date)?\s*:?\s*"
+    r"(?:(?P<m>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?,?\s+|(?P<n>\d{1,2})[/\-.])?(?P<y>(?:19|20)\d{2})",
+    re.IGNORECASE
+)
+HEADING_SEPARATORS = re.compile(r"\s+(?:at|@)\s+|\s*[|,–—]\s*|\s+-\s+")
+BULLET_PATTERN = re.compile(r"^[\s\-•*·▪●◦>]+")
+# Section headings that only name a section ("Certifications", "Licenses & Certifications")
+SECTION_HEADING = re.compile(r"^(?:licen[cs]es?|certifications?|education|experience)(?:\s*(?:&|and)\s*\w+)?:?$", re.IGNORECASE)
+
+
+def _month_label(index: int) -> str:
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+def _clean(line: str) -> str:
+    return BULLET_PATTERN.sub("", line).strip(" \t:;")
+
+
+def _degree_level(line: str) -> Optional[int]:
+    levels = [level for level, pattern in DEGREE_WORDS + DEGREE_ABBREVIATIONS if pattern.search(line)]
+    return max(levels) if levels else None
+
+
+def extract_education(lines: List[str]) -> List[Dict]:
+    """Degrees with their field, institution and latest year, from lines naming a degree."""
+    education = []
+    for index, line in enumerate(lines):
+        level = _degree_level(line)
+        # "Graduated in May 2022" continues a degree line rather than naming one
+        if level is None or re.match(r"\s*graduat", line, re.IGNORECASE):
+            continue
+        # The institution and year may be on the next line, unless it names another degree or a certification
+        following = lines[index + 1] if index + 1 < len(lines) else ""
+        if _degree_level(following) is not None or CERTIFICATION_HINT.search(following):
+            following = ""
+        institution = INSTITUTION_PATTERN.search(line) or INSTITUTION_PATTERN.search(following)
+        fields = [field for field in FIELD_PATTERN.findall(line)
+                  if not GENERIC_FIELD.match(field) and field[:3].lower() not in MONTHS
+                  and not INSTITUTION_PATTERN.search(field)]
+        years = YEAR_PATTERN.findall(line) or YEAR_PATTERN.findall(following)
+        education.append({
+            'degree': DEGREE_LEVELS[level],
+            'text': _clean(line)[:120],
+            'field': fields[0] if fields else None,
+            'institution': institution.group(1).strip() if institution else None,
+            'year': int(max(years)) if years else None,
+        })
+    return education
+
+
+def extract_positions(lines: List[str], current_date: datetime) -> List[Dict]:
+    """Employment date ranges with the title and employer named around them, most recent first."""
+    now = current_date.year * 12 + current_date.month - 1
+    positions = []
+    for index, line in enumerate(lines):
+        match = DATE_RANGE.search(line)
+        # Date ranges on degree lines are study periods, not employment
+        if not match or _degree_level(line) is not None or INSTITUTION_PATTERN.search(line):
+            continue
+        ranges = extract_date_ranges(match.group(0), current_date)
+        if not ranges:
+            continue
+        start, end = ranges[0]
+        heading = _clean(HEADING_SEPARATORS.sub(" | ", (line[:match.start()] + " " + line[match.end():]).strip()).strip(" |"))
+        if not heading and index > 0:
+            heading = _clean(lines[index - 1])
+        parts = [part.strip() for part in heading.split("|") if part.strip()]
+        titles = [part for part in parts if TITLE_WORDS.search(part)]
+        previous = _clean(lines[index - 1]) if index > 0 else ""
+        if not titles and previous != heading and TITLE_WORDS.search(previous) and not DATE_RANGE.search(previous):
+            # "Data Analyst" on its own line above "Initech, 2013 - 2015"
+            titles = [previous]
+            parts = [previous] + parts
+        title = titles[0] if titles else (parts[0] if parts else None)
+        employers = [part for part in parts if part != title]
+        positions.append({
+            'title': title,
+            'employer': employers[0] if employers else None,
+            'start': _month_label(start),
+            'end': "present" if match.group("present") or end >= now else _month_label(end),
+            'months': end - start + 1,
+        })
+    return sorted(positions, key=lambda position: position['start'], reverse=True)
+
+
+def extract_certifications(lines: List[str], current_date: datetime) -> List[Dict]:
+    """Certifications and licenses with their validity, from lines that name one."""
+    now = current_date.year * 12 + current_date.month - 1
+    certifications = []
+    for line in lines:
+        text = _clean(line)
+        if not text or SECTION_HEADING.match(text) or _degree_level(line) is not None:
+            continue
+        phrase = CERTIFIED_PHRASE.search(text)
+        if not phrase and not CERTIFICATION_HINT.search(text):
+            continue
+        validity = VALIDITY_PATTERN.search(text)
+        valid_until = month_index(validity.group("m"), validity.group("n"), validity.group("y"), 12) if validity else None
+        name = phrase.group(1).strip() if phrase else VALIDITY_PATTERN.sub("", text).strip(" ,;()-")
+        certifications.append({
+            'name': name[:120],
+            'valid_until': _month_label(valid_until) if valid_until is not None else None,
+            'expired': valid_until < now if valid_until is not None else None,
+        })
+    return certifications
+
+
+def extract_facts(resume_text: str, current_date: Optional[datetime] = None) -> Dict:
+    """
+    Fact sheet of a resume found without a model: degrees, positions with date ranges,
+    total years of experience (overlaps counted once) and certifications with their validity,
+    all relative to current_date.
+    """
+    current_date = current_date or datetime.now()
+    lines = [line.strip() for line in (resume_text or "").splitlines() if line.strip()]
+    positions = extract_positions(lines, current_date)
+    employment = [range_ for line in lines
+                  if _degree_level(line) is None and not INSTITUTION_PATTERN.search(line)
+                  for range_ in extract_date_ranges(line, current_date)]
+    return {
+        'as_of': current_date.strftime("%Y-%m"),
+        'total_experience_years': total_experience_years(employment),
+        'positions': positions,
+        'education': extract_education(lines),
+        'certifications': extract_certifications(lines, current_date),
+    }
+
+
+class ResumeFactSheets:
+    """Compact JSON fact sheets of resumes, cached by resume text and month (experience totals age)."""
+
+    def __init__(self, max_entries: int = RESUME_FACTS_CACHE_SIZE):
+        self.cache = TieredCache(build_tiers("resume_facts", max_entries))
+
+    def fact_sheet(self, resume_text: str, current_date: Optional[datetime] = None) -> str:
+        current_date = current_date or datetime.now()
+        raw = "\x00".join((RESUME_FACTS_VERSION, current_date.strftime("%Y-%m"), resume_text))
+        key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        sheet = self.cache.get(key)
+        if sheet is None:
+            sheet = json.dumps(extract_facts(resume_text, current_date), separators=(",", ":"))
+            self.cache.set(key, sheet)
+        return sheet
+
+    def agent_resume(self, section: str, resume_text: str, mode: str = RESUME_FACTS_MODE) -> str:
+        """The resume input of a section agent ('education', 'experience' or 'skills') under mode."""
+        if mode not in ("alongside", "replace") or not resume_text:
+            return resume_text
+        sheet = f"Resume fact sheet (extracted automatically; dates are year-month):\n{self.fact_sheet(resume_text)}"
+        if mode == "replace" and section == "education":
+            return sheet
+        return f"{sheet}\n\nResume text:\n{resume_text}"
+
+    def get_stats(self) -> Dict:
+        return {**self.cache.summary(), "mode": RESUME_FACTS_MODE}
+
+
+# Shared instance used by the section agents
+resume_fact_sheets = ResumeFactSheets()
@@ -0,0 +1,82 @@
+# reverse_match.py
+import os
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from pipeline import run_analysis, extract_rating, get_mh_category
+from requisition_store import RequisitionStore
+from applicant_dedup import find_evaluated_duplicate
+
+# Load environment variables
+load_dotenv()
+
+# Requisitions evaluated at once; each runs its agents one after another, so this
+# bounds the number of model calls in flight for one reverse match
+REVERSE_MATCH_CONCURRENCY = int(os.getenv("REVERSE_MATCH_CONCURRENCY", "8"))
+
+RATED_SECTIONS = {
+    'experience': 'experience_analysis',
+    'skills': 'skills_analysis',
+    'education_and_certification': 'education_analysis',
+}
+
+
+def match_summary(requisition_id: str, result: Dict) -> Dict:
+    return {
+        'job_id': requisition_id,
+        'overall_rating': result['overall_rating'],
+        'overall_category': result['overall_category'],
+        'section_ratings': {
+            section: extract_rating(result[key].get('evaluation', '')) if result.get(key) else 0
+            for section, key in RATED_SECTIONS.items()
+        },
+        'mh_category': get_mh_category(result.get('must_have_analysis')),
+        'overall_summary': result['overall_summary'] or None,
+        'error': None,
+    }
+
+
+def match_requisitions(store: RequisitionStore, resume_text: str, requisitions: List[Dict],
+                       candidate_id: Optional[str] = None, short_circuit: Optional[bool] = None,
+                       tiered: Optional[bool] = None, include_summary: bool = False,
+                       max_workers: int = REVERSE_MATCH_CONCURRENCY, replace: bool = False) -> List[Dict]:
+    """
+    Evaluate one resume against many stored requisitions and rank them, best fit first.
+
+    Each requisition's stored aspects and weights are used as they are, and resume-side
+    clarifications of checkpoints shared between requisitions come from the clarification
+    cache after the first one. A requisition that already holds an analysis of this resume
+    is served from it. With candidate_id, new analyses are stored under each requisition; one
+    holding a different resume under that id is only replaced with replace.
+    The summary is skipped unless include_summary, since only the ranking is needed.
+    A requisition whose evaluation fails is ranked last with its error.
+    """
+    def evaluate(requisition: Dict) -> Dict:
+        try:
+            _, result = find_evaluated_duplicate(store, requisition['id'], resume_text)
+            if result is None:
+                result = run_analysis(
+                    requisition['jd_text'], resume_text, requisition['aspects'], requisition['weights'],
+                    short_circuit=short_circuit, tiered=tiered, include_summary=include_summary
+                )
+                if candidate_id:
+                    store.save_analysis(requisition['id'], candidate_id, resume_text, result, replace=replace)
+            return match_summary(requisition['id'], result)
+        except Exception as e:
+            print(f"Error matching requisition {requisition['id']}: {e}")
+            return {'job_id': requisition['id'], 'overall_rating': None, 'overall_category': None,
+                    'section_ratings': {}, 'mh_category': None, 'overall_summary': None, 'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(requisitions)))) as executor:
+        # Each evaluation keeps the caller's context (e.g. the cache bypass flag)
+        futures = [executor.submit(contextvars.copy_context().run, evaluate, requisition)
+                   for requisition in requisitions]
+        matches = [future.result() for future in futures]
+
+    # Failed evaluations and "NA" ratings go last
+    matches.sort(key=lambda match: (isinstance(match['overall_rating'], int), match['overall_rating']
+                                    if isinstance(match['overall_rating'], int) else 0), reverse=True)
+    for rank, match in enumerate(matches, start=1):
+        match['rank'] = rank
+    return matches
@@ -0,0 +1,91 @@
+# scoring.py
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Column order of the ratings matrix; keys match the section_weights dict
+SECTIONS = ("experience", "skills", "education_and_certification")
+
+MH_CODES = {None: 0, "I": 1, "II": 2, "III": 3}
+MH_LABELS = {code: label for label, code in MH_CODES.items()}
+
+# Upper bounds (inclusive) and labels of each category scheme
+CATEGORY_SCHEMES = {
+    # SupervisorAgent.find_category, used by /analyze and the Streamlit app
+    "supervisor": ((40, 60, 100), ("Poor Match", "Moderate Match", "Good Match"), "Overqualified"),
+    # api.calculate_overall_rating, used by /evaluate
+    "evaluate": ((40, 60, 80), ("Not Suitable", "Moderate Match", "Good Match"), "Excellent Match"),
+}
+
+
+class ScoringEngine:
+    """
+    Holds a requisition's section ratings and must-have categories as NumPy arrays.
+
+    Overall ratings, categories and rank order for every candidate are recomputed
+    in one vectorized pass, so a hiring manager can try different section weights or
+    must-have penalties without re-running any agent. With the default arguments the
+    results match SupervisorAgent.calculate_overall_rating candidate for candidate.
+    """
+
+    def __init__(self, candidate_ids: Sequence[str], ratings: np.ndarray, mh_categories: Sequence[Optional[str]]):
+        self.candidate_ids = list(candidate_ids)
+        self.ratings = np.asarray(ratings, dtype=np.float64).reshape(len(self.candidate_ids), len(SECTIONS))
+        self.mh_codes = np.fromiter((MH_CODES.get(category, 0) for category in mh_categories),
+                                    dtype=np.int8, count=len(self.candidate_ids))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "ScoringEngine":
+        """Build from dicts with candidate_id, one rating per SECTIONS key and mh_category."""
+        records = list(records)
+        ratings = np.array([[record.get(section) or 0 for section in SECTIONS] for record in records], dtype=np.float64)
+        return cls(
+            [str(record["candidate_id"]) for record in records],
+            ratings.reshape(len(records), len(SECTIONS)),
+            [record.get("mh_category") for record in records]
+        )
+
+    def overall_ratings(self, weights: Dict[str, float], mh_penalty: float = 20,
+                        penalized_categories: Sequence[str] = ("III",)) -> np.ndarray:
+        weight_vector = np.array([weights.get(section, 0) for section in SECTIONS], dtype=np.float64)
+        total = weight_vector.sum()
+        # Divide once, after the dot product, so exact .5 ratings round like the scalar scorers
+        overall = np.round(self.ratings @ weight_vector / total) if total > 0 else np.zeros(len(self.candidate_ids))
+
+        penalized = np.isin(self.mh_codes, [MH_CODES[category] for category in penalized_categories])
+        overall = np.where(penalized, np.maximum(0, overall - mh_penalty), overall)
+        return overall.astype(np.int64)
+
+    @staticmethod
+    def categories(overall: np.ndarray, scheme: str = "supervisor") -> np.ndarray:
+        bounds, labels, above = CATEGORY_SCHEMES[scheme]
+        return np.select([overall <= bound for bound in bounds], labels, default=above)
+
+    def score(self, weights: Dict[str, float], mh_penalty: float = 20,
+              penalized_categories: Sequence[str] = ("III",), scheme: str = "supervisor") -> List[Dict]:
+        """Return every candidate with its new overall rating, category and rank (best first)."""
+        overall = self.overall_ratings(weights, mh_penalty, penalized_categories)
+        categories = self.categories(overall, scheme).astype(object)
+        # Candidates with no section ratings at all are "NA", as in calculate_overall_rating
+        unrated = ~self.ratings.any(axis=1)
+        categories[unrated] = "NA"
+
+        # Rated candidates first, by rating descending; ties keep their original order
+        order = np.lexsort((-overall, unrated))
+        return [
+            {
+                "candidate_id": self.candidate_ids[index],
+                "rank": rank,
+                "overall_rating": None if unrated[index] else int(overall[index]),
+                "overall_category": categories[index],
+                "mh_category": MH_LABELS[int(self.mh_codes[index])],
+            }
+            for rank, index in enumerate(order, start=1)
+        ]
+
+
+def score_candidate(ratings: Dict[str, float], weights: Dict[str, float], mh_category: Optional[str] = None,
+                   scheme: str = "supervisor") -> Tuple[int, str]:
+    """Score a single candidate (ratings keyed by SECTIONS) through a one-row ScoringEngine."""
+    engine = ScoringEngine([""], [[ratings.get(section) or 0 for section in SECTIONS]], [mh_category])
+    overall = engine.overall_ratings(weights)
+    return int(overall[0]), str(engine.categories(overall, scheme)[0])
@@ -3,6 +3,10 @@ from langchain_google_genai import ChatGoogleGenerativeAI  # Import Gemini model
 from langchain.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
+from llm_cache import response_cache
+from clarification_cache import clarification_cache
+from resume_facts import resume_fact_sheets
+from skills_taxonomy import skill_taxonomy, SKILL_COVERAGE_MODE
 
 # Load environment variables
 load_dotenv()
@@ -18,13 +22,14 @@ model = ChatGoogleGenerativeAI(
     google_api_key=api_key,
     temperature=0.0,
     max_output_tokens=4000,  # Use max_output_tokens instead of max_tokens
-    top_p=1
+    top_p=1,
+    cache=response_cache
 )
 
 # Define the combined agent class
 class CombinedSkillsAgent:
-    def __init__(self):
-        self.model = model
+    def __init__(self, chat_model=None):
+        self.model = chat_model or model
 
         # Define the prompts for each step
         self.clarification_prompt = PromptTemplate(
@@ -104,6 +109,18 @@ Your task is to evaluate and assign a numeric rating for the candidate's skills
             if not aspects_text:
                 return {"error": "No skills aspects provided."}
 
+            # Taxonomy coverage of each checkpoint's skills, found without the model
+            coverage = skill_taxonomy.coverage(aspects_text, resume_text)
+            if SKILL_COVERAGE_MODE == "decide":
+                decision = skill_taxonomy.decide(coverage)
+                if decision:
+                    return {'aspects': aspects_text, **decision, 'source': 'taxonomy', 'skill_coverage': coverage}
+
+            # Fact sheet ahead of the resume when RESUME_FACTS_MODE is on
+            resume_text = resume_fact_sheets.agent_resume('skills', resume_text)
+            if SKILL_COVERAGE_MODE in ("evidence", "decide"):
+                resume_text = skill_taxonomy.agent_resume(coverage, resume_text)
+
             # Step 2: Generate clarifications (based on resume)
             clarifications = self.generate_clarifications(aspects_text, resume_text)
             if not clarifications:
@@ -117,12 +134,19 @@ Your task is to evaluate and assign a numeric rating for the candidate's skills
             return {
                 'aspects': aspects_text,
                 'clarifications': clarifications,
-                'evaluation': evaluation
+                'evaluation': evaluation,
+                'skill_coverage': coverage
             }
         except Exception as e:
             return {"error": f"An error occurred: {str(e)}"}
 
     def generate_clarifications(self, checkpoints: str, resume: str) -> str:
+        return clarification_cache.clarify(
+            'skills', checkpoints, resume, self.model,
+            lambda block: self._generate_clarifications(block, resume)
+        )
+
+    def _generate_clarifications(self, checkpoints: str, resume: str) -> str:
         prompt_text = self.clarification_prompt.format(checkpoints=checkpoints, resume=resume)
         response = self.model.invoke([HumanMessage(content=prompt_text)])
         return response.content.strip()
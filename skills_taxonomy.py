@@ -0,0 +1,525 @@
+# skills_taxonomy.py
+import os
+import re
+import json
+import threading
+import unicodedata
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+from checkpoints import parse_checkpoints
+
+# Load environment variables
+load_dotenv()
+
+# How the skills agent uses taxonomy coverage: "off", "evidence" (coverage given to the model
+# with the resume) or "decide" (as evidence, and full or zero coverage is rated without the model)
+SKILL_COVERAGE_MODE = os.getenv("SKILL_COVERAGE_MODE", "off").lower()
+# Ratings given in "decide" mode when every checkpoint's skills are found, or none are
+SKILL_COVERAGE_FULL_RATING = int(os.getenv("SKILL_COVERAGE_FULL_RATING", "85"))
+SKILL_COVERAGE_NONE_RATING = int(os.getenv("SKILL_COVERAGE_NONE_RATING", "20"))
+# Optional JSON file of {"Canonical skill": ["alias", ...]} merged over the built-in taxonomy
+SKILLS_TAXONOMY_PATH = os.getenv("SKILLS_TAXONOMY_PATH")
+
+FULL = "full"
+PARTIAL = "partial"
+NONE = "none"
+UNKNOWN = "unknown"
+
+# How surely a mention names its skill (see AMBIGUOUS_ALIASES)
+CERTAIN = "certain"
+AMBIGUOUS = "ambiguous"
+POSSIBLE = "possible"
+
+# Canonical skill -> aliases (the canonical name is always an alias of itself). Aliases of up to two
+# characters written in capitals are matched case-sensitively, so "r&d" or "ai-driven" do not name R or AI.
+DEFAULT_TAXONOMY: Dict[str, List[str]] = {
+    "Python": ["python", "python3", "cpython"],
+    "Java": ["java", "j2ee", "java ee", "jvm"],
+    "JavaScript": ["javascript", "ecmascript", "es6", "JS"],
+    "TypeScript": ["typescript", "TS"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp", "c sharp"],
+    "C": ["C", "ansi c"],
+    "Go": ["golang", "go lang"],
+    "Rust": ["rust", "rustlang"],
+    "Scala": ["scala"],
+    "Kotlin": ["kotlin"],
+    "R": ["R", "rstudio", "r programming", "r language", "tidyverse", "ggplot2"],
+    "MATLAB": ["matlab"],
+    "SQL": ["sql", "t-sql", "tsql", "pl/sql", "plsql", "ansi sql"],
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MySQL": ["mysql", "mariadb"],
+    "Oracle Database": ["oracle database", "oracle db", "oracle 19c", "oracle 12c"],
+    "SQL Server": ["sql server", "mssql", "ms sql"],
+    "MongoDB": ["mongodb", "mongo db"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch", "elastic search", "opensearch", "elk stack"],
+    "Cassandra": ["cassandra"],
+    "Snowflake": ["snowflake"],
+    "BigQuery": ["bigquery", "big query"],
+    "Redshift": ["redshift"],
+    "Databricks": ["databricks"],
+    "Spark": ["spark", "apache spark", "pyspark", "spark sql", "sparksql"],
+    "Hadoop": ["hadoop", "hdfs", "mapreduce", "map reduce", "hive"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Airflow": ["airflow", "apache airflow"],
+    "dbt": ["dbt", "data build tool"],
+    "ETL": ["etl", "elt", "etl processes", "data pipelines", "data pipeline", "informatica", "talend", "ssis"],
+    "Data Warehousing": ["data warehousing", "data warehouse", "data warehouses", "dwh", "data marts",
+                         "star schema", "snowflake schema"],
+    "Data Modeling": ["data modeling", "data modelling", "dimensional modeling", "dimensional modelling", "erd"],
+    "Data Visualization": ["data visualization", "data visualisation", "dashboards", "dashboarding"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Looker": ["looker"],
+    "Excel": ["excel", "ms excel", "microsoft excel", "vba"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "SciPy": ["scipy"],
+    "scikit-learn": ["scikit-learn", "scikit learn", "sklearn"],
+    "TensorFlow": ["tensorflow", "keras"],
+    "PyTorch": ["pytorch", "torch"],
+    "Machine Learning": ["machine learning", "ML", "predictive modeling", "predictive modelling"],
+    "Deep Learning": ["deep learning", "neural networks", "neural network", "cnn", "rnn", "lstm"],
+    "Natural Language Processing": ["natural language processing", "NLP", "text mining", "spacy", "nltk"],
+    "Computer Vision": ["computer vision", "opencv", "image recognition"],
+    "Generative AI": ["generative ai", "genai", "gen ai", "llm", "llms", "large language models",
+                      "large language model", "langchain", "prompt engineering"],
+    "Artificial Intelligence": ["artificial intelligence", "AI"],
+    "Statistics": ["statistics", "statistical modeling", "statistical modelling", "statistical analysis",
+                   "hypothesis testing", "regression analysis", "a/b testing"],
+    "MLOps": ["mlops", "ml ops", "mlflow", "kubeflow", "sagemaker"],
+    "AWS": ["aws", "amazon web services", "ec2", "s3", "aws lambda"],
+    "Google Cloud": ["google cloud", "google cloud platform", "gcp"],
+    "Azure": ["azure", "microsoft azure"],
+    "Cloud Computing": ["cloud computing", "cloud platforms", "cloud platform", "cloud services", "cloud infrastructure"],
+    "Docker": ["docker", "containers", "containerization", "containerisation"],
+    "Kubernetes": ["kubernetes", "k8s", "eks", "aks", "gke", "openshift"],
+    "Terraform": ["terraform", "infrastructure as code", "iac"],
+    "Ansible": ["ansible"],
+    "CI/CD": ["ci/cd", "continuous integration", "continuous delivery", "continuous deployment", "jenkins",
+              "github actions", "gitlab ci", "circleci"],
+    "Git": ["git", "github", "gitlab", "bitbucket"],
+    "Linux": ["linux", "unix", "bash", "shell scripting"],
+    "REST APIs": ["rest api", "rest apis", "restful", "restful apis", "rest services"],
+    "GraphQL": ["graphql"],
+    "Microservices": ["microservices", "micro services", "microservice architecture"],
+    "React": ["react", "react.js", "reactjs"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue": ["vue", "vue.js", "vuejs"],
+    "Node.js": ["node.js", "nodejs", "node js", "express.js", "expressjs"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring": ["spring", "spring boot", "springboot"],
+    ".NET": [".net", "dotnet", "asp.net", ".net core"],
+    "HTML/CSS": ["html", "html5", "css", "css3", "sass", "tailwind"],
+    "iOS Development": ["ios", "swift", "swiftui", "objective-c"],
+    "Android Development": ["android", "android sdk", "jetpack compose"],
+    "Agile": ["agile", "scrum", "kanban", "sprint planning"],
+    "Jira": ["jira"],
+    "Project Management": ["project management", "pmp", "prince2"],
+    "Stakeholder Management": ["stakeholder management", "stakeholder engagement"],
+    "Leadership": ["leadership", "team leadership", "people management", "team management"],
+    "Communication": ["communication skills", "written communication", "verbal communication"],
+    "Cybersecurity": ["cybersecurity", "cyber security", "information security", "infosec", "siem",
+                      "penetration testing", "vulnerability assessment"],
+    "Networking": ["networking", "tcp/ip", "dns", "routing and switching", "ccna"],
+    "SAP": ["sap", "sap erp", "s/4hana", "sap hana"],
+    "Salesforce": ["salesforce", "sfdc"],
+    "Financial Modeling": ["financial modeling", "financial modelling", "financial analysis", "dcf"],
+    "SEO": ["seo", "search engine optimization", "search engine optimisation"],
+}
+
+# Aliases that are also everyday words or initials: "I excel at", "react quickly", "Spring 2020 intern",
+# "Grade: C", "R. Smith". They only name the skill when not written in lowercase and, in a resume, in a
+# skills context (after a heading such as "Skills:" or listed with another skill), and a requirement that
+# rests on one of them is never rated without the model.
+AMBIGUOUS_ALIASES = frozenset({
+    "c", "r", "go", "react", "swift", "excel", "spring", "torch", "agile", "containers", "hive", "rust",
+    "spark", "flask", "snowflake", "looker", "angular", "networking",
+})
+
+# Skills a resume demonstrates by naming a narrower one: a checkpoint asking for "cloud platforms" is
+# covered by AWS, and one asking for machine learning by scikit-learn
+SKILL_PARENTS: Dict[str, List[str]] = {
+    "AWS": ["Cloud Computing"], "Google Cloud": ["Cloud Computing"], "Azure": ["Cloud Computing"],
+    "PostgreSQL": ["SQL"], "MySQL": ["SQL"], "SQL Server": ["SQL"], "Oracle Database": ["SQL"],
+    "BigQuery": ["SQL", "Data Warehousing"], "Snowflake": ["Data Warehousing"], "Redshift": ["Data Warehousing"],
+    "Tableau": ["Data Visualization"], "Power BI": ["Data Visualization"], "Looker": ["Data Visualization"],
+    "scikit-learn": ["Machine Learning"], "TensorFlow": ["Deep Learning", "Machine Learning"],
+    "PyTorch": ["Deep Learning", "Machine Learning"], "Deep Learning": ["Machine Learning"],
+    "Natural Language Processing": ["Machine Learning"], "Computer Vision": ["Machine Learning"],
+    "Machine Learning": ["Artificial Intelligence"], "Generative AI": ["Artificial Intelligence"],
+    "Airflow": ["ETL"], "dbt": ["ETL"], "Kubernetes": ["Docker"],
+    "Pandas": ["Python"], "NumPy": ["Python"], "SciPy": ["Python"], "Django": ["Python"],
+    "Flask": ["Python"], "FastAPI": ["Python"], "Spring": ["Java"], "TypeScript": ["JavaScript"],
+    "React": ["JavaScript"], "Angular": ["JavaScript"], "Vue": ["JavaScript"], "Node.js": ["JavaScript"],
+    "Jira": ["Agile"],
+}
+
+# Characters that continue a word for boundary checks ("C" must not match inside "C++" or "C#");
+# short aliases also treat hyphens as part of a word, so "C-level" does not name C
+WORD_CHARS = frozenset("+#")
+SHORT_WORD_CHARS = frozenset("+#-")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Text between two skills of a checkpoint that makes them alternatives: "AWS or Azure", "Java/Kotlin",
+# or examples of a broader skill: "cloud platforms like AWS", "BI tools (e.g. Tableau, Power BI)"
+OR_GAP = re.compile(r"\s*,?\s*(?:or|and/or|/|\|)\s*", re.IGNORECASE)
+EXAMPLE_WORDS = r"(?:(?:like|such as|for example|for instance|including|preferably)\b|e\.g\.?|i\.e\.?)\s*:?,?"
+EXAMPLE_GAP = re.compile(rf"\s*,?\s*(?:\(\s*(?:{EXAMPLE_WORDS})?|[-:]?\s*{EXAMPLE_WORDS})\s*", re.IGNORECASE)
+COMMA_GAP = re.compile(r"\s*,\s*")
+# Examples of a skill outside the taxonomy: "BI tools (e.g. Tableau, Power BI)"
+EXAMPLES_START = re.compile(rf"(?:\(\s*|\b){EXAMPLE_WORDS}\s*\(?\s*$", re.IGNORECASE)
+# A skills heading or phrase just before a mention: "Skills:", "Tech stack -", "experience with", "using"
+SKILLS_CONTEXT = re.compile(
+    r"(?:skills|technologies|tools|stack|frameworks|languages|libraries|platforms|"
+    r"(?:experience|experienced|proficient|proficiency|skilled|expertise) (?:in|with)|\bwith|\busing)\s*[:\-–]?\s*$",
+    re.IGNORECASE
+)
+SKILLS_CONTEXT_WINDOW = 40
+# Text between two mentions of one list: "C, R", "C/C++", "Spark and Airflow"
+LIST_GAP = re.compile(r"\s*(?:[,;/|&•·]|\band\b|\bor\b)?\s*", re.IGNORECASE)
+
+
+def normalize_text(text: str) -> str:
+    """Fold Unicode compatibility forms and collapse whitespace, keeping case and punctuation."""
+    return WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFKC", text or ""))
+
+
+def _is_word_char(char: str, word_chars: frozenset = WORD_CHARS) -> bool:
+    return char.isalnum() or char in word_chars
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a fixed set of patterns: one pass over a text finds every
+    occurrence of every pattern, in time linear in the text (plus the matches), however many
+    patterns there are.
+    """
+
+    def __init__(self):
+        # Trie as goto tables; state 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (pattern length, value) of every pattern ending at the state, including via failure links
+        self._output: List[List[Tuple[int, str]]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, value: str) -> None:
+        if self._built:
+            raise ValueError("Patterns cannot be added after the automaton is built")
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), value))
+
+    def build(self) -> "AhoCorasick":
+        """Compute failure links breadth-first, so each state's link points to a shallower state."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, value) of every pattern occurrence in text, by end position."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._output[state]:
+                yield index - length + 1, index + 1, value
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+
+class SkillTaxonomy:
+    """
+    Skills taxonomy compiled into two Aho-Corasick automata: one over lowercased text for
+    ordinary aliases and one over the original text for short, case-sensitive ones. Scanning
+    a document finds its canonical skills in one linear pass.
+
+    coverage() reads the skills each checkpoint names and reports which of them a resume
+    shows, directly, through an alias ("PySpark" counts as Spark) or through a narrower
+    skill (AWS counts as cloud computing). Mentions through AMBIGUOUS_ALIASES are evidence
+    but never make the coverage "full" or "none".
+    """
+
+    def __init__(self, taxonomy: Optional[Dict[str, List[str]]] = None,
+                 parents: Optional[Dict[str, List[str]]] = None):
+        self.taxonomy = taxonomy or DEFAULT_TAXONOMY
+        self.parents = parents if parents is not None else SKILL_PARENTS
+        self._insensitive = AhoCorasick()
+        self._sensitive = AhoCorasick()
+        for skill, aliases in self.taxonomy.items():
+            for alias in {skill, *aliases}:
+                alias = normalize_text(alias).strip()
+                if len(alias) <= 2 and alias != alias.lower():
+                    self._sensitive.add(alias, skill)
+                else:
+                    self._insensitive.add(alias.lower(), skill)
+        self._insensitive.build()
+        self._sensitive.build()
+        self._lock = threading.Lock()
+        self.stats = {"coverages": 0, "decided_full": 0, "decided_none": 0}
+
+    def _scan(self, text: str, context: bool) -> Tuple[str, List[Tuple[int, int, str, str]]]:
+        """
+        Normalized text and its skill mentions as (start, end, skill, kind), leftmost-longest and not
+        overlapping: "Spark SQL" names Spark, not also SQL. kind is CERTAIN for ordinary aliases; an
+        ambiguous alias is AMBIGUOUS when not in lowercase and, with context, in a skills context,
+        and POSSIBLE otherwise.
+        """
+        normalized = normalize_text(text)
+        matches = []
+        for source, automaton, word_chars in ((normalized.lower(), self._insensitive, WORD_CHARS),
+                                              (normalized, self._sensitive, SHORT_WORD_CHARS)):
+            for start, end, skill in automaton.iter_matches(source):
+                # Whole words only: "java" must not match inside "javascript"
+                if ((start > 0 and _is_word_char(source[start - 1], word_chars))
+                        or (end < len(source) and _is_word_char(source[end], word_chars))):
+                    continue
+                matches.append((start, end, skill))
+        mentions: List[Tuple[int, int, str]] = []
+        for start, end, skill in sorted(matches, key=lambda match: (match[0], -match[1])):
+            if not mentions or start >= mentions[-1][1]:
+                mentions.append((start, end, skill))
+
+        kinds: List[Optional[str]] = []
+        for start, end, _ in mentions:
+            alias = normalized[start:end]
+            if alias.lower() not in AMBIGUOUS_ALIASES:
+                kinds.append(CERTAIN)
+            elif alias == alias.lower():
+                kinds.append(POSSIBLE)
+            elif not context or SKILLS_CONTEXT.search(normalized[max(start - SKILLS_CONTEXT_WINDOW, 0):start]):
+                kinds.append(AMBIGUOUS)
+            else:
+                kinds.append(None)
+        # An ambiguous alias listed next to a skill is in a skills context too: "C, R, Python"
+        listed = [bool(LIST_GAP.fullmatch(normalized[previous[1]:current[0]]))
+                  for previous, current in zip(mentions, mentions[1:])]
+        for order in (range(1, len(mentions)), range(len(mentions) - 2, -1, -1)):
+            for index in order:
+                neighbour = index - 1 if order.step == 1 else index + 1
+                if (kinds[index] is None and kinds[neighbour] in (CERTAIN, AMBIGUOUS)
+                        and listed[min(index, neighbour)]):
+                    kinds[index] = AMBIGUOUS
+        return normalized, [(start, end, skill, kind or POSSIBLE)
+                            for (start, end, skill), kind in zip(mentions, kinds)]
+
+    def scan(self, text: str, context: bool = True) -> Tuple[str, List[Tuple[int, int, str]]]:
+        """
+        Normalized text and its skill mentions as (start, end, skill), leftmost-longest and not
+        overlapping: "Spark SQL" names Spark, not also SQL. Ambiguous aliases are left out unless
+        written as a skill (and, with context, in a skills context).
+        """
+        normalized, mentions = self._scan(text, context)
+        return normalized, [(start, end, skill) for start, end, skill, kind in mentions if kind != POSSIBLE]
+
+    def find_skills(self, text: str) -> Dict[str, str]:
+        """Canonical skills named in text, in order of first mention, with the text that named them."""
+        normalized, mentions = self.scan(text)
+        found: Dict[str, str] = {}
+        for start, end, skill in mentions:
+            found.setdefault(skill, normalized[start:end])
+        return found
+
+    def requirements(self, checkpoint: str) -> List[List[str]]:
+        """
+        Skills a checkpoint asks for, as groups of alternatives: "Python and SQL" is two
+        requirements, "cloud platforms like AWS or Azure" one that any of its skills meets.
+        """
+        return self._requirements(checkpoint)[0]
+
+    def _requirements(self, checkpoint: str) -> Tuple[List[List[str]], Set[str]]:
+        """requirements(), and the skills the checkpoint only names through an ambiguous alias."""
+        # A skills checkpoint is itself a skills context
+        normalized, mentions = self._scan(checkpoint, context=False)
+        ambiguous = ({skill for _, _, skill, kind in mentions if kind == AMBIGUOUS}
+                     - {skill for _, _, skill, kind in mentions if kind == CERTAIN})
+        mentions = [(start, end, skill) for start, end, skill, kind in mentions if kind != POSSIBLE]
+        gaps = [normalized[previous[1]:current[0]] for previous, current in zip(mentions, mentions[1:])]
+        groups: List[List[str]] = []
+        in_examples = bool(mentions) and bool(EXAMPLES_START.search(normalized[:mentions[0][0]]))
+        for index, (_, _, skill) in enumerate(mentions):
+            gap = gaps[index - 1] if index else None
+            if gap is None:
+                joined = False
+            elif OR_GAP.fullmatch(gap):
+                joined = True
+            elif EXAMPLE_GAP.fullmatch(gap):
+                joined = in_examples = True
+            elif COMMA_GAP.fullmatch(gap):
+                # "AWS, Azure or GCP": a comma list is alternatives if it ends in "or" (or lists examples)
+                following = next((later for later in gaps[index:] if not COMMA_GAP.fullmatch(later)), "")
+                joined = in_examples or bool(OR_GAP.fullmatch(following))
+            else:
+                # Other words end a list, but may introduce examples: "ML frameworks, e.g. TensorFlow or PyTorch"
+                joined, in_examples = False, bool(EXAMPLES_START.search(gap))
+            if any(skill in group for group in groups):
+                continue
+            if joined and groups:
+                groups[-1].append(skill)
+            else:
+                groups.append([skill])
+        return groups, ambiguous
+
+    def _implied(self, skills: Dict[str, str]) -> Dict[str, str]:
+        """Skills with the broader skills they demonstrate; implied ones name the narrower skill."""
+        implied = dict(skills)
+        queue = deque(skills)
+        while queue:
+            skill = queue.popleft()
+            for parent in self.parents.get(skill, []):
+                if parent not in implied:
+                    implied[parent] = f"via {skill}"
+                    queue.append(parent)
+        return implied
+
+    def coverage(self, aspects_text: str, resume_text: str) -> Dict:
+        """
+        Per-checkpoint coverage of the taxonomy skills each skills checkpoint names.
+
+        A checkpoint's coverage is the share of its requirements (see requirements()) the resume
+        meets, or None when it names no taxonomy skill (only the model can judge it). The status is "full" or "none"
+        only when every checkpoint names skills and all, or none, of them are shown. A requirement is
+        "uncertain" when its outcome rests on an ambiguous alias, in the checkpoint or the resume;
+        any uncertain requirement makes the status "partial".
+        """
+        with self._lock:
+            self.stats["coverages"] += 1
+        normalized, mentions = self._scan(resume_text, context=True)
+        resume_skills: Dict[str, str] = {}
+        certain: Dict[str, str] = {}
+        possible: Dict[str, str] = {}
+        for start, end, skill, kind in mentions:
+            named = normalized[start:end]
+            if kind == POSSIBLE:
+                possible.setdefault(skill, named)
+                continue
+            resume_skills.setdefault(skill, named)
+            if kind == CERTAIN:
+                certain.setdefault(skill, named)
+        shown = self._implied(resume_skills)
+        # Skills shown through an ordinary alias, and skills only a lowercase or out-of-context word may name
+        certainly_shown = self._implied(certain)
+        maybe_shown = self._implied(possible)
+
+        checkpoints = []
+        for checkpoint in parse_checkpoints(aspects_text):
+            # Each requirement is named by its alternatives ("AWS or Azure") and met by the first one shown
+            requirements, ambiguous = self._requirements(checkpoint)
+            groups = {" or ".join(group): group for group in requirements}
+            evidence = {}
+            uncertain = []
+            for requirement, group in groups.items():
+                met = next((skill for skill in group if skill in shown), None)
+                named = [skill for skill in group if skill not in ambiguous]
+                if met:
+                    evidence[requirement] = shown[met] if len(group) == 1 else f"{met}: {shown[met]}"
+                    if not any(skill in certainly_shown for skill in named):
+                        uncertain.append(requirement)
+                elif len(named) < len(group) or any(skill in maybe_shown for skill in group):
+                    uncertain.append(requirement)
+            checkpoints.append({
+                'checkpoint': checkpoint,
+                'required': list(groups),
+                'found': list(evidence),
+                'missing': [requirement for requirement in groups if requirement not in evidence],
+                'uncertain': uncertain,
+                'evidence': evidence,
+                'coverage': round(len(evidence) / len(groups), 4) if groups else None,
+            })
+
+        required_total = sum(len(entry['required']) for entry in checkpoints)
+        found_total = sum(len(entry['found']) for entry in checkpoints)
+        if not required_total:
+            status = UNKNOWN
+        elif (any(entry['coverage'] is None or entry['uncertain'] for entry in checkpoints)
+              or 0 < found_total < required_total):
+            status = PARTIAL
+        else:
+            status = FULL if found_total else NONE
+        return {
+            'status': status,
+            'coverage': round(found_total / required_total, 4) if required_total else None,
+            'checkpoints': checkpoints,
+            'resume_skills': list(resume_skills),
+        }
+
+    @staticmethod
+    def format_evidence(coverage: Dict) -> str:
+        """Coverage as the "Checkpoint N: ..." lines given to the skills agent."""
+        lines = []
+        for number, entry in enumerate(coverage['checkpoints'], start=1):
+            if not entry['required']:
+                lines.append(f"Checkpoint {number}: names no skill from the taxonomy")
+                continue
+            found = ", ".join(f"{skill} ({entry['evidence'][skill]})" for skill in entry['found']) or "none"
+            missing = ", ".join(entry['missing']) or "none"
+            lines.append(f"Checkpoint {number}: found {found}; not found {missing}")
+        return "\n".join(lines)
+
+    def agent_resume(self, coverage: Dict, resume_text: str) -> str:
+        """The skills agent's resume input, with the coverage ahead of the resume."""
+        return ("Skill coverage (matched automatically against a skills taxonomy; a skill in parentheses "
+                f"is how the resume names it):\n{self.format_evidence(coverage)}\n\nResume text:\n{resume_text}")
+
+    def decide(self, coverage: Dict) -> Optional[Dict]:
+        """
+        Clarifications and evaluation for a clear-cut coverage ("full" or "none"), in the
+        skills agent's output format, or None when the model has to judge.
+        """
+        if coverage['status'] not in (FULL, NONE):
+            return None
+        full = coverage['status'] == FULL
+        rating = SKILL_COVERAGE_FULL_RATING if full else SKILL_COVERAGE_NONE_RATING
+        required = list(dict.fromkeys(requirement for entry in coverage['checkpoints'] for requirement in entry['required']))
+        evidence = (f"The resume names every skill the checkpoints require: {'; '.join(required)}." if full
+                    else f"The resume names none of the skills the checkpoints require: {'; '.join(required)}.")
+        with self._lock:
+            self.stats["decided_full" if full else "decided_none"] += 1
+        return {
+            'clarifications': self.format_evidence(coverage),
+            'evaluation': f"- **Rating:** {rating}\n- **Evidence:** {evidence} Rated from taxonomy skill coverage.",
+        }
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update(mode=SKILL_COVERAGE_MODE, skills=len(self.taxonomy),
+                     states=self._insensitive.states + self._sensitive.states)
+        return stats
+
+
+def load_taxonomy(path: Optional[str] = SKILLS_TAXONOMY_PATH) -> Dict[str, List[str]]:
+    """The built-in taxonomy, with the skills of a JSON taxonomy file added or replaced."""
+    taxonomy = dict(DEFAULT_TAXONOMY)
+    if path:
+        with open(path, encoding="utf-8") as file:
+            taxonomy.update(json.load(file))
+    return taxonomy
+
+
+# Shared instance used by the skills agent and the API
+skill_taxonomy = SkillTaxonomy(load_taxonomy())
@@ -0,0 +1,69 @@
+# stage_timing.py
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Weight of the newest sample in the moving average
+STAGE_TIMING_ALPHA = float(os.getenv("STAGE_TIMING_ALPHA", "0.2"))
+
+# Starting estimates in seconds, used until a stage has been measured
+PRIOR_STAGE_SECONDS = {
+    "aspects": 8.0,
+    "weights": 3.0,
+    "must_have": 5.0,
+    "section:full": 6.0,
+    "section:fast": 3.0,
+    "summary": 3.0,
+}
+
+
+class StageStats:
+    """Exponential moving average of the latency of each pipeline stage, shared by all requests."""
+
+    def __init__(self, alpha: float = STAGE_TIMING_ALPHA):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.setdefault(stage, {"count": 0, "avg_seconds": seconds, "max_seconds": 0.0})
+            entry["count"] += 1
+            entry["avg_seconds"] += self.alpha * (seconds - entry["avg_seconds"])
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def estimate(self, stage: str) -> float:
+        with self._lock:
+            entry = self._stages.get(stage)
+            return entry["avg_seconds"] if entry else PRIOR_STAGE_SECONDS.get(stage, 5.0)
+
+    def report(self) -> Dict:
+        with self._lock:
+            return {
+                stage: {**entry, "avg_seconds": round(entry["avg_seconds"], 3), "max_seconds": round(entry["max_seconds"], 3)}
+                for stage, entry in self._stages.items()
+            }
+
+
+stage_stats = StageStats()
+_timings_lock = threading.Lock()
+
+
+@contextmanager
+def timed(stage: str, timings: Optional[Dict[str, float]] = None) -> Iterator[None]:
+    """Record how long the block took, in stage_stats and (summed per stage) in timings."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stage_stats.record(stage, seconds)
+        if timings is not None:
+            with _timings_lock:
+                timings[stage] = round(timings.get(stage, 0.0) + seconds, 3)
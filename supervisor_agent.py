@@ -1,6 +1,8 @@
 # supervisor_agent.py
 import os
 from dotenv import load_dotenv
+from llm_cache import response_cache
+from scoring import score_candidate
 load_dotenv()
 import json
 from typing import Dict, Tuple
@@ -55,7 +57,8 @@ class SupervisorAgent:
             temperature=0.0,
             max_output_tokens=4000,  # Use max_output_tokens instead of max_tokens
             top_p=1,
-            top_k=1
+            top_k=1,
+            cache=response_cache
         )
 
     def get_section_weights(self, job_description: str) -> Tuple[Dict, Dict]:
@@ -173,28 +176,9 @@ Provide a 2-3 line summary highlighting the candidate's strengths and weaknesses
         if edu_rating == 0 and exp_rating == 0 and skills_rating == 0:
             return "NA", "NA"
 
-        experience_weight = weights.get('experience', 0)
-        skills_weight = weights.get('skills', 0)
-        education_weight = weights.get('education_and_certification', 0)
-
-        total_weight = experience_weight + skills_weight + education_weight
-
-        if total_weight != 100.0 and total_weight > 0:
-            experience_weight = (experience_weight / total_weight) * 100
-            skills_weight = (skills_weight / total_weight) * 100
-            education_weight = (education_weight / total_weight) * 100
-            total_weight = 100.0
-
-        experience_score = (exp_rating * experience_weight) / 100
-        skills_score = (skills_rating * skills_weight) / 100
-        education_score = (edu_rating * education_weight) / 100
-
-        overall_rating = round(experience_score + skills_score + education_score)
-
-        # Apply penalty for missing must-have requirements
-        if mh_category and "III" in mh_category:
-            overall_rating = max(0, overall_rating - 20)  # Reduce by 20 points, but not below 0
-
-        overall_category = self.find_category(overall_rating)
-
-        return overall_rating, overall_category
\ No newline at end of file
+        # Same arithmetic as ScoringEngine, which re-scores whole requisitions; a missing
+        # must-have (category III) costs 20 points, but not below 0
+        return score_candidate(
+            {'experience': exp_rating, 'skills': skills_rating, 'education_and_certification': edu_rating},
+            weights, "III" if mh_category and "III" in mh_category else mh_category
+        )
\ No newline at end of file
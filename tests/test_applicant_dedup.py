@@ -0,0 +1,28 @@
+# tests/test_applicant_dedup.py
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from applicant_dedup import find_batch_duplicates
+from requisition_store import RequisitionStore
+
+RESUME = "Jane Roe\njane@example.com\nSoftware Engineer, Acme, 2019 - 2023\nPython, SQL and AWS"
+
+
+def test_resumes_without_text_are_never_duplicates():
+    assert find_batch_duplicates(["", "", " \n"]) == [None, None, None]
+
+
+def test_exact_duplicates_keep_dates_and_contact_details():
+    duplicates = find_batch_duplicates([RESUME, RESUME.upper(), RESUME.replace("jane@", "j.roe@")])
+    assert duplicates[1] == {'index': 0, 'similarity': 1.0, 'method': 'exact'}
+    assert duplicates[2] is None or duplicates[2]['method'] == 'minhash'
+
+
+def test_stored_resume_without_text_matches_nothing():
+    with tempfile.TemporaryDirectory() as directory:
+        store = RequisitionStore(os.path.join(directory, "requisitions.db"))
+        store.save_analysis("req", "scan-1", "", {})
+        assert store.find_duplicate_analysis("req", "", 0.9) is None
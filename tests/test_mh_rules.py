@@ -0,0 +1,52 @@
+# tests/test_mh_rules.py
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mh_rules import AMBIGUOUS, FAIL, PASS, MustHaveRuleEngine, check_certification, check_years
+
+NOW = datetime(2026, 10, 1)
+
+
+def test_certification_acronym_spelled_out_is_not_a_failure():
+    resume = "Jane Roe\nCertified Public Accountant, State of Ohio\nSenior Accountant, 2015 - Present"
+    assert check_certification("Must have CPA certification.", resume)["status"] == AMBIGUOUS
+
+
+def test_license_acronym_spelled_out_is_not_a_failure():
+    resume = "John Doe\nRegistered Nurse, licensed in California\nStaff Nurse, 2012 - Present"
+    assert check_certification("Must hold an active RN license.", resume)["status"] == AMBIGUOUS
+
+
+def test_certified_phrase_still_passes_and_fails():
+    checkpoint = "Must have AWS Certified Solutions Architect certification."
+    assert check_certification(checkpoint, "AWS Certified Solutions Architect (2023)")["status"] == PASS
+    assert check_certification(checkpoint, "Experienced with Azure and GCP.")["status"] == FAIL
+
+
+def test_years_with_undated_roles_are_not_a_failure():
+    resume = ("Senior Software Engineer, Acme\n2019 – Present\n"
+              "Software Engineer, Globex\nBuilt billing services.\n"
+              "Junior Developer, Initech\nMaintained internal tools.")
+    check = check_years("At least 10 years of software development experience.", resume, NOW)
+    assert check["status"] == AMBIGUOUS
+    assert check["undated_roles"] == 2
+
+
+def test_years_fail_when_every_role_is_dated():
+    resume = "Software Engineer, Acme\n2019 – Present"
+    assert check_years("At least 10 years of software development experience.", resume, NOW)["status"] == FAIL
+
+
+def test_engine_leaves_the_three_cases_to_the_model():
+    engine = MustHaveRuleEngine()
+    cases = [
+        ("Checkpoint 1: Must have CPA certification.", "Certified Public Accountant\nAccountant, 2010 - Present"),
+        ("Checkpoint 1: Must hold an RN license.", "Registered Nurse\nStaff Nurse, 2012 - Present"),
+        ("Checkpoint 1: At least 10 years of experience.",
+         "Lead Engineer, Acme\n2019 - Present\nEngineer, Globex\nDesigned APIs."),
+    ]
+    for aspects, resume in cases:
+        assert engine.evaluate(aspects, resume, NOW)["category"] is None
@@ -0,0 +1,44 @@
+# tests/test_reports.py
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyPDF2 import PdfReader
+
+from reports import PdfConcatenator, render_analysis_report, render_shortlist_cover
+
+
+def analysis(name, paragraphs):
+    section = {'aspects': f"Aspects for {name}", 'clarifications': "Clarified. " * 40,
+               'evaluation': f"Evaluation of {name}. " + "Detail. " * 60 * paragraphs}
+    return {'overall_rating': 72, 'overall_category': "Good Match", 'overall_summary': f"Summary of {name}",
+            'section_weights': {'experience': 40, 'skills': 35, 'education_and_certification': 25},
+            'education_analysis': section, 'experience_analysis': section,
+            'skills_analysis': section, 'must_have_analysis': section}
+
+
+def test_concatenated_reports_reopen_strictly():
+    documents = [("Shortlist", render_shortlist_cover("Shortlist", ["Rank", "Candidate"], [[1, "Ada"], [2, "Grace"]]))]
+    documents += [(name, render_analysis_report(analysis(name, paragraphs), title=name))
+                  for name, paragraphs in [("Ada", 1), ("Grace", 8), ("Linus", 2)]]
+    page_counts = [len(PdfReader(io.BytesIO(pdf)).pages) for _, pdf in documents]
+    assert page_counts[2] > 1
+
+    output = io.BytesIO()
+    concatenator = PdfConcatenator(output)
+    for title, pdf in documents:
+        concatenator.append(pdf, title)
+    concatenator.close()
+
+    reader = PdfReader(io.BytesIO(output.getvalue()), strict=True)
+    assert len(reader.pages) == sum(page_counts)
+    assert [item.title for item in reader.outline] == [title for title, _ in documents]
+
+    first_pages = [sum(page_counts[:index]) for index in range(len(documents))]
+    assert [reader.get_destination_page_number(item) for item in reader.outline] == first_pages
+    assert "Ada" in reader.pages[first_pages[0]].extract_text()
+    for (title, _), first_page in zip(documents[1:], first_pages[1:]):
+        assert f"Summary of {title}" in reader.pages[first_page].extract_text()
+    assert "Evaluation of Grace" in "".join(page.extract_text() for page in reader.pages[first_pages[2]:first_pages[3]])
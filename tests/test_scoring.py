@@ -0,0 +1,48 @@
+# tests/test_scoring.py
+import os
+import random
+import sys
+from fractions import Fraction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from scoring import CATEGORY_SCHEMES, SECTIONS, ScoringEngine, score_candidate
+
+
+def reference_rating(ratings, weights, mh_category, scheme):
+    """The scalar scorers' arithmetic, done exactly so ties at .5 round half to even."""
+    total = sum(weights[section] for section in SECTIONS)
+    weighted = sum(Fraction(ratings[section] * weights[section], total) for section in SECTIONS)
+    overall = round(weighted)
+    if mh_category == "III":
+        overall = max(0, overall - 20)
+    bounds, labels, above = CATEGORY_SCHEMES[scheme]
+    return overall, next((label for bound, label in zip(bounds, labels) if overall <= bound), above)
+
+
+@pytest.mark.parametrize("scheme", CATEGORY_SCHEMES)
+def test_engine_matches_scalar_scoring(scheme):
+    rng = random.Random(30)
+    for _ in range(50):
+        weights = {section: rng.randint(0, 60) for section in SECTIONS}
+        weights[rng.choice(SECTIONS)] += 1
+        records = [
+            {"candidate_id": str(index), "mh_category": rng.choice([None, "I", "II", "III"]),
+             **{section: rng.randint(1, 100) for section in SECTIONS}}
+            for index in range(20)
+        ]
+        scored = {row["candidate_id"]: row for row in ScoringEngine.from_records(records).score(weights, scheme=scheme)}
+        for record in records:
+            expected = reference_rating(record, weights, record["mh_category"], scheme)
+            assert score_candidate(record, weights, record["mh_category"], scheme) == expected
+            row = scored[record["candidate_id"]]
+            assert (row["overall_rating"], row["overall_category"]) == expected
+
+
+def test_unrated_candidates_rank_last_as_na():
+    records = [{"candidate_id": "a"}, {"candidate_id": "b", "experience": 50, "skills": 70}]
+    scored = ScoringEngine.from_records(records).score({section: 1 for section in SECTIONS})
+    assert [(row["candidate_id"], row["overall_rating"], row["overall_category"]) for row in scored] == \
+        [("b", 40, "Poor Match"), ("a", None, "NA")]
@@ -0,0 +1,32 @@
+# tests/test_skills_taxonomy.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skills_taxonomy import FULL, PARTIAL, SkillTaxonomy
+
+taxonomy = SkillTaxonomy()
+
+
+def test_everyday_words_and_initials_are_not_skills():
+    text = ("I excel at working in a swift, agile team and react quickly. Spring 2020 intern. "
+            "Cut pipes with a blow torch. Grade: C. References: R. Smith.")
+    assert taxonomy.find_skills(text) == {}
+
+
+def test_ambiguous_aliases_count_in_a_skills_context():
+    found = taxonomy.find_skills("Skills: C, R, Python\nBuilt dashboards using Excel and Tableau")
+    assert {"C", "R", "Python", "Excel", "Tableau"} <= set(found)
+
+
+def test_ambiguous_aliases_never_decide():
+    coverage = taxonomy.coverage("1. React and Swift experience\n2. Excel",
+                                 "I excel in swift reactions and react quickly.")
+    assert coverage["status"] == PARTIAL
+    assert taxonomy.decide(coverage) is None
+
+
+def test_ordinary_aliases_still_decide():
+    coverage = taxonomy.coverage("1. Python and SQL\n2. AWS or Azure", "Python developer, PostgreSQL, AWS")
+    assert coverage["status"] == FULL
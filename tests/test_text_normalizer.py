@@ -0,0 +1,25 @@
+# tests/test_text_normalizer.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_normalizer import normalize_document
+
+
+def test_hyphenation_rejoins_only_broken_words():
+    text, stats = normalize_document(["Acme 2019-\npresent\nstate-of-the-\nart tools\nbuilt syst-\nems"])
+    assert "2019-\npresent" in text
+    assert "state-of-the-\nart" in text
+    assert "systems" in text
+    assert stats["hyphenations"] == 1
+
+
+def test_repeated_header_keeps_first_copy():
+    pages = [f"Jane Doe\njane@example.com\nSection {page} first\nSection {page} second\n"
+             f"Section {page} third\nResume - Page {page}" for page in range(1, 4)]
+    text, _ = normalize_document(pages)
+    assert text.startswith("Jane Doe\njane@example.com\n")
+    assert text.count("Jane Doe") == 1
+    assert text.count("jane@example.com") == 1
+    assert "Resume - Page" not in text
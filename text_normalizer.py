@@ -0,0 +1,179 @@
+# text_normalizer.py
+import os
+import re
+import math
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+TEXT_NORMALIZATION_ENABLED = os.getenv("TEXT_NORMALIZATION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Lines at the top and bottom of each page checked for repeated headers and footers
+NORMALIZE_EDGE_LINES = int(os.getenv("NORMALIZE_EDGE_LINES", "4"))
+# Share of pages a header/footer line must appear on to be removed (and at least two pages)
+NORMALIZE_REPEAT_RATIO = float(os.getenv("NORMALIZE_REPEAT_RATIO", "0.5"))
+# Bumped whenever the output changes, so cached extracted text is not reused across versions
+NORMALIZER_VERSION = "2"
+
+# "3", "- 3 -", "Page 3", "Page 3 of 5", "3/5"
+PAGE_NUMBER_PATTERN = re.compile(r"^[\s\-–—(\[]*(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?[\s\-–—)\]]*$", re.IGNORECASE)
+# Header/footer lines whose digits vary by page: "Resume - Page 2", "Printed 2024-01-10", "2 of 5"
+PAGE_FURNITURE_PATTERN = re.compile(r"\bpage\b|\bprinted\b|\bgenerated\b|\bdownloaded\b|\d+\s*(?:of|/)\s*\d+\s*$")
+HORIZONTAL_SPACE_PATTERN = re.compile(r"[^\S\n]+")
+# A word broken across lines with a hyphen; only joined when the part before the hyphen is all
+# letters and not itself part of a hyphenated compound ("2019-\npresent" and "state-of-the-\nart"
+# keep their hyphen), and the next line continues in lowercase
+HYPHENATION_PATTERN = re.compile(r"(?<![\w-])([^\W\d_]+)-\n(?=[a-z])")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+")
+# Equal-employment and legal boilerplate that JDs append; it never bears on the requirements
+EEO_PATTERN = re.compile(
+    r"equal (?:employment )?opportunity|affirmative action|without regard to|regardless of (?:race|gender|sex|age|"
+    r"religion|color)|reasonable accommodation|protected veteran|veteran status|e-verify|sexual orientation|"
+    r"gender identity|national origin|genetic information|disability status|drug[- ]free workplace|"
+    r"applicants with (?:arrest|criminal)|fair chance",
+    re.IGNORECASE
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough model token count (about four characters per token for English text)."""
+    return math.ceil(len(text) / 4)
+
+
+def _line_key(line: str) -> str:
+    key = " ".join(line.lower().split())
+    # Page numbers and print dates inside a header or footer change from page to page; other
+    # lines (e.g. job titles with different years) must repeat exactly
+    if PAGE_FURNITURE_PATTERN.search(key):
+        key = re.sub(r"\d+", "#", key)
+    return key
+
+
+def clean_whitespace(text: str) -> str:
+    """
+    Fold Unicode compatibility forms (ligatures, full-width characters), drop control and
+    format characters (zero-width spaces, soft hyphens, byte-order marks) and collapse runs of spaces.
+    """
+    text = unicodedata.normalize("NFKC", text).replace("\r\n", "\n").replace("\r", "\n")
+    # Category C: control, format, private-use (icon fonts) and unassigned characters
+    text = "".join(char for char in text if char in "\n\t" or unicodedata.category(char)[0] != "C")
+    return "\n".join(HORIZONTAL_SPACE_PATTERN.sub(" ", line).strip() for line in text.split("\n"))
+
+
+def strip_repeated_lines(pages: List[str], stats: Dict) -> List[str]:
+    """
+    Remove page numbers, and header and footer lines found at the edges of most pages.
+    The first copy of a repeated line (e.g. the candidate's name) is kept; page furniture
+    such as "Resume - Page 2" is removed everywhere.
+    """
+    page_lines = [page.split("\n") for page in pages]
+    # Indices of the first and last non-blank lines of each page
+    page_edges = []
+    for lines in page_lines:
+        filled = [index for index, line in enumerate(lines) if line]
+        # Short pages: the edges never reach into the middle third of the page
+        edge = min(NORMALIZE_EDGE_LINES, max(1, len(filled) // 3))
+        page_edges.append(set(filled[:edge] + filled[-edge:]))
+
+    repeated = set()
+    if len(pages) > 1:
+        counts = Counter(key for lines, edges in zip(page_lines, page_edges)
+                         for key in {_line_key(lines[index]) for index in edges})
+        threshold = max(2, math.ceil(NORMALIZE_REPEAT_RATIO * len(pages)))
+        repeated = {key for key, count in counts.items() if count >= threshold}
+
+    cleaned = []
+    seen = set()
+    for lines, edges in zip(page_lines, page_edges):
+        kept = []
+        for index, line in enumerate(lines):
+            key = _line_key(line) if index in edges else None
+            if index in edges and PAGE_NUMBER_PATTERN.match(line):
+                stats['page_numbers'] += 1
+            elif key in repeated and (key in seen or PAGE_FURNITURE_PATTERN.search(key)):
+                stats['repeated_lines'] += 1
+            else:
+                if key in repeated:
+                    seen.add(key)
+                kept.append(line)
+        cleaned.append("\n".join(kept).strip("\n"))
+    return cleaned
+
+
+def strip_eeo_boilerplate(text: str, stats: Dict) -> str:
+    """
+    Drop equal-opportunity and legal boilerplate: whole paragraphs when more than half of their
+    sentences are boilerplate, otherwise only the boilerplate sentences, line by line.
+    """
+    paragraphs = []
+    for paragraph in text.split("\n\n"):
+        sentences = [sentence for sentence in SENTENCE_END_PATTERN.split(paragraph.replace("\n", " ")) if sentence]
+        boilerplate = sum(1 for sentence in sentences if EEO_PATTERN.search(sentence))
+        if not boilerplate:
+            paragraphs.append(paragraph)
+            continue
+        stats['eeo_sentences'] += boilerplate
+        if boilerplate * 2 <= len(sentences):
+            lines = [" ".join(sentence for sentence in SENTENCE_END_PATTERN.split(line)
+                              if not EEO_PATTERN.search(sentence))
+                     for line in paragraph.split("\n")]
+            paragraphs.append("\n".join(line for line in lines if line))
+    return "\n\n".join(paragraphs)
+
+
+def normalize_document(pages: List[str], document: str = "resume") -> Tuple[str, Dict]:
+    """
+    Normalize the extracted text of a document's pages (one entry for DOCX and text files).
+
+    Removes page numbers and headers/footers repeated across pages, collapses whitespace,
+    rejoins hyphenated words and, for JDs, removes EEO boilerplate. Returns the text and
+    what was removed, with the characters and estimated tokens saved.
+    """
+    raw = "\n".join(pages).strip()
+    stats = {'repeated_lines': 0, 'page_numbers': 0, 'hyphenations': 0, 'eeo_sentences': 0}
+    if TEXT_NORMALIZATION_ENABLED:
+        pages = strip_repeated_lines([clean_whitespace(page) for page in pages], stats)
+        text = "\n".join(page for page in pages if page)
+        text, stats['hyphenations'] = HYPHENATION_PATTERN.subn(r"\1", text)
+        if document == "jd":
+            text = strip_eeo_boilerplate(text, stats)
+        text = BLANK_LINES_PATTERN.sub("\n\n", text).strip()
+    else:
+        text = raw
+
+    stats.update(
+        chars_before=len(raw), chars_after=len(text), chars_saved=len(raw) - len(text),
+        tokens_saved=estimate_tokens(raw) - estimate_tokens(text)
+    )
+    normalization_stats.record(document, stats)
+    return text, stats
+
+
+class NormalizationStats:
+    """Totals of what normalization removed, per document kind, since startup."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Counter] = {}
+
+    def record(self, document: str, stats: Dict) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(document, Counter())
+            totals['documents'] += 1
+            totals.update(stats)
+
+    def report(self) -> Dict:
+        with self._lock:
+            return {
+                document: {**totals, 'saved_ratio': round(totals['chars_saved'] / totals['chars_before'], 4)
+                           if totals['chars_before'] else 0.0}
+                for document, totals in self._totals.items()
+            }
+
+
+normalization_stats = NormalizationStats()
@@ -0,0 +1,187 @@
+# uploads.py
+import os
+import mmap
+import asyncio
+import hashlib
+import zipfile
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile
+from text_normalizer import normalize_document
+
+# Load environment variables
+load_dotenv()
+
+# Upload limits
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_MAX_PDF_PAGES = int(os.getenv("UPLOAD_MAX_PDF_PAGES", "50"))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+# Directory for spooled uploads (system temp dir by default)
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+# Parsers running at once; bounds the parser memory on top of the per-request chunk buffer
+UPLOAD_MAX_CONCURRENT_PARSES = int(os.getenv("UPLOAD_MAX_CONCURRENT_PARSES", "4"))
+
+SUPPORTED_KINDS = ("pdf", "docx", "txt")
+
+_parse_slots: Optional[asyncio.Semaphore] = None
+
+
+def sniff_kind(head: bytes) -> Optional[str]:
+    """Identify pdf, docx (any zip; checked again when parsed) or utf-8 text from the first bytes."""
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "docx"
+    if b"\x00" in head:
+        return None
+    # A multi-byte character may be cut off at the end of the chunk
+    for trim in range(4):
+        try:
+            head[:len(head) - trim].decode("utf-8")
+            return "txt"
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+class MappedFile(mmap.mmap):
+    """Read-only mmap with the file-object methods zipfile (python-docx) checks for."""
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+
+class SpooledUpload:
+    """An upload copied chunk by chunk into a temporary file, with its size, hash and sniffed kind."""
+
+    def __init__(self, filename: str, file, size: int, sha256: str, kind: str):
+        self.filename = filename
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+        self.kind = kind
+
+    @contextmanager
+    def mapped(self) -> Iterator[MappedFile]:
+        """Read-only memory map of the spooled file; parsers read it without copying it into memory."""
+        view = MappedFile(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield view
+        finally:
+            view.close()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+async def spool_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    """
+    Stream an upload into a temporary file, rejecting it as soon as it exceeds max_bytes
+    or its first bytes are not a PDF, DOCX or UTF-8 text. The declared extension is not trusted.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the {max_bytes} byte upload limit")
+
+    target = tempfile.TemporaryFile(dir=UPLOAD_TMP_DIR)
+    digest = hashlib.sha256()
+    size = 0
+    kind = None
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if kind is None:
+                kind = sniff_kind(chunk)
+                if kind is None:
+                    raise HTTPException(status_code=415, detail=f"Unsupported file type: {file.filename}")
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the {max_bytes} byte upload limit")
+            digest.update(chunk)
+            target.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail=f"{file.filename} is empty")
+        target.flush()
+    except Exception:
+        target.close()
+        raise
+    return SpooledUpload(file.filename, target, size, digest.hexdigest(), kind)
+
+
+def extract_pdf(view: MappedFile, filename: str, max_pages: int = UPLOAD_MAX_PDF_PAGES) -> List[str]:
+    """Text of each page; kept apart so headers and footers can be recognized across pages."""
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(view)
+    if len(pdf_reader.pages) > max_pages:
+        raise HTTPException(status_code=413, detail=f"{filename} has more than {max_pages} pages")
+    return [page.extract_text() for page in pdf_reader.pages]
+
+
+def extract_docx(view: MappedFile, filename: str) -> str:
+    from docx import Document
+    if "word/document.xml" not in zipfile.ZipFile(view).namelist():
+        raise HTTPException(status_code=415, detail=f"Unsupported file type: {filename} is not a DOCX document")
+    view.seek(0)
+    doc = Document(view)
+    text = ""
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    return text.strip()
+
+
+def extract_text(upload: SpooledUpload, document: str = "resume") -> str:
+    """
+    Extract text from a spooled upload according to its sniffed kind, normalized
+    for a "resume" or a "jd" (see text_normalizer.normalize_document). A file with no
+    extractable text (a scanned or image-only PDF) is a 422.
+    """
+    with upload.mapped() as view:
+        if upload.kind == "pdf":
+            pages = extract_pdf(view, upload.filename)
+        elif upload.kind == "docx":
+            pages = [extract_docx(view, upload.filename)]
+        else:
+            with memoryview(view) as buffer:
+                pages = [str(buffer, "utf-8")]
+    text, _ = normalize_document(pages, document)
+    if not text.strip():
+        raise HTTPException(status_code=422, detail=f"No text could be extracted from {upload.filename}; "
+                                                    "scanned or image-only documents are not supported")
+    return text
+
+
+def open_local_file(path: str) -> SpooledUpload:
+    """A file on disk as a SpooledUpload, for batch runs outside the API; the caller closes it."""
+    file = open(path, "rb")
+    try:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            raise HTTPException(status_code=400, detail=f"{path} is empty")
+        if size > UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"{path} exceeds the {UPLOAD_MAX_BYTES} byte upload limit")
+        kind = sniff_kind(file.read(UPLOAD_CHUNK_SIZE))
+        if kind is None:
+            raise HTTPException(status_code=415, detail=f"Unsupported file type: {path}")
+        file.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: file.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    except Exception:
+        file.close()
+        raise
+    return SpooledUpload(os.path.basename(path), file, size, digest.hexdigest(), kind)
+
+
+async def extract_upload_text(upload: SpooledUpload, document: str = "resume") -> str:
+    """Run extract_text in a worker thread, with at most UPLOAD_MAX_CONCURRENT_PARSES parses at once."""
+    global _parse_slots
+    if _parse_slots is None:
+        _parse_slots = asyncio.Semaphore(UPLOAD_MAX_CONCURRENT_PARSES)
+    async with _parse_slots:
+        return await asyncio.to_thread(extract_text, upload, document)
@@ -0,0 +1,128 @@
+# worker.py
+import os
+import time
+import uuid
+import socket
+import argparse
+import threading
+import traceback
+import multiprocessing
+from typing import Callable, Dict, Optional
+from dotenv import load_dotenv
+from llm_cache import cache_bypass
+from job_queue import TaskQueue
+from pipeline import run_analysis, prepare_requisition, match_job_description
+from applicant_dedup import find_evaluated_duplicate
+from requisition_store import RequisitionStore, RequisitionConflictError, CandidateConflictError
+
+# Load environment variables
+load_dotenv()
+
+QUEUE_POLL_INTERVAL = float(os.getenv("QUEUE_POLL_INTERVAL", "1.0"))
+
+
+def handle_analyze(payload: Dict, requisition_store: RequisitionStore) -> Dict:
+    """Run the agent pipeline for one resume and, with a requisition_id, persist the analysis."""
+    requisition_id = payload.get('requisition_id')
+    with cache_bypass(payload.get('no_cache', False)):
+        aspects = weights = jd_match = None
+        if requisition_id:
+            aspects, weights = prepare_requisition(requisition_store, requisition_id, payload['jd_text'])
+        else:
+            jd_match, duplicate = match_job_description(requisition_store, payload['jd_text'])
+            if duplicate:
+                aspects, weights = duplicate['aspects'], duplicate['weights']
+        # A resume already analyzed for the requisition (a repeat application) is not re-scored
+        _, result = find_evaluated_duplicate(requisition_store, requisition_id, payload['resume_text'])
+        if result is None:
+            result = run_analysis(
+                payload['jd_text'], payload['resume_text'], aspects, weights,
+                short_circuit=payload.get('short_circuit'), tiered=payload.get('tiered'),
+                include_summary=payload.get('include_summary', True)
+            )
+        if jd_match:
+            result['execution']['jd_match'] = jd_match
+    if requisition_id:
+        requisition_store.save_analysis(requisition_id, payload['candidate_id'], payload['resume_text'], result)
+    return result
+
+
+# Task kind -> handler(payload, requisition_store)
+TASK_HANDLERS: Dict[str, Callable[[Dict, RequisitionStore], Dict]] = {
+    'analyze': handle_analyze,
+}
+
+# Errors that another attempt cannot fix
+PERMANENT_ERRORS = (RequisitionConflictError, CandidateConflictError, KeyError)
+
+
+class Worker:
+    """
+    Pulls tasks from the queue and runs them one at a time.
+
+    While a task runs, a heartbeat thread keeps extending its visibility timeout so
+    long analyses are not handed to a second worker; if this process dies, the
+    heartbeat stops and the task is retried elsewhere once the timeout passes.
+    """
+
+    def __init__(self, queue: Optional[TaskQueue] = None, requisition_store: Optional[RequisitionStore] = None,
+                 worker_id: Optional[str] = None, poll_interval: float = QUEUE_POLL_INTERVAL):
+        self.queue = queue or TaskQueue()
+        self.requisition_store = requisition_store or RequisitionStore()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.poll_interval = poll_interval
+
+    def _heartbeat(self, task_id: str, done: threading.Event) -> None:
+        while not done.wait(self.queue.visibility_timeout / 3):
+            if not self.queue.extend(task_id, self.worker_id):
+                return
+
+    def run_task(self, task: Dict) -> None:
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task['id'], done), daemon=True)
+        heartbeat.start()
+        try:
+            handler = TASK_HANDLERS[task['kind']]
+            result = handler(task['payload'], self.requisition_store)
+            self.queue.complete(task['id'], self.worker_id, result)
+            print(f"[{self.worker_id}] Task {task['id']} ({task['kind']}) done")
+        except Exception as e:
+            print(f"[{self.worker_id}] Task {task['id']} ({task['kind']}) failed: {e}")
+            traceback.print_exc()
+            self.queue.fail(task['id'], self.worker_id, str(e), retry=not isinstance(e, PERMANENT_ERRORS))
+        finally:
+            done.set()
+            heartbeat.join()
+
+    def run(self, burst: bool = False, stop: Optional[threading.Event] = None) -> None:
+        """Process tasks until stopped; with burst, return as soon as the queue is empty."""
+        print(f"[{self.worker_id}] Worker started on {self.queue.db_path}")
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            task = self.queue.claim(self.worker_id, kinds=list(TASK_HANDLERS))
+            if task is None:
+                if burst:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            self.run_task(task)
+
+
+def run_worker(burst: bool = False) -> None:
+    Worker().run(burst=burst)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run resume analysis workers against the task queue")
+    parser.add_argument("--processes", type=int, default=1, help="Number of worker processes on this host")
+    parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        run_worker(args.burst)
+    else:
+        processes = [multiprocessing.Process(target=run_worker, args=(args.burst,)) for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()